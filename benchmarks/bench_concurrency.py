@@ -0,0 +1,84 @@
+"""Compare dispatcher throughput in sequential and concurrent (``max_in_flight``) modes.
+
+Each scenario processes a fixed amount of messages with a handler that only awaits,
+simulating I/O-bound work. The sequential mode is bounded by ``workers`` while the
+concurrent mode keeps taking messages up to ``max_in_flight``, so its throughput grows
+with the handler latency until the in-flight limit is reached.
+
+Usage:
+    python benchmarks/bench_concurrency.py [--messages 2000] [--workers 10] [--max-in-flight 500]
+"""
+
+import argparse
+import asyncio
+import time
+
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.providers import AbstractProvider
+from pyinsole.routes import Route
+
+
+class StubProvider(AbstractProvider):
+    def __init__(self, total: int, batch_size: int = 10):
+        self.pending = total
+        self.batch_size = batch_size
+
+    async def fetch_messages(self) -> list:
+        if not self.pending:
+            await asyncio.sleep(0.001)
+            return []
+
+        size = min(self.batch_size, self.pending)
+        self.pending -= size
+        return [{"Body": "message"}] * size
+
+    async def confirm_message(self, message):
+        pass
+
+
+async def run_scenario(*, messages: int, latency: float, workers: int, max_in_flight: int | None) -> float:
+    done = asyncio.Event()
+    processed = 0
+
+    async def handler(message, metadata):  # noqa: ARG001
+        nonlocal processed
+        await asyncio.sleep(latency)
+        processed += 1
+        if processed == messages:
+            done.set()
+        return True
+
+    route = Route(StubProvider(messages), handler)
+    dispatcher = Dispatcher([route], queue_size=workers * 10, workers=workers, max_in_flight=max_in_flight)
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(dispatcher.dispatch(cancellation_token=done))
+        await done.wait()
+
+    return messages / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=10)
+    parser.add_argument("--max-in-flight", type=int, default=500)
+    parser.add_argument("--latencies", type=float, nargs="+", default=[0.0, 0.001, 0.005, 0.01, 0.05])
+    args = parser.parse_args()
+
+    print(f"{'latency (ms)':>12} {'sequential msg/s':>17} {'concurrent msg/s':>17} {'speedup':>8}")
+    for latency in args.latencies:
+        sequential = asyncio.run(
+            run_scenario(messages=args.messages, latency=latency, workers=args.workers, max_in_flight=None)
+        )
+        concurrent = asyncio.run(
+            run_scenario(
+                messages=args.messages, latency=latency, workers=args.workers, max_in_flight=args.max_in_flight
+            )
+        )
+        print(f"{latency * 1000:>12.1f} {sequential:>17.0f} {concurrent:>17.0f} {concurrent / sequential:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
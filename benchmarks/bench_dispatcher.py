@@ -0,0 +1,108 @@
+"""Measure the dispatcher throughput, latency and per-message overhead with an in-memory queue.
+
+Each scenario preloads an `InMemoryProvider` and processes all its messages with a handler
+that awaits `--handler-delay` seconds (with `--jitter`, uniformly drawn up to twice that, from
+a seeded generator so runs are reproducible). The latency of a message is measured from its
+fetch to the end of its handling. With the default zero handler delay, the time per message is
+the dispatcher overhead. Each scenario is repeated and the run with the median throughput is
+reported.
+
+Usage:
+    python benchmarks/bench_dispatcher.py [--messages 20000] [--workers 1,4,16] [--queue-sizes 10,100]
+        [--handler-delay 0] [--jitter] [--batch-size 10] [--fetch-latency 0] [--repeat 3] [--seed 42]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.ext.local import InMemoryProvider
+from pyinsole.routes import Route
+
+
+class TimedProvider(InMemoryProvider):
+    """Stamp messages with the time they were fetched."""
+
+    async def fetch_messages(self) -> list:
+        messages = await super().fetch_messages()
+        fetched_at = time.perf_counter()
+        for message in messages:
+            message["FetchedAt"] = fetched_at
+        return messages
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+async def run_scenario(args, workers: int, queue_size: int, seed: int) -> dict:
+    rng = random.Random(seed)  # noqa: S311
+    done = asyncio.Event()
+    latencies = []
+
+    async def handler(message, metadata):  # noqa: ARG001
+        await asyncio.sleep(args.handler_delay * rng.uniform(0, 2) if args.jitter else args.handler_delay)
+        latencies.append(time.perf_counter() - message["FetchedAt"])
+        if len(latencies) == args.messages:
+            done.set()
+        return True
+
+    provider = TimedProvider(
+        range(args.messages), batch_size=args.batch_size, latency=args.fetch_latency, wait_time=0.01
+    )
+    dispatcher = Dispatcher([Route(provider, handler)], queue_size=queue_size, workers=workers)
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(dispatcher.dispatch(cancellation_token=done))
+        await done.wait()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "workers": workers,
+        "queue_size": queue_size,
+        "throughput": args.messages / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "per_message": elapsed / args.messages,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--workers", default="1,4,16")
+    parser.add_argument("--queue-sizes", default="10,100")
+    parser.add_argument("--handler-delay", type=float, default=0)
+    parser.add_argument("--jitter", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=10)
+    parser.add_argument("--fetch-latency", type=float, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args(argv)
+
+
+def run(args) -> list[dict]:
+    results = []
+    for workers in (int(value) for value in args.workers.split(",")):
+        for queue_size in (int(value) for value in args.queue_sizes.split(",")):
+            runs = [asyncio.run(run_scenario(args, workers, queue_size, args.seed)) for _ in range(args.repeat)]
+            results.append(sorted(runs, key=lambda result: result["throughput"])[len(runs) // 2])
+    return results
+
+
+def main():
+    args = parse_args()
+    print(f"{'workers':>7} {'queue_size':>10} {'messages/s':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'us/message':>11}")
+    for result in run(args):
+        print(
+            f"{result['workers']:>7} {result['queue_size']:>10} {result['throughput']:>11.0f}"
+            f" {result['p50'] * 1e3:>9.2f} {result['p99'] * 1e3:>9.2f} {result['per_message'] * 1e6:>11.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
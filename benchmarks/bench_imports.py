@@ -0,0 +1,97 @@
+"""Measure the cold start cost of importing pyinsole and building routes, in fresh interpreters.
+
+Each case runs in a new `python -X importtime` process: the time of its statement is measured
+in the process and the median of `--repeat` runs is reported, with the modules it imported that
+took the most time (self time, from `-X importtime`) in the last run. With `--max-ms`, the script
+exits with status 1 when a case is slower, so it can guard the startup time of short-lived
+consumers.
+
+Usage:
+    python benchmarks/bench_imports.py [--repeat 7] [--top 5] [--max-ms 100]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+
+CASES = {
+    "import pyinsole": "import pyinsole",
+    "import pyinsole.ext.aws": "import pyinsole.ext.aws",
+    "route": (
+        "from pyinsole import Route\n"
+        "from pyinsole.ext.local import InMemoryProvider\n"
+        "async def handler(message, metadata): return True\n"
+        "Route(InMemoryProvider(), handler)"
+    ),
+    "sqs route": (
+        "from pyinsole.ext.aws import SQSRoute\n"
+        "async def handler(message, metadata): return True\n"
+        "SQSRoute('queue', handler)"
+    ),
+    "manager": (
+        "from pyinsole import Manager\n"
+        "from pyinsole.ext.aws import SQSRoute\n"
+        "async def handler(message, metadata): return True\n"
+        "Manager([SQSRoute('queue', handler)])"
+    ),
+}
+
+# the marker separates the imports of the interpreter startup from the ones of the statement
+MARKER = "-- statement --"
+TEMPLATE = """
+import sys, time
+sys.stderr.write("{marker}\\n")
+start = time.perf_counter()
+{statement}
+print(time.perf_counter() - start)
+"""
+
+
+def run_case(statement: str) -> tuple[float, list[tuple[int, str]]]:
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", TEMPLATE.format(marker=MARKER, statement=statement)],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+
+    modules = []
+    _, _, statement_imports = process.stderr.partition(MARKER)
+    for line in statement_imports.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_time, _, name = line.removeprefix("import time:").split("|")
+        modules.append((int(self_time), name.strip()))
+
+    return float(process.stdout), modules
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--top", type=int, default=5, help="amount of slowest modules to show for each case")
+    parser.add_argument("--max-ms", type=float, help="maximum time of each case, in milliseconds")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    slow = False
+
+    for name, statement in CASES.items():
+        runs = [run_case(statement) for _ in range(args.repeat)]
+        elapsed = statistics.median(elapsed for elapsed, _ in runs) * 1e3
+        over_budget = args.max_ms is not None and elapsed > args.max_ms
+        slow = slow or over_budget
+
+        print(f"{name:<25} {elapsed:>8.1f} ms{'  OVER BUDGET' if over_budget else ''}")
+        for self_time, module in sorted(runs[-1][1], reverse=True)[: args.top]:
+            print(f"    {module:<40} {self_time / 1e3:>8.1f} ms")
+
+    if slow:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Measure the per-message logging overhead of `Route.deliver` with INFO logging enabled.
+
+Compares the former behavior (every message fully rendered at INFO level) with the default
+lazy DEBUG logging and with a `SampledMessageLogger` logging 1 in 100 messages. Records go
+to a stream handler writing to the null device, so the formatting cost is included.
+
+Usage:
+    python benchmarks/bench_logging.py [--messages 20000] [--body-size 2048]
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import time
+
+from pyinsole.logs import SampledMessageLogger
+from pyinsole.providers import AbstractProvider
+from pyinsole.routes import Route
+
+logger = logging.getLogger("pyinsole")
+
+
+class StubProvider(AbstractProvider):
+    async def fetch_messages(self) -> list:
+        return []
+
+    async def confirm_message(self, message):
+        pass
+
+
+class EagerLoggingRoute(Route):
+    """Route logging every delivered message at INFO level, as `Route.deliver` used to."""
+
+    async def deliver(self, raw_message):
+        message = self.prepare_message(raw_message)
+        logging.getLogger("pyinsole.routes").info("delivering message route=%s, message=%r", self, message)
+        return await self.handler(message["content"], message["metadata"])
+
+
+async def handler(message, metadata):  # noqa: ARG001
+    return True
+
+
+def create_message(body_size: int) -> dict:
+    return {
+        "MessageId": "5fea7756-0ea4-451a-a703-a558b933e274",
+        "ReceiptHandle": "AQEBwJnKyrHigUMZj6rYigCgxlaS3SLy0a" * 4,
+        "MD5OfBody": "fafb00f5732ab283681e124bf8747ed1",
+        "Body": "x" * body_size,
+        "Attributes": {
+            "SenderId": "AIDAIENQZJOLO23YVJ4VO",
+            "ApproximateFirstReceiveTimestamp": "1250700979248",
+            "ApproximateReceiveCount": "1",
+            "SentTimestamp": "1238099229000",
+        },
+        "MessageAttributes": {f"attribute-{i}": {"DataType": "String", "StringValue": "value"} for i in range(10)},
+    }
+
+
+async def measure(route: Route, message: dict, messages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(messages):
+        await route.deliver(message)
+    return (time.perf_counter() - start) / messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000)
+    parser.add_argument("--body-size", type=int, default=2048)
+    args = parser.parse_args()
+
+    with open(os.devnull, "w") as devnull:
+        logger.addHandler(logging.StreamHandler(devnull))
+        logger.setLevel(logging.INFO)
+
+        message = create_message(args.body_size)
+        scenarios = {
+            "no logging (baseline)": Route(StubProvider(), handler),
+            "eager INFO (former)": EagerLoggingRoute(StubProvider(), handler),
+            "lazy DEBUG (default)": Route(StubProvider(), handler),
+            "sampled 1/100": Route(StubProvider(), handler, message_logger=SampledMessageLogger(sample_rate=100)),
+        }
+
+        results = {}
+        for name, route in scenarios.items():
+            if name == "no logging (baseline)":
+                logger.setLevel(logging.WARNING)
+            results[name] = asyncio.run(measure(route, message, args.messages))
+            logger.setLevel(logging.INFO)
+
+    baseline = results["no logging (baseline)"]
+    print(f"{'scenario':<24} {'us/message':>11} {'overhead (us)':>14}")
+    for name, duration in results.items():
+        print(f"{name:<24} {duration * 1e6:>11.2f} {(duration - baseline) * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Measure the per-message cost of the route middleware chains.
+
+`Route.deliver` is called in a loop with an in-memory handler, first without middlewares
+(the baseline, which should match a route built before middlewares existed), then with
+chains of no-op middlewares overriding `prepare`, `deliver` or both. The overhead is the
+time added to each message compared to the baseline.
+
+Usage:
+    python benchmarks/bench_middlewares.py [--messages 100000] [--repeat 5] [--depths 1,3,10]
+"""
+
+import argparse
+import asyncio
+import time
+
+from pyinsole.ext.local import InMemoryProvider
+from pyinsole.middlewares import Middleware
+from pyinsole.routes import Route
+
+
+class PrepareMiddleware(Middleware):
+    def prepare(self, raw_message, call_next):
+        return call_next(raw_message)
+
+
+class DeliverMiddleware(Middleware):
+    async def deliver(self, message, call_next):
+        return await call_next(message)
+
+
+class FullMiddleware(PrepareMiddleware, DeliverMiddleware):
+    pass
+
+
+KINDS = {"prepare": PrepareMiddleware, "deliver": DeliverMiddleware, "both": FullMiddleware}
+
+
+async def handler(content, metadata):  # noqa: ARG001
+    return True
+
+
+async def measure(route: Route, messages: int) -> float:
+    message = {"MessageId": "id", "Body": "message"}
+    deliver = route.deliver
+    start = time.perf_counter()
+    for _ in range(messages):
+        await deliver(message)
+    return (time.perf_counter() - start) / messages
+
+
+def best_of(route: Route, messages: int, repeat: int) -> float:
+    return min(asyncio.run(measure(route, messages)) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--depths", default="1,3,10")
+    args = parser.parse_args()
+
+    provider = InMemoryProvider()
+    # warm up the interpreter, so the baseline is not penalized by being measured first
+    best_of(Route(provider, handler), args.messages, 1)
+    baseline = best_of(Route(provider, handler), args.messages, args.repeat)
+
+    print(f"{'middlewares':<12} {'depth':>5} {'us/message':>11} {'overhead (us)':>14}")
+    print(f"{'none':<12} {0:>5} {baseline * 1e6:>11.3f} {0:>14.3f}")
+    for kind, middleware_class in KINDS.items():
+        for depth in (int(depth) for depth in args.depths.split(",")):
+            route = Route(provider, handler, middlewares=[middleware_class() for _ in range(depth)])
+            duration = best_of(route, args.messages, args.repeat)
+            print(f"{kind:<12} {depth:>5} {duration * 1e6:>11.3f} {(duration - baseline) * 1e6:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Benchmark the full dispatch path (fetch, translate, deliver, confirm) and track regressions.
+
+Each scenario preloads in-memory queues with SQS or SNS JSON messages and dispatches them
+with `Dispatcher` to handlers of varying latency (awaited, like I/O) and CPU cost (busy
+loop). The latency of a message is measured from its fetch to its confirmation. Scenarios
+are repeated and the run with the median throughput is kept.
+
+Results are written as JSON (`--output`) with the commit and the environment they were
+measured in. Pass a previous result file to `--compare` to print the throughput change of
+each scenario: the script exits with status 1 when any scenario is slower by more than
+`--threshold`, so it can be run on two commits of the same machine to catch regressions.
+
+Usage:
+    python benchmarks/bench_suite.py [--messages 5000] [--repeat 3] [--scenarios sqs,sns-multi]
+        [--output results.json] [--compare baseline.json] [--threshold 0.1]
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.ext.aws.translators import SNSMessageTranslator, SQSMessageTranslator
+from pyinsole.ext.local import InMemoryProvider
+from pyinsole.routes import BatchRoute, Route
+
+CONTENT = {
+    "order_id": "5fea7756-0ea4-451a-a703-a558b933e274",
+    "items": [{"id": 1234567, "name": "some product name", "price": 12.5, "tags": ["a", "b"]}] * 4,
+}
+
+
+class Scenario:
+    def __init__(
+        self,
+        name: str,
+        *,
+        routes: int = 1,
+        sns: bool = False,
+        batch: bool = False,
+        handler_latency: float = 0,
+        handler_cpu: float = 0,
+        fetch_latency: float = 0,
+        workers: int | None = None,
+        queue_size: int | None = None,
+    ):
+        self.name = name
+        self.routes = routes
+        self.sns = sns
+        self.batch = batch
+        self.handler_latency = handler_latency
+        self.handler_cpu = handler_cpu
+        self.fetch_latency = fetch_latency
+        self.workers = workers
+        self.queue_size = queue_size
+
+
+SCENARIOS = [
+    Scenario("sqs"),
+    Scenario("sns", sns=True),
+    Scenario("sqs-multi", routes=4),
+    Scenario("sns-multi", routes=4, sns=True),
+    Scenario("sqs-batch", batch=True),
+    Scenario("sqs-fetch-latency", fetch_latency=0.002, workers=8),
+    Scenario("sqs-io-handler", handler_latency=0.001, workers=20, queue_size=100),
+    Scenario("sqs-cpu-handler", handler_cpu=0.0001),
+    Scenario("sns-multi-mixed", routes=4, sns=True, handler_latency=0.0005, handler_cpu=0.00005, workers=16),
+]
+
+
+class TimedProvider(InMemoryProvider):
+    """Record the fetch-to-confirmation latency of the messages."""
+
+    def __init__(self, messages, *, on_confirm, **kwargs):
+        super().__init__(messages, **kwargs)
+        self.on_confirm = on_confirm
+        self._fetched_at = {}
+
+    async def fetch_messages(self) -> list:
+        messages = await super().fetch_messages()
+        fetched_at = time.perf_counter()
+        for message in messages:
+            self._fetched_at[message["ReceiptHandle"]] = fetched_at
+        return messages
+
+    async def confirm_message(self, message):
+        await super().confirm_message(message)
+        self.on_confirm(time.perf_counter() - self._fetched_at.pop(message["ReceiptHandle"]))
+
+
+def create_body(scenario: Scenario) -> str:
+    body = json.dumps(CONTENT)
+    if not scenario.sns:
+        return body
+
+    envelope = {
+        "Type": "Notification",
+        "MessageId": "5fea7756-0ea4-451a-a703-a558b933e274",
+        "TopicArn": "arn:aws:sns:us-east-1:123456789012:topic",
+        "Message": body,
+        "Timestamp": "2024-01-01T00:00:00.000Z",
+    }
+    return json.dumps(envelope)
+
+
+def create_handler(scenario: Scenario):
+    async def handler(content, metadata):  # noqa: ARG001
+        if scenario.handler_cpu:
+            deadline = time.perf_counter() + scenario.handler_cpu
+            while time.perf_counter() < deadline:
+                pass
+        if scenario.handler_latency:
+            await asyncio.sleep(scenario.handler_latency)
+        return True
+
+    return handler
+
+
+def percentile(values: list[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * percent / 100), len(ordered) - 1)]
+
+
+async def run_scenario(scenario: Scenario, messages: int) -> dict:
+    done = asyncio.Event()
+    latencies = []
+
+    def on_confirm(latency: float):
+        latencies.append(latency)
+        if len(latencies) == messages:
+            done.set()
+
+    body = create_body(scenario)
+    translator_class = SNSMessageTranslator if scenario.sns else SQSMessageTranslator
+    route_class = BatchRoute if scenario.batch else Route
+    per_route, remainder = divmod(messages, scenario.routes)
+    routes = [
+        route_class(
+            TimedProvider(
+                [body] * (per_route + (index < remainder)),
+                on_confirm=on_confirm,
+                latency=scenario.fetch_latency,
+                wait_time=0.01,
+            ),
+            create_handler(scenario),
+            translator=translator_class(),
+            name=f"route-{index}",
+        )
+        for index in range(scenario.routes)
+    ]
+    dispatcher = Dispatcher(routes, queue_size=scenario.queue_size, workers=scenario.workers)
+
+    start = time.perf_counter()
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(dispatcher.dispatch(cancellation_token=done))
+        await done.wait()
+    elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": scenario.name,
+        "messages": messages,
+        "seconds": elapsed,
+        "throughput": messages / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1e3,
+        "p99_ms": percentile(latencies, 99) * 1e3,
+        "per_message_us": elapsed / messages * 1e6,
+    }
+
+
+def current_commit() -> str | None:
+    try:
+        output = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],  # noqa: S607
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def compare(results: list[dict], baseline: dict, threshold: float) -> bool:
+    """Print the throughput change of each scenario and return whether none regressed."""
+    previous = {result["scenario"]: result for result in baseline["results"]}
+    ok = True
+
+    print(f"\ncompared to {baseline.get('commit')} ({baseline.get('timestamp')})")
+    for result in results:
+        before = previous.get(result["scenario"])
+        if before is None:
+            continue
+
+        change = result["throughput"] / before["throughput"] - 1
+        regressed = change < -threshold
+        ok = ok and not regressed
+        print(f"{result['scenario']:>20} {change:>+8.1%}{'  REGRESSION' if regressed else ''}")
+
+    return ok
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--scenarios", help="comma separated scenario names, all by default")
+    parser.add_argument("--output", help="file where the JSON results are written")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare with")
+    parser.add_argument("--threshold", type=float, default=0.1, help="tolerated throughput decrease ratio")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    scenarios = SCENARIOS
+    if args.scenarios:
+        names = set(args.scenarios.split(","))
+        scenarios = [scenario for scenario in SCENARIOS if scenario.name in names]
+
+    print(f"{'scenario':>20} {'messages/s':>11} {'p50 (ms)':>9} {'p99 (ms)':>9} {'us/message':>11}")
+    results = []
+    for scenario in scenarios:
+        runs = [asyncio.run(run_scenario(scenario, args.messages)) for _ in range(args.repeat)]
+        result = sorted(runs, key=lambda run: run["throughput"])[len(runs) // 2]
+        results.append(result)
+        print(
+            f"{result['scenario']:>20} {result['throughput']:>11.0f} {result['p50_ms']:>9.2f}"
+            f" {result['p99_ms']:>9.2f} {result['per_message_us']:>11.2f}"
+        )
+
+    report = {
+        "commit": current_commit(),
+        "timestamp": datetime.now(UTC).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            if not compare(results, json.load(baseline), args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
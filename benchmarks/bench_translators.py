@@ -0,0 +1,61 @@
+"""Measure the translation cost of SQS and SNS messages with each available JSON decoder backend.
+
+Usage:
+    python benchmarks/bench_translators.py [--messages 5000] [--sizes 256,4096,65536]
+"""
+
+import argparse
+import json
+import time
+
+from pyinsole.decoders import available_backends
+from pyinsole.ext.aws.translators import SNSMessageTranslator, SQSMessageTranslator
+
+
+def create_content(size: int) -> dict:
+    item = {"id": 1234567, "name": "some product name", "price": 12.5, "tags": ["a", "b", "c"], "active": True}
+    items = max(size // len(json.dumps(item)), 1)
+    return {"order_id": "5fea7756-0ea4-451a-a703-a558b933e274", "items": [item] * items}
+
+
+def create_messages(size: int) -> dict[str, dict]:
+    body = json.dumps(create_content(size))
+    envelope = {
+        "Type": "Notification",
+        "MessageId": "5fea7756-0ea4-451a-a703-a558b933e274",
+        "TopicArn": "arn:aws:sns:us-east-1:123456789012:topic",
+        "Message": body,
+        "Timestamp": "2024-01-01T00:00:00.000Z",
+        "SignatureVersion": "1",
+    }
+    return {"sqs": {"Body": body, "MessageId": "id"}, "sns": {"Body": json.dumps(envelope), "MessageId": "id"}}
+
+
+def measure(translator, message: dict, messages: int) -> float:
+    start = time.perf_counter()
+    for _ in range(messages):
+        translator.translate(message)
+    return (time.perf_counter() - start) / messages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--sizes", default="256,4096,65536")
+    args = parser.parse_args()
+
+    translators = {"sqs": SQSMessageTranslator, "sns": SNSMessageTranslator}
+
+    print(f"{'translator':<10} {'size':>7} {'backend':<8} {'us/message':>11} {'speedup':>8}")
+    for size in (int(size) for size in args.sizes.split(",")):
+        messages = create_messages(size)
+        for kind, translator_class in translators.items():
+            baseline = None
+            for backend in reversed(available_backends()):
+                duration = measure(translator_class(backend), messages[kind], args.messages)
+                baseline = baseline or duration
+                print(f"{kind:<10} {size:>7} {backend:<8} {duration * 1e6:>11.2f} {baseline / duration:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
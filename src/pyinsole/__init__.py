@@ -1,8 +1,15 @@
 import logging
+from typing import TYPE_CHECKING
 
-from .managers import Manager
-from .routes import Route
+from ._imports import lazy_getattr
 
-__all__ = ["Manager", "Route"]
+if TYPE_CHECKING:
+    from .managers import Manager  # noqa: TC004
+    from .routes import BatchRoute, Route  # noqa: TC004
+
+__all__ = ["BatchRoute", "Manager", "Route"]
+
+# the public classes are imported on first access, so importing the package stays cheap
+__getattr__ = lazy_getattr(__name__, {"BatchRoute": ".routes", "Manager": ".managers", "Route": ".routes"})
 
 logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -0,0 +1,24 @@
+import importlib
+import sys
+from collections.abc import Callable
+from typing import Any
+
+
+def lazy_getattr(package: str, imports: dict[str, str]) -> Callable[[str], Any]:
+    """Return a module `__getattr__` importing the `imports` names from their submodule on first access.
+
+    `imports` maps each name to the relative name of its submodule. Imported names are cached
+    in the package, so the next accesses are plain attribute lookups.
+    """
+
+    def module_getattr(name: str) -> Any:
+        submodule = imports.get(name)
+        if submodule is None:
+            msg = f"module {package!r} has no attribute {name!r}"
+            raise AttributeError(msg)
+
+        value = getattr(importlib.import_module(submodule, package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    return module_getattr
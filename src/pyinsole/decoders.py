@@ -0,0 +1,68 @@
+import importlib
+import json
+from collections.abc import Callable
+from types import ModuleType
+from typing import Any
+
+
+def _import_optional(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:  # no cov
+        return None
+
+
+msgspec = _import_optional("msgspec")
+orjson = _import_optional("orjson")
+
+Decoder = Callable[[str | bytes], Any]
+
+# backends tried, in order, when the "auto" backend is requested
+AUTO_BACKENDS = ("msgspec", "orjson", "json")
+
+
+def available_backends() -> list[str]:
+    """Return the JSON decoder backends that can be used in this environment."""
+    installed = {"msgspec": msgspec is not None, "orjson": orjson is not None, "json": True}
+    return [backend for backend in AUTO_BACKENDS if installed[backend]]
+
+
+def json_decoder(backend: str = "json", *, model: type | None = None) -> Decoder:
+    """Return a function decoding a JSON document with the given backend.
+
+    Args:
+        backend (str): one of "json" (standard library), "orjson", "msgspec" or "auto", which
+            picks the fastest installed backend.
+        model (type | None): decode straight into this type (e.g. a `msgspec.Struct`), validating
+            the document. Only supported by the "msgspec" backend.
+
+    Whatever the backend, invalid documents raise `ValueError` (or one of its subclasses) and
+    inputs that are not `str` or `bytes` raise `ValueError` or `TypeError`.
+    """
+    if backend == "auto":
+        backend = "msgspec" if model is not None else available_backends()[0]
+
+    if model is not None and backend != "msgspec":
+        msg = f"decoding into a model type requires the msgspec backend, got backend={backend!r}"
+        raise ValueError(msg)
+
+    if backend == "json":
+        return json.loads
+
+    if backend == "orjson":
+        if orjson is None:
+            msg = "orjson backend requires the orjson package, install it with pyinsole[orjson]"
+            raise ImportError(msg)
+
+        return orjson.loads
+
+    if backend == "msgspec":
+        if msgspec is None:
+            msg = "msgspec backend requires the msgspec package, install it with pyinsole[msgspec]"
+            raise ImportError(msg)
+
+        decoder = msgspec.json.Decoder(model) if model is not None else msgspec.json.Decoder()
+        return decoder.decode
+
+    msg = f"unknown JSON decoder backend: {backend!r}"
+    raise ValueError(msg)
@@ -0,0 +1,159 @@
+import abc
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import sqlite3
+
+
+class AbstractDeduplicationCache(abc.ABC):
+    """Store of the keys of the messages already processed, to skip their redeliveries.
+
+    Keys are remembered for `ttl` seconds after the message was successfully handled. The
+    amount of lookups that found a duplicate (`hits`) or not (`misses`) is counted.
+    """
+
+    def __init__(self, ttl: float):
+        if ttl <= 0:
+            msg = f"ttl must be positive: {ttl!r}"
+            raise ValueError(msg)
+
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @abc.abstractmethod
+    async def contains(self, key: str) -> bool:
+        """Return whether the key was added less than `ttl` seconds ago."""
+
+    @abc.abstractmethod
+    async def add(self, key: str):
+        """Remember the key for `ttl` seconds."""
+
+    async def is_duplicate(self, key: str) -> bool:
+        duplicate = await self.contains(key)
+        if duplicate:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return duplicate
+
+
+class InMemoryDeduplicationCache(AbstractDeduplicationCache):
+    """Bounded LRU cache of keys with a TTL, local to the process.
+
+    Keys are kept in insertion order, which is also their expiration order, so expired and
+    least recently added keys are both evicted from the front in constant time.
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 10_000):
+        super().__init__(ttl)
+
+        if max_size < 1:
+            msg = f"max_size must be a positive integer: {max_size!r}"
+            raise ValueError(msg)
+
+        self.max_size = max_size
+        self._expirations: OrderedDict[str, float] = OrderedDict()
+
+    def __len__(self):
+        return len(self._expirations)
+
+    def _evict_expired(self, now: float):
+        expirations = self._expirations
+        while expirations:
+            key, expires_at = next(iter(expirations.items()))
+            if expires_at > now:
+                break
+            del expirations[key]
+
+    async def contains(self, key: str) -> bool:
+        self._evict_expired(time.monotonic())
+        return key in self._expirations
+
+    async def add(self, key: str):
+        now = time.monotonic()
+        self._evict_expired(now)
+
+        self._expirations[key] = now + self.ttl
+        self._expirations.move_to_end(key)
+        if len(self._expirations) > self.max_size:
+            self._expirations.popitem(last=False)
+
+
+class SQLiteDeduplicationCache(AbstractDeduplicationCache):
+    """Cache of keys with a TTL in a SQLite database, shared by the processes of a host.
+
+    Queries run in a thread so they do not block the event loop. Expired keys are purged
+    every `purge_interval` additions. The database is opened on first use, and again in each
+    forked process: SQLite connections must not be used across `fork()`.
+    """
+
+    def __init__(self, path: str, ttl: float = 300, *, purge_interval: int = 1000):
+        super().__init__(ttl)
+
+        self.path = path
+        self.purge_interval = purge_interval
+
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._additions = 0
+        self._connection: sqlite3.Connection | None = None
+
+    def _check_process(self):
+        # runs on the event loop before the queries, so no thread uses the state being reset
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._lock = threading.Lock()
+            self._connection = None
+
+    def _connect(self) -> "sqlite3.Connection":
+        if self._connection is None:
+            import sqlite3
+
+            connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pyinsole_deduplication (key TEXT PRIMARY KEY, expires_at REAL NOT NULL)"
+            )
+            self._connection = connection
+
+        return self._connection
+
+    def _contains(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._connect().execute(
+                "SELECT 1 FROM pyinsole_deduplication WHERE key = ? AND expires_at > ?", (key, time.time())
+            )
+            return cursor.fetchone() is not None
+
+    def _add(self, key: str):
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            connection.execute(
+                "INSERT OR REPLACE INTO pyinsole_deduplication (key, expires_at) VALUES (?, ?)", (key, now + self.ttl)
+            )
+
+            self._additions += 1
+            if self._additions >= self.purge_interval:
+                self._additions = 0
+                connection.execute("DELETE FROM pyinsole_deduplication WHERE expires_at <= ?", (now,))
+
+    async def contains(self, key: str) -> bool:
+        self._check_process()
+        return await asyncio.to_thread(self._contains, key)
+
+    async def add(self, key: str):
+        self._check_process()
+        await asyncio.to_thread(self._add, key)
+
+    def close(self):
+        self._check_process()
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -1,16 +1,59 @@
 import abc
 import asyncio
 import logging
+import random
 import sys
-from collections.abc import Sequence
-from contextlib import AsyncExitStack
+import time
+from collections.abc import AsyncIterator, Callable, Coroutine, Hashable, Sequence
+from contextlib import AsyncExitStack, asynccontextmanager
+from functools import partial
+from itertools import chain
 from typing import Any
 
 from ._compat import override
-from .routes import Route
+from .limits import AdaptiveConcurrencyLimit, RateLimiter
+from .metrics import Metrics
+from .routes import BatchRoute, Route
+from .schedulers import AbstractScheduler, FairScheduler
 
 logger = logging.getLogger(__name__)
 
+# first backoff interval (in seconds) after an empty receive, doubled on each consecutive one
+POLL_BACKOFF_BASE = 0.05
+# interval (in seconds) between demand checks of an idle additional poller
+IDLE_POLLER_INTERVAL = 0.1
+# maximum interval (in seconds) between checks of an open circuit, so pollers notice the cancellation
+CIRCUIT_CHECK_INTERVAL = 1.0
+
+
+class _PollingState:
+    """Receive statistics shared by the pollers of a route."""
+
+    def __init__(self):
+        self.max_batch = 1
+        self.hot = False
+        self.empty_receives = 0
+
+    def update(self, received: int):
+        if received:
+            self.max_batch = max(self.max_batch, received)
+            # a full receive means the queue probably has more messages waiting
+            self.hot = received >= self.max_batch
+            self.empty_receives = 0
+        else:
+            self.hot = False
+            self.empty_receives += 1
+
+
+class _GroupLock:
+    """Lock of a message group of an ordered route, with the amount of items using or waiting for it."""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
 
 class AbstractDispatcher:
     @abc.abstractmethod
@@ -30,10 +73,43 @@ class Dispatcher(AbstractDispatcher):
         routes: Sequence[Route],
         queue_size: int | None = None,
         workers: int | None = None,
+        *,
+        max_in_flight: int | None = None,
+        metrics: Metrics | None = None,
+        rate_limit: RateLimiter | None = None,
     ):
+        if max_in_flight is not None and max_in_flight < 1:
+            msg = f"max_in_flight must be a positive integer: {max_in_flight!r}"
+            raise ValueError(msg)
+
         self.routes = routes
         self.queue_size = queue_size or len(routes) * 10
         self.workers = workers or max(len(routes), 3)
+        self.max_in_flight = max_in_flight
+        self.metrics = metrics
+        self.rate_limit = rate_limit
+
+        if metrics is not None:
+            for route in routes:
+                if route.metrics is None:
+                    route.bind_metrics(metrics)
+
+        self._in_flight_limit: asyncio.Semaphore | None = None
+        self._route_limits: dict[Route, asyncio.Semaphore] = {}
+        self._in_flight = dict.fromkeys(routes, 0)
+        self._group_locks: dict[tuple[Route, Hashable], _GroupLock] = {}
+
+    @property
+    def concurrent(self) -> bool:
+        """Whether consumers keep taking messages of some routes while previous ones are still being processed.
+
+        This mode is enabled for all the routes by setting `max_in_flight` in the dispatcher, and only
+        for the routes with a `max_in_flight` or a `concurrency_limit` otherwise. Messages of the other
+        routes are processed by the consumers themselves, so `workers` still bounds them.
+        """
+        return self.max_in_flight is not None or any(
+            route.max_in_flight is not None or route.concurrency_limit is not None for route in self.routes
+        )
 
     async def _dispatch_message(self, message: Any, route: Route) -> bool:
         logger.debug("dispatching message to route=%s", route)
@@ -46,8 +122,9 @@ class Dispatcher(AbstractDispatcher):
         try:
             confirm_message = await route.deliver(message)
         except asyncio.CancelledError:
-            msg = '"{!r}" was cancelled, the message will not be acknowledged:\n{}\n'
+            msg = '"{!r}" was cancelled, the message will be released:\n{}\n'
             logger.warning(msg.format(route.handler, message))
+            await self._release([message], route)
             raise
         except Exception as exc:
             logger.exception("%r", exc)  # noqa: TRY401
@@ -56,69 +133,518 @@ class Dispatcher(AbstractDispatcher):
 
         return confirm_message
 
+    def _record_outcome(self, route: Route, latency: float, confirmations: list[bool]):
+        """Feed the route adaptive concurrency limit and circuit breaker with the handling results."""
+        if (concurrency_limit := route.concurrency_limit) is not None:
+            limit = concurrency_limit.limit
+            concurrency_limit.record(latency, success=all(confirmations))
+            if self.metrics is not None and concurrency_limit.limit != limit:
+                self.metrics.concurrency_limit_changed(route.name, concurrency_limit.limit)
+
+        if (circuit_breaker := route.circuit_breaker) is not None:
+            state = circuit_breaker.state
+            for confirmation in confirmations:
+                circuit_breaker.record(success=bool(confirmation))
+
+            if circuit_breaker.state != state:
+                logger.warning("circuit of route=%s is now %s", route.name, circuit_breaker.state)
+                if self.metrics is not None:
+                    self.metrics.circuit_state_changed(route.name, circuit_breaker.state)
+
     async def _process_message(self, message: Any, route: Route) -> bool:
-        if confirmation := await self._dispatch_message(message, route):
+        if route.concurrency_limit is None and route.circuit_breaker is None:
+            confirmation = await self._dispatch_message(message, route)
+        else:
+            start = time.perf_counter()
+            confirmation = await self._dispatch_message(message, route)
+            self._record_outcome(route, time.perf_counter() - start, [confirmation])
+
+        if confirmation:
             await route.provider.confirm_message(message)
+            if self.metrics is not None:
+                self.metrics.message_acknowledged(route.name)
         else:
-            await route.provider.message_not_processed(message)
+            await self._reject(message, route)
+            if self.metrics is not None:
+                self.metrics.message_rejected(route.name)
 
         return confirmation
 
+    @asynccontextmanager
+    async def _lock_group(self, route: Route, key: Hashable | None) -> AsyncIterator[None]:
+        """Hold the group, so its messages fetched in different receives are still processed in order."""
+        if key is None:
+            yield
+            return
+
+        group_lock = self._group_locks.get((route, key))
+        if group_lock is None:
+            group_lock = self._group_locks[route, key] = _GroupLock()
+
+        group_lock.users += 1
+        try:
+            async with group_lock.lock:
+                yield
+        finally:
+            group_lock.users -= 1
+            if not group_lock.users:
+                del self._group_locks[route, key]
+
+    async def _process_group(self, messages: list, route: Route) -> list[bool]:
+        """Process the messages of a group of an ordered route one at a time, in order.
+
+        After a failure, the following messages are returned to the provider without being processed.
+        """
+        confirmations = []
+        async with self._lock_group(route, route.group_key(messages[0])):
+            for position, message in enumerate(messages):
+                try:
+                    confirmation = await self._process_message(message, route)
+                except asyncio.CancelledError:
+                    await self._release(messages[position + 1 :], route)
+                    raise
+
+                confirmations.append(confirmation)
+                if confirmation:
+                    continue
+
+                skipped = messages[position + 1 :]
+                if skipped:
+                    logger.warning(
+                        "message group blocked on route=%s, %d messages will be redelivered", route.name, len(skipped)
+                    )
+                for skipped_message in skipped:
+                    await route.provider.message_not_processed(skipped_message)
+                    confirmations.append(False)
+                break
+
+        return confirmations
+
+    def _group(self, route: Route, messages: list) -> list[list]:
+        """Split the messages of an ordered route by group, keeping their order."""
+        groups: dict[Hashable, list] = {}
+        ungrouped = []
+        for message in messages:
+            key = route.group_key(message)
+            if key is None:
+                ungrouped.append([message])
+            else:
+                groups.setdefault(key, []).append(message)
+
+        return [*groups.values(), *ungrouped]
+
+    async def _release(self, messages: Sequence, route: Route):
+        """Give back messages that were fetched but will not be processed, so they are redelivered right away."""
+        if not messages:
+            return
+
+        results = await asyncio.gather(
+            *(route.provider.release_message(message) for message in messages), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning("could not release message of route=%s, error=%r", route.name, result)
+
+    async def _release_buffered(self, scheduler: AbstractScheduler):
+        """Release the buffered messages that no consumer started to process, and their route slots."""
+        items = await scheduler.drain()
+        if not items:
+            return
+
+        logger.info("releasing %d buffered items not processed yet", len(items))
+        async with asyncio.TaskGroup() as tg:
+            for item, route in items:
+                self._release_limits(self._slot_limits(route))
+                tg.create_task(self._release_item(item, route))
+
+    def _release_item(self, item: Any, route: Route):
+        """Release the messages of a scheduler item: a message, or a list of them for batches and groups."""
+        return self._release(item if isinstance(route, BatchRoute) or route.ordered else [item], route)
+
+    async def _reject(self, message: Any, route: Route):
+        if route.retry_policy is None:
+            await route.provider.message_not_processed(message)
+            return
+
+        dead_lettered = await route.retry_policy.reject(message, route.provider)
+        if dead_lettered and self.metrics is not None:
+            self.metrics.message_dead_lettered(route.name)
+
+    async def _dispatch_batch(self, messages: list, route: BatchRoute) -> list[bool]:
+        logger.debug("dispatching batch to route=%s, size=%d", route, len(messages))
+        confirmations = [False] * len(messages)
+        positions = [position for position, message in enumerate(messages) if message]
+
+        if len(positions) != len(messages):
+            logger.warning("empty messages will be ignored on batch of route=%s", route)
+
+        if not positions:
+            return confirmations
+
+        try:
+            delivered = await route.deliver_batch([messages[position] for position in positions])
+        except asyncio.CancelledError:
+            msg = '"{!r}" was cancelled, the batch of {} messages will be released\n'
+            logger.warning(msg.format(route.handler, len(positions)))
+            await self._release([messages[position] for position in positions], route)
+            raise
+
+        for position, confirmation in zip(positions, delivered, strict=True):
+            confirmations[position] = confirmation
+
+        return confirmations
+
+    async def _process_batch(self, messages: list, route: BatchRoute) -> list[bool]:
+        if route.concurrency_limit is None and route.circuit_breaker is None:
+            confirmations = await self._dispatch_batch(messages, route)
+        else:
+            start = time.perf_counter()
+            confirmations = await self._dispatch_batch(messages, route)
+            self._record_outcome(route, time.perf_counter() - start, confirmations)
+
+        async with asyncio.TaskGroup() as tg:
+            for message, confirmation in zip(messages, confirmations, strict=True):
+                if confirmation:
+                    tg.create_task(route.provider.confirm_message(message))
+                else:
+                    tg.create_task(self._reject(message, route))
+
+        if self.metrics is not None:
+            acknowledged = sum(1 for confirmation in confirmations if confirmation)
+            self.metrics.message_acknowledged(route.name, acknowledged)
+            self.metrics.message_rejected(route.name, len(confirmations) - acknowledged)
+
+        return confirmations
+
     def _check_cancellation(self, cancellation_token: asyncio.Event | None) -> bool:
         return cancellation_token is not None and cancellation_token.is_set()
 
+    def _has_demand(self, scheduler: AbstractScheduler, route: Route, state: _PollingState, poller: int) -> bool:
+        return state.hot and scheduler.free_slots(route) >= poller * state.max_batch
+
+    async def _receive(self, scheduler: AbstractScheduler, route: Route, state: _PollingState, poller: int) -> list:
+        """Fetch messages from the route provider.
+
+        The first poller of a route always fetches. Additional pollers only join while the
+        previous receive was full and the route buffer in the scheduler has room for their messages.
+        After empty receives, the poller sleeps for an exponential backoff with full jitter
+        bounded by `route.max_poll_backoff`.
+        """
+        if route.circuit_breaker is not None and (retry_after := route.circuit_breaker.retry_after()) > 0:
+            # the circuit is open, stop pulling messages the route cannot process
+            await asyncio.sleep(min(retry_after, CIRCUIT_CHECK_INTERVAL))
+            return []
+
+        if poller and not self._has_demand(scheduler, route, state, poller):
+            await asyncio.sleep(IDLE_POLLER_INTERVAL * random.uniform(0.5, 1.5))  # noqa: S311
+            return []
+
+        rate_limits = [limit for limit in (route.rate_limit, self.rate_limit) if limit is not None]
+        if not rate_limits:
+            messages = await self._fetch(route)
+        else:
+            # take the tokens before fetching, so messages that cannot be processed yet stay in the queue
+            reserved, received = state.max_batch, 0
+            for rate_limit in rate_limits:
+                await rate_limit.acquire(reserved)
+
+            try:
+                messages = await self._fetch(route)
+                received = len(messages)
+            finally:
+                for rate_limit in rate_limits:
+                    rate_limit.settle(reserved, received)
+
+        state.update(len(messages))
+
+        if not messages and route.max_poll_backoff:
+            backoff = min(route.max_poll_backoff, POLL_BACKOFF_BASE * 2 ** (state.empty_receives - 1))
+            await asyncio.sleep(random.uniform(0, backoff))  # noqa: S311
+
+        return messages
+
+    async def _fetch(self, route: Route) -> list:
+        if self.metrics is None:
+            return await route.provider.fetch_messages()
+
+        start = time.perf_counter()
+        messages = await route.provider.fetch_messages()
+        self.metrics.messages_fetched(route.name, len(messages), time.perf_counter() - start)
+        return messages
+
     async def _fetch_messages(
         self,
-        processing_queue: asyncio.Queue,
+        scheduler: AbstractScheduler,
         route: Route,
         *,
         cancellation_token: asyncio.Event | None = None,
         forever: bool = True,
+        state: _PollingState | None = None,
+        poller: int = 0,
     ):
+        state = state or _PollingState()
+
         while not self._check_cancellation(cancellation_token):
-            messages = await route.provider.fetch_messages()
-            for message in messages:
-                await processing_queue.put((message, route))
+            messages = await self._receive(scheduler, route, state, poller)
+            items = self._group(route, messages) if route.ordered else messages
+            for position, item in enumerate(items):
+                try:
+                    await self._schedule(scheduler, item, route, cost=len(item) if route.ordered else 1)
+                except asyncio.CancelledError:
+                    # the pollers are cancelled on shutdown, give back the messages not buffered yet
+                    pending = items[position:]
+                    await self._release([*chain.from_iterable(pending)] if route.ordered else pending, route)
+                    raise
 
             if not forever:
                 break
 
-    async def _consume_messages(self, processing_queue: asyncio.Queue, tg: asyncio.TaskGroup) -> None:
+    async def _fetch_batches(
+        self,
+        scheduler: AbstractScheduler,
+        route: BatchRoute,
+        *,
+        cancellation_token: asyncio.Event | None = None,
+        forever: bool = True,
+        state: _PollingState | None = None,
+        poller: int = 0,
+    ):
+        loop = asyncio.get_running_loop()
+        state = state or _PollingState()
+        buffer: list = []
+        deadline = 0.0
+        # the receive runs in a task, so a partial batch is flushed at its deadline even while long polling
+        receiving: asyncio.Task | None = None
+
+        try:
+            while not self._check_cancellation(cancellation_token):
+                if receiving is None:
+                    receiving = asyncio.create_task(self._receive(scheduler, route, state, poller))
+
+                timeout = max(deadline - loop.time(), 0) if buffer and forever else None
+                await asyncio.wait([receiving], timeout=timeout)
+                if receiving.done():
+                    messages = receiving.result()
+                    receiving = None
+                else:
+                    # the batch window ended during the receive, the partial batch is flushed below
+                    messages = []
+
+                if messages and not buffer:
+                    deadline = loop.time() + route.batch_window
+
+                buffer.extend(messages)
+                while len(buffer) >= route.batch_size:
+                    await self._schedule(scheduler, buffer[: route.batch_size], route, cost=route.batch_size)
+                    del buffer[: route.batch_size]
+
+                if buffer and (not forever or loop.time() >= deadline):
+                    await self._schedule(scheduler, buffer, route, cost=len(buffer))
+                    buffer = []
+
+                if not forever:
+                    break
+
+            if receiving is not None:
+                messages = await self._stop_receiving(receiving)
+                receiving = None
+                buffer.extend(messages)
+
+            if buffer:
+                await self._schedule(scheduler, buffer, route, cost=len(buffer))
+        except asyncio.CancelledError:
+            # the pollers are cancelled on shutdown, give back the messages not buffered yet
+            if receiving is not None:
+                buffer.extend(await self._stop_receiving(receiving))
+
+            await self._release(buffer, route)
+            raise
+        finally:
+            if receiving is not None:
+                receiving.cancel()
+
+    async def _stop_receiving(self, receiving: asyncio.Task) -> list:
+        """Cancel a pending receive, returning the messages it got if it completed first."""
+        receiving.cancel()
+        await asyncio.wait([receiving])
+        if receiving.cancelled() or receiving.exception() is not None:
+            return []
+
+        return receiving.result()
+
+    def _processor(self, route: Route) -> Callable[[Any, Any], Coroutine[Any, Any, Any]]:
+        if isinstance(route, BatchRoute):
+            return self._process_batch
+
+        if route.ordered:
+            return self._process_group
+
+        return self._process_message
+
+    def _process(self, item: Any, route: Route):
+        process = self._processor(route)
+        if self.metrics is None:
+            return process(item, route)
+
+        return self._track_in_flight(self.metrics, process, item, route)
+
+    async def _track_in_flight(self, metrics: Metrics, process, item: Any, route: Route):
+        count = len(item) if isinstance(route, BatchRoute) or route.ordered else 1
+
+        self._in_flight[route] += count
+        metrics.in_flight_changed(route.name, self._in_flight[route])
+        try:
+            return await process(item, route)
+        finally:
+            self._in_flight[route] -= count
+            metrics.in_flight_changed(route.name, self._in_flight[route])
+
+    def _slot_limits(self, route: Route) -> list[asyncio.Semaphore | AdaptiveConcurrencyLimit]:
+        """Return the limits of the route, whose slots are taken before its items are scheduled."""
+        return [limit for limit in (self._route_limits.get(route), route.concurrency_limit) if limit is not None]
+
+    async def _acquire_limits(self, limits: list[asyncio.Semaphore | AdaptiveConcurrencyLimit]):
+        acquired: list[asyncio.Semaphore | AdaptiveConcurrencyLimit] = []
+
+        try:
+            for limit in limits:
+                await limit.acquire()
+                acquired.append(limit)
+        except asyncio.CancelledError:
+            self._release_limits(acquired)
+            raise
+
+    def _release_limits(self, limits: list[asyncio.Semaphore | AdaptiveConcurrencyLimit]):
+        for limit in limits:
+            limit.release()
+
+    async def _schedule(self, scheduler: AbstractScheduler, item: Any, route: Route, *, cost: int):
+        """Put an item in the scheduler once its route has a free slot.
+
+        The scheduler never hands out items of a saturated route, so consumers do not hold
+        them while the other routes wait.
+        """
+        limits = self._slot_limits(route)
+        await self._acquire_limits(limits)
+
+        try:
+            await scheduler.put(item, route, cost=cost)
+        except asyncio.CancelledError:
+            self._release_limits(limits)
+            raise
+
+    def _release_slot(
+        self,
+        limits: list[asyncio.Semaphore | AdaptiveConcurrencyLimit],
+        scheduler: AbstractScheduler,
+        _: asyncio.Task | None,
+    ):
+        self._release_limits(limits)
+        scheduler.task_done()
+
+    async def _consume_messages(
+        self,
+        scheduler: AbstractScheduler,
+        tg: asyncio.TaskGroup,
+        cancellation_token: asyncio.Event | None = None,
+    ) -> None:
         while True:
-            message, route = await processing_queue.get()
-            task = tg.create_task(self._process_message(message, route))
-            await task
-            processing_queue.task_done()
+            message, route = await scheduler.get()
+
+            # the route slots were taken when the message was scheduled
+            limits = self._slot_limits(route)
+            concurrent = bool(limits)
+            if self._in_flight_limit is not None:
+                try:
+                    await self._in_flight_limit.acquire()
+                except asyncio.CancelledError:
+                    # taken from the scheduler but not started, nothing else would release it
+                    await self._release_item(message, route)
+                    self._release_slot(limits, scheduler, None)
+                    raise
+
+                limits.append(self._in_flight_limit)
+                concurrent = True
+
+            if self._check_cancellation(cancellation_token):
+                # stopping, the message is given back instead of being started
+                await self._release_item(message, route)
+                self._release_slot(limits, scheduler, None)
+                continue
+
+            if not concurrent:
+                # routes without limits are bounded by the consumers
+                task = tg.create_task(self._process(message, route))
+                await task
+                scheduler.task_done()
+                continue
+
+            task = tg.create_task(self._process(message, route))
+            task.add_done_callback(partial(self._release_slot, limits, scheduler))
 
     @override
     async def dispatch(self, *, cancellation_token: asyncio.Event | None = None, forever: bool = True):
-        processing_queue: asyncio.Queue[tuple[Any, Route]] = asyncio.Queue(self.queue_size)
+        scheduler = FairScheduler(
+            self.routes,
+            default_queue_size=max(self.queue_size // len(self.routes), 1),
+            metrics=self.metrics,
+        )
+
+        self._in_flight_limit = asyncio.Semaphore(self.max_in_flight) if self.max_in_flight else None
+        self._route_limits = {
+            route: asyncio.Semaphore(route.max_in_flight) for route in self.routes if route.max_in_flight
+        }
 
         async with AsyncExitStack() as exit_stack:
             for route in self.routes:
                 await exit_stack.enter_async_context(route)
 
             async with asyncio.TaskGroup() as tg:
-                provider_tasks = [
-                    tg.create_task(
-                        self._fetch_messages(
-                            processing_queue,
-                            route,
-                            cancellation_token=cancellation_token,
-                            forever=forever,
+                provider_tasks: list[asyncio.Task] = []
+                for route in self.routes:
+                    fetch: Callable[..., Coroutine[Any, Any, None]] = (
+                        self._fetch_batches if isinstance(route, BatchRoute) else self._fetch_messages
+                    )
+                    state = _PollingState()
+                    provider_tasks.extend(
+                        tg.create_task(
+                            fetch(
+                                scheduler,
+                                route,
+                                cancellation_token=cancellation_token,
+                                forever=forever,
+                                state=state,
+                                poller=poller,
+                            )
                         )
+                        for poller in range(route.pollers)
                     )
-                    for route in self.routes
-                ]
+
                 consumer_tasks = [
-                    tg.create_task(self._consume_messages(processing_queue, tg)) for _ in range(self.workers)
+                    tg.create_task(self._consume_messages(scheduler, tg, cancellation_token))
+                    for _ in range(self.workers)
                 ]
 
+                stop_task = None
+                if cancellation_token is not None:
+
+                    async def stop_polling():
+                        await cancellation_token.wait()
+                        logger.info("stopping pollers, draining in-flight messages")
+                        for provider_task in provider_tasks:
+                            provider_task.cancel()
+
+                    stop_task = tg.create_task(stop_polling())
+
                 async def join():
                     await asyncio.wait(provider_tasks)
-                    await processing_queue.join()
+                    if self._check_cancellation(cancellation_token):
+                        await self._release_buffered(scheduler)
+                    await scheduler.join()
 
                     for consumer_task in consumer_tasks:
                         consumer_task.cancel()
+                    if stop_task is not None:
+                        stop_task.cancel()
 
                 tg.create_task(join())
@@ -1,3 +1,11 @@
-from .routes import SQSRoute
+from typing import TYPE_CHECKING
 
-__all__ = ["SQSRoute"]
+from pyinsole._imports import lazy_getattr
+
+if TYPE_CHECKING:
+    from .routes import SQSBatchRoute, SQSRoute  # noqa: TC004
+
+__all__ = ["SQSBatchRoute", "SQSRoute"]
+
+# botocore and its service models are only imported when the routes are first used
+__getattr__ = lazy_getattr(__name__, {"SQSBatchRoute": ".routes", "SQSRoute": ".routes"})
@@ -1,10 +1,124 @@
+import asyncio
+import functools
+import hashlib
 import logging
+from collections.abc import AsyncIterator, Callable, Hashable
+from contextlib import AbstractAsyncContextManager, asynccontextmanager
+from typing import TYPE_CHECKING, Any
 
-from aiobotocore.session import get_session
+if TYPE_CHECKING:
+    from aiobotocore.config import AioConfig  # type: ignore[import-untyped]
+    from aiobotocore.session import AioSession
 
 logger = logging.getLogger(__name__)
 
-session = get_session()
+# client options that are only kept hashed in the client keys, which are logged
+SECRET_CLIENT_OPTIONS = frozenset({"aws_secret_access_key", "aws_session_token"})
+
+
+@functools.cache
+def get_session() -> "AioSession":
+    """Return the session shared by the providers, created (with aiobotocore imported) on first use."""
+    from aiobotocore.session import get_session
+
+    return get_session()
+
+
+def __getattr__(name: str) -> Any:
+    # the session used to be created on import, keep `session` available as a module attribute
+    if name == "session":
+        return get_session()
+
+    msg = f"module {__name__!r} has no attribute {name!r}"
+    raise AttributeError(msg)
+
+
+class _SharedClient:
+    __slots__ = ("client", "context", "references")
+
+    def __init__(self, context: AbstractAsyncContextManager, client: Any):
+        self.context = context
+        self.client = client
+        self.references = 0
+
+
+class ClientRegistry:
+    """Reference-counted clients shared between the providers with the same client options.
+
+    A client (and its connection pool) is created when the first provider using its options
+    is opened and closed when the last one is closed.
+    """
+
+    def __init__(self):
+        self._clients: dict[Hashable, _SharedClient] = {}
+        self._lock = asyncio.Lock()
+
+    def __len__(self):
+        return len(self._clients)
+
+    async def acquire(self, key: Hashable, factory: Callable[[], AbstractAsyncContextManager]) -> Any:
+        async with self._lock:
+            shared = self._clients.get(key)
+            if shared is None:
+                context = factory()
+                shared = _SharedClient(context, await context.__aenter__())
+                self._clients[key] = shared
+                logger.debug("created shared client key=%r", key)
+
+            shared.references += 1
+            return shared.client
+
+    async def release(self, key: Hashable):
+        async with self._lock:
+            shared = self._clients[key]
+            shared.references -= 1
+            if shared.references:
+                return
+
+            del self._clients[key]
+            logger.debug("closing shared client key=%r", key)
+            await shared.context.__aexit__(None, None, None)
+
+    @asynccontextmanager
+    async def client(self, key: Hashable, factory: Callable[[], AbstractAsyncContextManager]) -> AsyncIterator[Any]:
+        client = await self.acquire(key, factory)
+        try:
+            yield client
+        finally:
+            await self.release(key)
+
+
+clients = ClientRegistry()
+
+
+class _ClientKey:
+    """Key of the shared clients, with the credentials hashed and only described by service, region and endpoint."""
+
+    __slots__ = ("_values", "endpoint_url", "region_name", "service_name")
+
+    def __init__(self, service_name: str | None, options: dict, pool_options: dict):
+        self.service_name = service_name
+        self.region_name = options.get("region_name")
+        self.endpoint_url = options.get("endpoint_url")
+        self._values = (
+            service_name,
+            *(
+                (name, hashlib.sha256(value.encode()).hexdigest())
+                if name in SECRET_CLIENT_OPTIONS and value is not None
+                else (name, value)
+                for name, value in options.items()
+            ),
+            *pool_options.items(),
+        )
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, _ClientKey) and self._values == other._values
+
+    def __hash__(self) -> int:
+        return hash(self._values)
+
+    def __repr__(self) -> str:
+        return f"<client service={self.service_name} region={self.region_name} endpoint={self.endpoint_url}>"
 
 
 class _BotoProvider:
@@ -21,9 +135,45 @@ class _BotoProvider:
             "use_ssl": client_options.get("use_ssl", True),
             "verify": client_options.get("verify"),
         }
+        # connection pool settings, the aiobotocore defaults are used when unset
+        self._pool_options = {
+            "max_pool_connections": client_options.get("max_pool_connections"),
+            "keepalive_timeout": client_options.get("keepalive_timeout"),
+        }
+        self._shared_client = client_options.get("shared_client", True)
+
+    def _client_config(self) -> "AioConfig | None":
+        max_pool_connections = self._pool_options["max_pool_connections"]
+        keepalive_timeout = self._pool_options["keepalive_timeout"]
+        if max_pool_connections is None and keepalive_timeout is None:
+            return None
+
+        from aiobotocore.config import AioConfig
+
+        config = {}
+        if max_pool_connections is not None:
+            config["max_pool_connections"] = max_pool_connections
+        if keepalive_timeout is not None:
+            config["connector_args"] = {"keepalive_timeout": keepalive_timeout}
+        return AioConfig(**config)
 
     def get_client(self):
-        return session.create_client(self.boto_service_name, **self._client_options)
+        session = get_session()
+        config = self._client_config()
+        if config is None:
+            return session.create_client(self.boto_service_name, **self._client_options)
+
+        return session.create_client(self.boto_service_name, config=config, **self._client_options)
+
+    def _client_key(self) -> _ClientKey:
+        return _ClientKey(self.boto_service_name, self._client_options, self._pool_options)
+
+    def use_client(self) -> AbstractAsyncContextManager:
+        """Return a context manager giving a client, shared with the providers with the same options if enabled."""
+        if not self._shared_client:
+            return self.get_client()
+
+        return clients.client(self._client_key(), self.get_client)
 
 
 class BaseSQSProvider(_BotoProvider):
@@ -1,34 +1,359 @@
+import abc
+import asyncio
 import logging
-from contextlib import AsyncExitStack
+import time
+from collections.abc import Callable, Sequence
+from contextlib import AsyncExitStack, suppress
 from http import HTTPStatus
 
 import botocore.exceptions
 
 from pyinsole.exceptions import ProviderError
+from pyinsole.metrics import Metrics
 from pyinsole.providers import AbstractProvider
 
 from .base import BaseSQSProvider
 
 logger = logging.getLogger(__name__)
 
+# SQS accepts at most 10 entries per batch request
+SQS_MAX_BATCH_SIZE = 10
+# maximum visibility timeout of a SQS message, in seconds
+SQS_MAX_VISIBILITY_TIMEOUT = 43200
+# system attributes that can be requested when receiving SQS messages
+SQS_SYSTEM_ATTRIBUTES = frozenset(
+    {
+        "All",
+        "AWSTraceHeader",
+        "ApproximateFirstReceiveTimestamp",
+        "ApproximateReceiveCount",
+        "DeadLetterQueueSourceArn",
+        "MessageDeduplicationId",
+        "MessageGroupId",
+        "SenderId",
+        "SentTimestamp",
+        "SequenceNumber",
+    }
+)
+
+
+def _merge_names(requested: list[str], names: Sequence[str]) -> list[str]:
+    return [*requested, *(name for name in dict.fromkeys(names) if name not in requested)]
+
+
+class _SQSBatcher(abc.ABC):
+    """Accumulate entries for a SQS batch action and send them in a single request.
+
+    A batch is sent as soon as `batch_size` entries are pending or when `window` seconds
+    have passed since the first pending entry. Every call to `submit` waits for the result
+    of its own entry in the batch response, while `submit_nowait` only queues the entry:
+    its failures are logged.
+    """
+
+    # name of the SQS batch action, used in the metrics
+    operation: str
+    # per-entry error codes that should be treated as a success
+    ignored_error_codes: frozenset[str] = frozenset()
+
+    def __init__(
+        self,
+        client,
+        queue_url: str,
+        *,
+        batch_size: int = SQS_MAX_BATCH_SIZE,
+        window: float = 0.1,
+        metrics: Metrics | None = None,
+        provider_name: str | None = None,
+    ):
+        if not 1 <= batch_size <= SQS_MAX_BATCH_SIZE:
+            msg = f"batch_size must be between 1 and {SQS_MAX_BATCH_SIZE}: {batch_size!r}"
+            raise ValueError(msg)
+
+        self.client = client
+        self.queue_url = queue_url
+        self.batch_size = batch_size
+        self.window = window
+        self.metrics = metrics
+        self.provider_name = provider_name or queue_url
+
+        self._pending: list[tuple[dict, asyncio.Future | None]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    @abc.abstractmethod
+    async def _send_batch(self, entries: list[dict]) -> dict:
+        """Send the given entries with the SQS batch action and return its response."""
+
+    async def submit(self, **entry) -> bool:
+        future = asyncio.get_running_loop().create_future()
+        self._add(entry, future)
+        return await future
+
+    def submit_nowait(self, **entry):
+        self._add(entry, None)
+
+    def _add(self, entry: dict, future: asyncio.Future | None):
+        self._pending.append((entry, future))
+
+        if len(self._pending) >= self.batch_size:
+            self._flush_ready()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush_all)
+
+    def _flush_ready(self):
+        while len(self._pending) >= self.batch_size:
+            self._schedule(self._pending[: self.batch_size])
+            del self._pending[: self.batch_size]
+
+        if not self._pending:
+            self._cancel_timer()
+
+    def _flush_all(self):
+        self._timer = None
+        self._flush_ready()
+
+        if self._pending:
+            self._schedule(self._pending)
+            self._pending = []
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _schedule(self, batch: list[tuple[dict, asyncio.Future | None]]):
+        task = asyncio.create_task(self._send(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, batch: list[tuple[dict, asyncio.Future | None]]):
+        futures = {str(index): future for index, (_, future) in enumerate(batch)}
+        entries = [{"Id": str(index), **entry} for index, (entry, _) in enumerate(batch)]
+
+        start = time.perf_counter()
+        try:
+            response = await self._send_batch(entries)
+        except botocore.exceptions.ClientError as exc:
+            if exc.response["ResponseMetadata"]["HTTPStatusCode"] == HTTPStatus.NOT_FOUND:
+                self._resolve(futures.values(), True)
+            else:
+                self._fail(futures.values(), exc)
+            return
+        except Exception as exc:  # noqa: BLE001
+            self._fail(futures.values(), exc)
+            return
+        finally:
+            if self.metrics is not None:
+                self.metrics.provider_request(self.provider_name, self.operation, time.perf_counter() - start)
+
+        for entry in response.get("Successful", []):
+            self._resolve([futures.pop(entry["Id"])], True)
+
+        for entry in response.get("Failed", []):
+            future = futures.pop(entry["Id"])
+            if entry.get("Code") in self.ignored_error_codes:
+                self._resolve([future], True)
+                continue
+
+            msg = f"error on batch entry of queue={self.queue_url}: {entry!r}"
+            self._fail([future], ProviderError(msg))
+
+        if futures:
+            msg = f"missing batch entries on response of queue={self.queue_url}: {list(futures)!r}"
+            self._fail(futures.values(), ProviderError(msg))
+
+    def _resolve(self, futures, result):
+        for future in futures:
+            if future is not None and not future.done():
+                future.set_result(result)
+
+    def _fail(self, futures, exc: BaseException):
+        queued = 0
+        for future in futures:
+            if future is None:
+                queued += 1
+            elif not future.done():
+                future.set_exception(exc)
+
+        if queued:
+            # nobody waits for the entries queued with `submit_nowait`
+            logger.error("%s failed for %d entries of queue=%s: %r", self.operation, queued, self.queue_url, exc)
+
+    async def flush(self):
+        """Send all pending entries and wait for every in-flight batch request."""
+        self._cancel_timer()
+        self._flush_all()
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+class SQSAckBatcher(_SQSBatcher):
+    """Confirm messages in batches using `DeleteMessageBatch`."""
+
+    operation = "delete_message_batch"
+    ignored_error_codes = frozenset({"ReceiptHandleIsInvalid"})
+
+    async def _send_batch(self, entries: list[dict]) -> dict:
+        logger.debug("confirm messages (ack/deletion) in batch, queue=%s, size=%d", self.queue_url, len(entries))
+        return await self.client.delete_message_batch(QueueUrl=self.queue_url, Entries=entries)
+
+    def confirm(self, receipt: str) -> bool:
+        """Queue the deletion of a message, without waiting for it."""
+        self.submit_nowait(ReceiptHandle=receipt)
+        return True
+
+
+class SQSVisibilityBatcher(_SQSBatcher):
+    """Change the visibility timeout of messages in batches using `ChangeMessageVisibilityBatch`."""
+
+    operation = "change_message_visibility_batch"
+    ignored_error_codes = frozenset({"ReceiptHandleIsInvalid"})
+
+    async def _send_batch(self, entries: list[dict]) -> dict:
+        logger.debug("changing visibility timeout in batch, queue=%s, size=%d", self.queue_url, len(entries))
+        return await self.client.change_message_visibility_batch(QueueUrl=self.queue_url, Entries=entries)
+
+    async def change_visibility(self, receipt: str, visibility_timeout: int) -> bool:
+        return await self.submit(ReceiptHandle=receipt, VisibilityTimeout=visibility_timeout)
+
 
 class SQSProvider(AbstractProvider, BaseSQSProvider):
-    def __init__(self, queue_url, options=None, **kwargs):
+    """Provider of the messages of a SQS queue.
+
+    `message_attributes` (names, `prefix.*` patterns or `All`) and `system_attributes` (e.g.
+    `SentTimestamp`) select the attributes requested on receive, in addition to the ones in
+    `options`. SQS returns no attributes by default, so only the declared ones are sent.
+    """
+
+    def __init__(
+        self,
+        queue_url,
+        options=None,
+        *,
+        batch_acks: bool = False,
+        ack_batch_window: float = 0.1,
+        visibility_heartbeat: bool = False,
+        heartbeat_interval: float | None = None,
+        nack_visibility_timeout: int | Callable[[dict], int] | None = None,
+        idle_wait_time: int | None = None,
+        message_attributes: Sequence[str] | None = None,
+        system_attributes: Sequence[str] | None = None,
+        **kwargs,
+    ):
         self.queue_url = queue_url
         self._options = options or {}
+
+        if isinstance(message_attributes, str) or isinstance(system_attributes, str):
+            msg = "message_attributes and system_attributes must be sequences of names"
+            raise TypeError(msg)
+
+        if message_attributes:
+            requested = self._options.get("MessageAttributeNames", [])
+            self._options = {**self._options, "MessageAttributeNames": _merge_names(requested, message_attributes)}
+
+        if system_attributes:
+            unknown = set(system_attributes) - SQS_SYSTEM_ATTRIBUTES
+            if unknown:
+                msg = f"unknown SQS system attributes: {sorted(unknown)!r}"
+                raise ValueError(msg)
+
+            requested = self._options.get("MessageSystemAttributeNames", [])
+            self._options = {
+                **self._options,
+                "MessageSystemAttributeNames": _merge_names(requested, system_attributes),
+            }
         self._client = kwargs.get("sqs_client")
+        self._batch_acks = batch_acks
+        self._ack_batch_window = ack_batch_window
+        self._ack_batcher: SQSAckBatcher | None = None
+
+        self._visibility_heartbeat = visibility_heartbeat
+        self._heartbeat_interval = heartbeat_interval
+        self._nack_visibility_timeout = nack_visibility_timeout
+        self._visibility_timeout: int | None = self._options.get("VisibilityTimeout")
+        self._visibility_batcher: SQSVisibilityBatcher | None = None
+        self._heartbeat_task: asyncio.Task | None = None
+        # receipt handle -> loop time when the message becomes visible again
+        self._in_flight: dict[str, float] = {}
+
+        # adaptive long polling: short polls while messages are flowing, long polls once the queue is empty
+        self._idle_wait_time = idle_wait_time if "WaitTimeSeconds" not in self._options else None
+        self._idle = False
 
         super().__init__(**kwargs)
 
     def __str__(self):
         return f"<{type(self).__name__}: {self.queue_url}>"
 
+    async def _request(self, operation: str, **kwargs):
+        method = getattr(self._client, operation)
+        if self.metrics is None:
+            return await method(**kwargs)
+
+        start = time.perf_counter()
+        try:
+            return await method(**kwargs)
+        finally:
+            self.metrics.provider_request(str(self), operation, time.perf_counter() - start)
+
     async def confirm_message(self, message):
         receipt = message["ReceiptHandle"]
-        logger.info("confirm message (ack/deletion), receipt=%r", receipt)
+        logger.debug("confirm message (ack/deletion), receipt=%r", receipt)
+        self._in_flight.pop(receipt, None)
+
+        if self._ack_batcher is not None:
+            return self._ack_batcher.confirm(receipt)
 
         try:
-            return await self._client.delete_message(QueueUrl=self.queue_url, ReceiptHandle=receipt)
+            return await self._request("delete_message", QueueUrl=self.queue_url, ReceiptHandle=receipt)
+        except botocore.exceptions.ClientError as exc:
+            if exc.response["ResponseMetadata"]["HTTPStatusCode"] == HTTPStatus.NOT_FOUND:
+                return True
+
+            raise
+
+    async def message_not_processed(self, message):
+        receipt = message["ReceiptHandle"]
+        self._in_flight.pop(receipt, None)
+
+        if self._nack_visibility_timeout is None:
+            return None
+
+        visibility_timeout = self._nack_visibility_timeout
+        if callable(visibility_timeout):
+            visibility_timeout = visibility_timeout(message)
+
+        logger.debug("changing visibility timeout of message not processed, receipt=%r", receipt)
+        return await self.change_message_visibility(message, visibility_timeout)
+
+    async def retry_message(self, message, delay: float):
+        self._in_flight.pop(message["ReceiptHandle"], None)
+        visibility_timeout = min(int(delay), SQS_MAX_VISIBILITY_TIMEOUT)
+        logger.debug("retrying message in %ds, receipt=%r", visibility_timeout, message["ReceiptHandle"])
+        return await self.change_message_visibility(message, visibility_timeout)
+
+    async def send_message(self, message):
+        request = {"QueueUrl": self.queue_url, "MessageBody": message["Body"]}
+        if message.get("MessageAttributes"):
+            request["MessageAttributes"] = message["MessageAttributes"]
+
+        # FIFO queues require a group, keep the one of the original message
+        group_id = message.get("Attributes", {}).get("MessageGroupId")
+        if group_id is not None:
+            request["MessageGroupId"] = group_id
+            request["MessageDeduplicationId"] = message["MessageId"]
+
+        return await self._request("send_message", **request)
+
+    async def change_message_visibility(self, message, visibility_timeout: int):
+        try:
+            return await self._request(
+                "change_message_visibility",
+                QueueUrl=self.queue_url,
+                ReceiptHandle=message["ReceiptHandle"],
+                VisibilityTimeout=visibility_timeout,
+            )
         except botocore.exceptions.ClientError as exc:
             if exc.response["ResponseMetadata"]["HTTPStatusCode"] == HTTPStatus.NOT_FOUND:
                 return True
@@ -37,8 +362,12 @@ class SQSProvider(AbstractProvider, BaseSQSProvider):
 
     async def fetch_messages(self):
         logger.debug("fetching messages on %s", self.queue_url)
+        options = self._options
+        if self._idle_wait_time is not None:
+            options = {**options, "WaitTimeSeconds": self._idle_wait_time if self._idle else 0}
+
         try:
-            response = await self._client.receive_message(QueueUrl=self.queue_url, **self._options)
+            response = await self._request("receive_message", QueueUrl=self.queue_url, **options)
         except (
             botocore.exceptions.BotoCoreError,
             botocore.exceptions.ClientError,
@@ -46,18 +375,100 @@ class SQSProvider(AbstractProvider, BaseSQSProvider):
             msg = f"error fetching messages from queue={self.queue_url}: {exc!s}"
             raise ProviderError(msg) from exc
 
-        return response.get("Messages", [])
+        messages = response.get("Messages", [])
+        self._idle = not messages
+
+        if self._heartbeat_task is not None:
+            deadline = asyncio.get_running_loop().time() + self._visibility_timeout
+            for message in messages:
+                self._in_flight[message["ReceiptHandle"]] = deadline
+
+        return messages
+
+    async def _get_visibility_timeout(self) -> int:
+        response = await self._request(
+            "get_queue_attributes",
+            QueueUrl=self.queue_url,
+            AttributeNames=["VisibilityTimeout"],
+        )
+        return int(response["Attributes"]["VisibilityTimeout"])
+
+    async def _heartbeat(self, interval: float, batcher: SQSVisibilityBatcher, visibility_timeout: int):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            await asyncio.sleep(interval)
+
+            # messages that would become visible before the next beat (with one interval of margin)
+            threshold = loop.time() + interval * 2
+            receipts = [receipt for receipt, deadline in self._in_flight.items() if deadline <= threshold]
+            if receipts:
+                await asyncio.gather(
+                    *(self._extend_visibility(receipt, batcher, visibility_timeout) for receipt in receipts)
+                )
+
+    async def _extend_visibility(self, receipt: str, batcher: SQSVisibilityBatcher, visibility_timeout: int):
+        deadline = asyncio.get_running_loop().time() + visibility_timeout
+
+        try:
+            await batcher.change_visibility(receipt, visibility_timeout)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("unable to extend visibility timeout, receipt=%r: %r", receipt, exc)
+            self._in_flight.pop(receipt, None)
+            return
+
+        # the message may have been confirmed or rejected in the meantime
+        if receipt in self._in_flight:
+            self._in_flight[receipt] = deadline
 
     async def __aenter__(self):
         if not self._client:
             async with AsyncExitStack() as exit_stack:
-                self._client = await exit_stack.enter_async_context(self.get_client())
+                self._client = await exit_stack.enter_async_context(self.use_client())
 
                 self._exit_stack = exit_stack.pop_all()
 
+        if self._batch_acks:
+            self._ack_batcher = SQSAckBatcher(
+                self._client,
+                self.queue_url,
+                window=self._ack_batch_window,
+                metrics=self.metrics,
+                provider_name=str(self),
+            )
+
+        if self._visibility_heartbeat:
+            if self._visibility_timeout is None:
+                self._visibility_timeout = await self._get_visibility_timeout()
+
+            interval = self._heartbeat_interval or max(self._visibility_timeout / 3, 1)
+            # every beat submits all its entries at once, no need to wait for more
+            self._visibility_batcher = SQSVisibilityBatcher(
+                self._client, self.queue_url, window=0, metrics=self.metrics, provider_name=str(self)
+            )
+            self._heartbeat_task = asyncio.create_task(
+                self._heartbeat(interval, self._visibility_batcher, self._visibility_timeout)
+            )
+
         return await super().__aenter__()
 
     async def __aexit__(self, exc_type, exc_value, traceback):
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._heartbeat_task
+
+            self._heartbeat_task = None
+            self._in_flight.clear()
+            await self._visibility_batcher.flush()
+
+        if self._ack_batcher is not None:
+            await self._ack_batcher.flush()
+            self._ack_batcher = None
+
         if hasattr(self, "_exit_stack"):
+            # the client may be shared, it is closed with the last provider using it
             await self._exit_stack.aclose()
+            del self._exit_stack
+            self._client = None
         return await super().__aexit__(exc_type, exc_value, traceback)
@@ -1,14 +1,34 @@
-from collections.abc import Callable
+from collections.abc import Callable, Sequence
 
 from pyinsole.handlers import Handler
-from pyinsole.routes import Route
+from pyinsole.routes import BatchRoute, Route
 from pyinsole.translators import AbstractTranslator
 
 from .providers import SQSProvider
-from .translators import SNSMessageTranslator, SQSMessageTranslator
+from .translators import SNSMessageTranslator, SQSMessageTranslator, _JSONTranslator
+
+
+def _with_system_attribute(provider_options: dict, name: str) -> dict:
+    """Return the provider options with the given system attribute requested on receive."""
+    options = dict(provider_options.get("options") or {})
+    requested = [*options.get("MessageSystemAttributeNames", []), *options.get("AttributeNames", [])]
+    if "All" in requested or name in requested:
+        return provider_options
+
+    options["MessageSystemAttributeNames"] = [*options.get("MessageSystemAttributeNames", []), name]
+    return {**provider_options, "options": options}
 
 
 class SQSRoute(Route):
+    """Route of the messages of a SQS queue.
+
+    `message_attributes` and `system_attributes` declare the attributes the handler needs:
+    only those are requested from SQS and, unless a `translator` is given, they are decoded
+    to their values in the metadata.
+    """
+
+    translator_class: type[_JSONTranslator] = SQSMessageTranslator
+
     def __init__(
         self,
         provider_queue: str,
@@ -17,12 +37,26 @@ class SQSRoute(Route):
         provider_options: dict | None = None,
         error_handler: Callable | None = None,
         translator: AbstractTranslator | None = None,
+        message_attributes: Sequence[str] | None = None,
+        system_attributes: Sequence[str] | None = None,
         **kwargs,
     ):
         provider_options = provider_options or {}
+        if kwargs.get("retry_policy") is not None:
+            # the retry policy counts the attempts from the receive count
+            provider_options = _with_system_attribute(provider_options, "ApproximateReceiveCount")
+        if kwargs.get("ordered") and kwargs.get("group_key") is None:
+            # messages are ordered by their FIFO group
+            provider_options = _with_system_attribute(provider_options, "MessageGroupId")
+        if message_attributes is not None:
+            provider_options = {**provider_options, "message_attributes": message_attributes}
+        if system_attributes is not None:
+            provider_options = {**provider_options, "system_attributes": system_attributes}
         provider = SQSProvider(provider_queue, **provider_options)
 
-        translator = translator or SQSMessageTranslator()
+        translator = translator or self.translator_class(
+            decode_attributes=bool(message_attributes or system_attributes)
+        )
         name = kwargs.pop("name", None) or provider_queue
 
         super().__init__(
@@ -36,22 +70,10 @@ class SQSRoute(Route):
 
 
 class SNSQueueRoute(SQSRoute):
-    def __init__(
-        self,
-        provider_queue: str,
-        handler: Handler,
-        *,
-        provider_options: dict | None = None,
-        error_handler: Callable | None = None,
-        translator: AbstractTranslator | None = None,
-        **kwargs,
-    ):
-        translator = translator or SNSMessageTranslator()
-        super().__init__(
-            provider_queue,
-            handler,
-            provider_options=provider_options,
-            error_handler=error_handler,
-            translator=translator,
-            **kwargs,
-        )
+    """Route of the SNS notifications delivered to a SQS queue, see `SQSRoute`."""
+
+    translator_class = SNSMessageTranslator
+
+
+class SQSBatchRoute(SQSRoute, BatchRoute):
+    """SQS route that delivers batches of messages to the handler, see `BatchRoute`."""
@@ -1,53 +1,141 @@
+import base64
 import json
 import logging
+from typing import Any
 
-from pyinsole.translators import AbstractTranslator, TranslatedMessage
+from pyinsole.decoders import Decoder, json_decoder
+from pyinsole.translators import AbstractTranslator, MessageEnvelope, MetadataView
 
 logger = logging.getLogger(__name__)
 
 
-class SQSMessageTranslator(AbstractTranslator):
-    def translate(self, raw_message: dict) -> TranslatedMessage:
-        translated_message: TranslatedMessage = {"content": None, "metadata": {}}
+def _decode_number(value: str) -> int | float:
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
 
+
+# system attributes of SQS messages holding numbers (timestamps are in milliseconds)
+NUMERIC_SYSTEM_ATTRIBUTES = frozenset(
+    {"ApproximateFirstReceiveTimestamp", "ApproximateReceiveCount", "SentTimestamp", "SequenceNumber"}
+)
+
+
+def decode_system_attributes(attributes: dict) -> dict[str, Any]:
+    """Decode the numeric system attributes of SQS messages (e.g. `SentTimestamp`) to `int`."""
+    return {name: int(value) if name in NUMERIC_SYSTEM_ATTRIBUTES else value for name, value in attributes.items()}
+
+
+def decode_message_attributes(attributes: dict) -> dict[str, Any]:
+    """Decode SQS message attributes to their values: `str`, `int` or `float` for numbers, and `bytes`.
+
+    Custom types (e.g. `Number.float`) are decoded as their base type.
+    """
+    decoded: dict[str, Any] = {}
+    for name, attribute in attributes.items():
+        data_type = attribute.get("DataType", "String")
+        if data_type.startswith("Binary"):
+            decoded[name] = attribute.get("BinaryValue")
+        elif data_type.startswith("Number"):
+            decoded[name] = _decode_number(attribute["StringValue"])
+        else:
+            decoded[name] = attribute.get("StringValue")
+    return decoded
+
+
+def decode_notification_attributes(attributes: dict) -> dict[str, Any]:
+    """Decode the message attributes of an SNS notification, like `decode_message_attributes`.
+
+    Binary values are base64 decoded and `String.Array` values are decoded as lists.
+    """
+    decoded: dict[str, Any] = {}
+    for name, attribute in attributes.items():
+        data_type = attribute.get("Type", "String")
+        value = attribute.get("Value")
+        if data_type.startswith("Binary"):
+            decoded[name] = base64.b64decode(value)
+        elif data_type.startswith("Number"):
+            decoded[name] = _decode_number(value)
+        elif data_type == "String.Array":
+            decoded[name] = json.loads(value)
+        else:
+            decoded[name] = value
+    return decoded
+
+
+class _JSONTranslator(AbstractTranslator):
+    """Base for translators of JSON messages, with a pluggable decoder.
+
+    `decoder` is either a decoding function or the name of a backend of
+    `pyinsole.decoders.json_decoder` ("json", "orjson", "msgspec" or "auto"), in which case
+    the message content can be decoded straight into `model`.
+
+    The metadata is a read-only view of the raw message, without its body. With
+    `decode_attributes`, its `MessageAttributes` are decoded to their values, and its numeric
+    system `Attributes` to `int`, on first access.
+    """
+
+    def __init__(self, decoder: Decoder | str = "json", *, model: type | None = None, decode_attributes: bool = False):
+        if callable(decoder):
+            if model is not None:
+                msg = "model is only supported with a decoder backend name"
+                raise ValueError(msg)
+
+            self._decode = self._decode_content = decoder
+        else:
+            self._decode_content = json_decoder(decoder, model=model)
+            self._decode = json_decoder(decoder) if model is not None else self._decode_content
+
+        self.decode_attributes = decode_attributes
+        self._message_decoders = self._notification_decoders = None
+        if decode_attributes:
+            self._message_decoders = {
+                "MessageAttributes": decode_message_attributes,
+                "Attributes": decode_system_attributes,
+            }
+            self._notification_decoders = {
+                "MessageAttributes": decode_notification_attributes,
+                "Attributes": decode_system_attributes,
+            }
+
+
+class SQSMessageTranslator(_JSONTranslator):
+    def translate(self, raw_message: dict) -> MessageEnvelope:
         try:
             body = raw_message["Body"]
         except (KeyError, TypeError):
             logger.exception("missing Body key in SQS message. It really came from SQS ?\nmessage=%r", raw_message)
-            return translated_message
+            return MessageEnvelope(None, {})
 
         try:
-            translated_message["content"] = json.loads(body)
-        except json.decoder.JSONDecodeError as exc:
+            content = self._decode_content(body)
+        except (ValueError, TypeError) as exc:
             logger.exception("error=%r, message=%r", exc, raw_message)  # noqa: TRY401
-            return translated_message
+            return MessageEnvelope(None, {})
 
-        translated_message["metadata"].update(raw_message)
-        translated_message["metadata"].pop("Body")
+        return MessageEnvelope(content, MetadataView(raw_message, None, self._message_decoders))
 
-        return translated_message
 
-
-class SNSMessageTranslator(AbstractTranslator):
-    def translate(self, raw_message: dict) -> TranslatedMessage:
-        translated: TranslatedMessage = {"content": None, "metadata": {}}
+class SNSMessageTranslator(_JSONTranslator):
+    def translate(self, raw_message: dict) -> MessageEnvelope:
         try:
-            body = json.loads(raw_message["Body"])
+            body = self._decode(raw_message["Body"])
             message_body = body.pop("Message")
-        except (KeyError, TypeError):
+        except (KeyError, TypeError, AttributeError):
             logger.exception(
                 "Missing Body or Message key in SQS message. It really came from SNS ?\nmessage=%r", raw_message
             )
-            return translated
+            return MessageEnvelope(None, {})
 
-        translated["metadata"].update(raw_message)
-        translated["metadata"].pop("Body")
+        # attributes of the notification, or of the SQS message with raw message delivery
+        decoders = self._notification_decoders if "MessageAttributes" in body else self._message_decoders
+        metadata = MetadataView(raw_message, body, decoders)
 
         try:
-            translated["content"] = json.loads(message_body)
-        except (json.decoder.JSONDecodeError, TypeError) as exc:
+            content = self._decode_content(message_body)
+        except (ValueError, TypeError) as exc:
             logger.exception("error=%r, message=%r", exc, raw_message)  # noqa: TRY401
-            return translated
+            return MessageEnvelope(None, metadata)
 
-        translated["metadata"].update(body)
-        return translated
+        return MessageEnvelope(content, metadata)
@@ -0,0 +1,3 @@
+from .providers import InMemoryProvider, SpoolProvider
+
+__all__ = ["InMemoryProvider", "SpoolProvider"]
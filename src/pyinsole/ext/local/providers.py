@@ -0,0 +1,240 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+import uuid
+from collections import deque
+from contextlib import suppress
+from pathlib import Path
+from typing import Any
+
+from pyinsole.providers import AbstractProvider
+
+logger = logging.getLogger(__name__)
+
+
+class _Message:
+    __slots__ = ("body", "message_id", "receive_count")
+
+    def __init__(self, body: Any, message_id: str):
+        self.body = body
+        self.message_id = message_id
+        self.receive_count = 0
+
+
+class InMemoryProvider(AbstractProvider):
+    """Queue living in the process memory, with SQS-like visibility timeout semantics.
+
+    Fetched messages are SQS-like dicts (`MessageId`, `ReceiptHandle`, `Body` and the
+    `ApproximateReceiveCount` attribute) hidden for `visibility_timeout` seconds: messages
+    not confirmed by then are delivered again. Each fetch returns at most `batch_size` messages
+    after `latency` seconds and, when the queue is empty, waits up to `wait_time` seconds for
+    new messages, like SQS long polling. Useful for tests and benchmarks.
+    """
+
+    def __init__(
+        self,
+        messages=(),
+        *,
+        batch_size: int = 10,
+        latency: float = 0,
+        visibility_timeout: float = 30,
+        wait_time: float = 1,
+    ):
+        if batch_size < 1:
+            msg = f"batch_size must be a positive integer: {batch_size!r}"
+            raise ValueError(msg)
+
+        self.batch_size = batch_size
+        self.latency = latency
+        self.visibility_timeout = visibility_timeout
+        self.wait_time = wait_time
+
+        self._visible: deque[_Message] = deque()
+        # receipt handle -> message and the time it becomes visible again, with a heap of
+        # (deadline, receipt handle) to find the expired ones (outdated entries are skipped)
+        self._in_flight: dict[str, tuple[_Message, float]] = {}
+        self._deadlines: list[tuple[float, str]] = []
+        self._available = asyncio.Event()
+        self._ids = itertools.count()
+        self._receipts = itertools.count()
+
+        for body in messages:
+            self.put(body)
+
+    def __str__(self):
+        return f"<{type(self).__name__}: {id(self):#x}>"
+
+    def __len__(self):
+        """Return the amount of messages not confirmed yet, visible or in flight."""
+        return len(self._visible) + len(self._in_flight)
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def put(self, body: Any) -> str:
+        """Add a message to the queue and return its id."""
+        message = _Message(body, str(next(self._ids)))
+        self._visible.append(message)
+        self._available.set()
+        return message.message_id
+
+    async def send_message(self, message):
+        return self.put(message["Body"] if isinstance(message, dict) and "Body" in message else message)
+
+    def _restore_expired(self, now: float):
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now:
+            deadline, receipt = heapq.heappop(deadlines)
+            in_flight = self._in_flight.get(receipt)
+            if in_flight is not None and in_flight[1] == deadline:
+                del self._in_flight[receipt]
+                self._visible.append(in_flight[0])
+
+    def _hide(self, receipt: str, message: _Message, delay: float):
+        deadline = time.monotonic() + delay
+        self._in_flight[receipt] = (message, deadline)
+        heapq.heappush(self._deadlines, (deadline, receipt))
+
+    async def fetch_messages(self) -> list:
+        # always yield to the event loop, even without latency
+        await asyncio.sleep(self.latency)
+
+        self._restore_expired(time.monotonic())
+        if not self._visible and self.wait_time:
+            self._available.clear()
+            with suppress(TimeoutError):
+                async with asyncio.timeout(self.wait_time):
+                    await self._available.wait()
+            self._restore_expired(time.monotonic())
+
+        messages: list[dict] = []
+        while self._visible and len(messages) < self.batch_size:
+            message = self._visible.popleft()
+            message.receive_count += 1
+            receipt = f"{message.message_id}-{next(self._receipts)}"
+            self._hide(receipt, message, self.visibility_timeout)
+            messages.append(
+                {
+                    "MessageId": message.message_id,
+                    "ReceiptHandle": receipt,
+                    "Body": message.body,
+                    "Attributes": {"ApproximateReceiveCount": str(message.receive_count)},
+                }
+            )
+
+        return messages
+
+    async def confirm_message(self, message):
+        self._in_flight.pop(message["ReceiptHandle"], None)
+
+    async def retry_message(self, message, delay: float):
+        receipt = message["ReceiptHandle"]
+        in_flight = self._in_flight.get(receipt)
+        if in_flight is not None:
+            self._hide(receipt, in_flight[0], delay)
+
+    async def release_message(self, message):
+        in_flight = self._in_flight.pop(message["ReceiptHandle"], None)
+        if in_flight is not None:
+            self._visible.append(in_flight[0])
+            self._available.set()
+
+
+class SpoolProvider(AbstractProvider):
+    """Queue backed by a local directory, one file per message, shared by the processes of a host.
+
+    Messages are claimed by atomically moving their file to the `.processing` subdirectory,
+    under a name unique to the claim which is the receipt handle, and confirmed by deleting it.
+    Claimed messages that are not confirmed within `visibility_timeout` seconds are moved back
+    to the queue: the receipts of their previous claims no longer match any file. Fetched messages are SQS-like dicts
+    whose `Body` is the content of the file, decoded as UTF-8. File operations run in a thread.
+    """
+
+    def __init__(
+        self,
+        directory: str | os.PathLike,
+        *,
+        batch_size: int = 10,
+        visibility_timeout: float = 30,
+        poll_interval: float = 1,
+    ):
+        if batch_size < 1:
+            msg = f"batch_size must be a positive integer: {batch_size!r}"
+            raise ValueError(msg)
+
+        self.directory = Path(directory)
+        self.batch_size = batch_size
+        self.visibility_timeout = visibility_timeout
+        self.poll_interval = poll_interval
+
+        self._processing = self.directory / ".processing"
+
+    def __str__(self):
+        return f"<{type(self).__name__}: {self.directory}>"
+
+    async def __aenter__(self):
+        await asyncio.to_thread(self._processing.mkdir, parents=True, exist_ok=True)
+        return await super().__aenter__()
+
+    def _send(self, body: str | bytes) -> str:
+        data = body.encode() if isinstance(body, str) else body
+        message_id = f"{time.time_ns():020d}-{uuid.uuid4().hex}"
+
+        # written aside and renamed, so readers never see a partial message
+        temporary = self.directory / f".{message_id}.tmp"
+        temporary.write_bytes(data)
+        temporary.replace(self.directory / f"{message_id}.msg")
+        return message_id
+
+    async def send_message(self, message):
+        return await asyncio.to_thread(self._send, message["Body"] if isinstance(message, dict) else message)
+
+    def _restore_expired(self):
+        expired_before = time.time() - self.visibility_timeout
+        for path in self._processing.iterdir():
+            with suppress(FileNotFoundError):
+                if path.stat().st_mtime <= expired_before:
+                    message_id = path.name.split(".", 1)[0]
+                    path.replace(self.directory / f"{message_id}.msg")
+
+    def _claim(self) -> list:
+        self._restore_expired()
+
+        messages = []
+        for path in sorted(self.directory.glob("*.msg")):
+            claimed = self._processing / f"{path.stem}.{uuid.uuid4().hex}.msg"
+            try:
+                path.replace(claimed)
+                # the modification time is the start of the visibility timeout
+                os.utime(claimed)
+                body = claimed.read_bytes().decode()
+            except FileNotFoundError:
+                # claimed by another process
+                continue
+
+            messages.append({"MessageId": path.stem, "ReceiptHandle": claimed.name, "Body": body})
+            if len(messages) >= self.batch_size:
+                break
+
+        return messages
+
+    async def fetch_messages(self) -> list:
+        messages = await asyncio.to_thread(self._claim)
+        if not messages:
+            await asyncio.sleep(self.poll_interval)
+        return messages
+
+    async def confirm_message(self, message):
+        path = self._processing / message["ReceiptHandle"]
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+
+    async def retry_message(self, message, delay: float):
+        path = self._processing / message["ReceiptHandle"]
+        # moves the start of the visibility timeout so the message is restored after `delay` seconds
+        visible_at = time.time() + delay - self.visibility_timeout
+        with suppress(FileNotFoundError):
+            await asyncio.to_thread(os.utime, path, (visible_at, visible_at))
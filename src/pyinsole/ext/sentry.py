@@ -1,5 +1,22 @@
+import asyncio
+import contextvars
+import logging
+import queue
+import random
+import threading
+from collections import Counter
+from types import TracebackType
+from typing import Any
+
 import sentry_sdk
 
+from pyinsole.logs import MAX_MESSAGE_LENGTH, LazyRepr
+from pyinsole.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+ExcInfo = tuple[type[BaseException] | None, BaseException | None, TracebackType | None]
+
 
 def sentry_handler(*, delete_message: bool = False):
     async def send_to_sentry(exc_info: BaseException, message: str):
@@ -9,3 +26,152 @@ def sentry_handler(*, delete_message: bool = False):
         return delete_message
 
     return send_to_sentry
+
+
+class _ErrorGroup:
+    __slots__ = ("context", "exception", "message", "occurrences", "route")
+
+    def __init__(self, route: str, exception: BaseException, message: str):
+        self.route = route
+        self.exception = exception
+        self.message = message
+        self.occurrences = 0
+        # the scope of the first failed message (tags, user, ...) is kept for its capture
+        self.context = contextvars.copy_context()
+
+
+def _group_key(route: str, exception: BaseException) -> tuple:
+    """Identify errors by route, exception type and the line that raised it, ignoring their message."""
+    traceback = exception.__traceback__
+    while traceback is not None and traceback.tb_next is not None:
+        traceback = traceback.tb_next
+
+    location = (traceback.tb_frame.f_code.co_filename, traceback.tb_lineno) if traceback is not None else None
+    return route, type(exception), location
+
+
+class SentryReporter:
+    """Report handler errors to Sentry off the event loop, grouping identical errors.
+
+    Errors of a route with the same exception type, raised by the same line, are grouped for
+    `window` seconds: only the first one of each group is captured, with the amount of
+    `occurrences` in the window. Groups are kept with probability `sample_rate` and at most
+    `max_events` are captured per window. Captures run in a background thread, with the
+    message truncated to `max_message_length` characters; when more than `max_pending` are
+    waiting, new ones are dropped. Errors are counted per route in `errors` and reported to
+    `metrics`, whether they were captured or not.
+    """
+
+    def __init__(
+        self,
+        *,
+        window: float = 1,
+        sample_rate: float = 1,
+        max_events: int = 100,
+        max_message_length: int = MAX_MESSAGE_LENGTH,
+        max_pending: int = 1000,
+        metrics: Metrics | None = None,
+    ):
+        if window <= 0:
+            msg = f"window must be positive: {window!r}"
+            raise ValueError(msg)
+
+        if not 0 <= sample_rate <= 1:
+            msg = f"sample_rate must be between 0 and 1: {sample_rate!r}"
+            raise ValueError(msg)
+
+        if max_events < 1 or max_pending < 1:
+            msg = f"max_events and max_pending must be positive integers: {max_events!r}, {max_pending!r}"
+            raise ValueError(msg)
+
+        self.window = window
+        self.sample_rate = sample_rate
+        self.max_events = max_events
+        self.max_message_length = max_message_length
+        self.metrics = metrics
+
+        self.errors: Counter[str] = Counter()
+        self._groups: dict[tuple, _ErrorGroup] = {}
+        self._timer: asyncio.TimerHandle | None = None
+        self._pending: queue.Queue[_ErrorGroup | None] = queue.Queue(max_pending)
+        self._thread: threading.Thread | None = None
+
+    def error_handler(self, route: str, *, delete_message: bool = False):
+        """Return an error handler reporting the errors of the given route."""
+
+        async def report_to_sentry(exc_info: ExcInfo | BaseException, message: Any):
+            # routes give the `sys.exc_info()` tuple
+            exception = exc_info[1] if isinstance(exc_info, tuple) else exc_info
+            if exception is not None:
+                self.report(route, exception, message)
+            return delete_message
+
+        return report_to_sentry
+
+    def report(self, route: str, exception: BaseException, message: Any):
+        """Count an error and add it to its group, to be captured at the end of the window."""
+        self.errors[route] += 1
+
+        key = _group_key(route, exception)
+        group = self._groups.get(key)
+        if group is None:
+            group = self._groups[key] = _ErrorGroup(route, exception, repr(LazyRepr(message, self.max_message_length)))
+        group.occurrences += 1
+
+        if self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+
+    def _flush(self):
+        self._timer = None
+        groups, self._groups = self._groups, {}
+
+        captured = 0
+        for group in groups.values():
+            sent = (
+                captured < self.max_events
+                and random.random() < self.sample_rate  # noqa: S311
+                and self._submit(group)
+            )
+            captured += sent
+            if self.metrics is not None:
+                self.metrics.errors_reported(group.route, group.occurrences, sent=sent)
+
+    def _submit(self, group: _ErrorGroup) -> bool:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="pyinsole-sentry", daemon=True)
+            self._thread.start()
+
+        try:
+            self._pending.put_nowait(group)
+        except queue.Full:
+            logger.warning("too many errors waiting to be sent to sentry, dropping error of route=%s", group.route)
+            return False
+
+        return True
+
+    def _run(self):
+        while (group := self._pending.get()) is not None:
+            try:
+                group.context.run(self._capture, group)
+            except Exception:
+                logger.exception("could not send error of route=%s to sentry", group.route)
+
+    @staticmethod
+    def _capture(group: _ErrorGroup):
+        with sentry_sdk.new_scope() as scope:
+            scope.set_tag("route", group.route)
+            scope.set_extra("message", group.message)
+            scope.set_extra("occurrences", group.occurrences)
+            sentry_sdk.capture_exception(group.exception)
+
+    async def close(self):
+        """Capture the pending groups right away and wait for the background thread to send them."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._flush()
+
+        if self._thread is not None:
+            # the end marker is put even when the queue is full
+            await asyncio.to_thread(self._pending.put, None)
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
@@ -1,5 +1,12 @@
 import abc
+import asyncio
+import contextvars
+import os
+import pickle
 from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import AbstractAsyncContextManager
+from functools import partial
 from typing import Any
 
 
@@ -40,4 +47,87 @@ class AbstractHandler(abc.ABC):
         """
 
 
+class ExecutorHandler(AbstractHandler, AbstractAsyncContextManager):
+    """Run a synchronous handler in a bounded thread or process pool, off the event loop.
+
+    `handler` is called as `handler(message, metadata)` (or with the lists of messages and
+    metadata in a `BatchRoute`) and returns the same statuses as an asynchronous handler.
+    With `executor="process"`, the handler, the messages and their metadata must be picklable:
+    use a module-level function and a translator producing plain objects. The worker processes
+    are spawned, not forked, so they do not inherit the event loop and its connections.
+
+    At most `max_workers` calls run at the same time, further calls wait in the event loop, so
+    cancelling them (e.g. when the graceful shutdown times out) never leaves work queued in the
+    pool. Calls already running cannot be interrupted and complete in the background. The pool
+    is created on the first call and shut down when the route is closed.
+    """
+
+    def __init__(self, handler: Callable[..., Any], *, executor: str = "thread", max_workers: int | None = None):
+        if not callable(handler):
+            msg = f"handler must be a callable object: {handler!r}"
+            raise TypeError(msg)
+
+        if executor not in ("thread", "process"):
+            msg = f"executor must be 'thread' or 'process': {executor!r}"
+            raise ValueError(msg)
+
+        if max_workers is not None and max_workers < 1:
+            msg = f"max_workers must be a positive integer: {max_workers!r}"
+            raise ValueError(msg)
+
+        if executor == "process":
+            try:
+                pickle.dumps(handler)
+            except (pickle.PicklingError, TypeError, AttributeError) as exc:
+                msg = f"handler must be picklable to run in a process pool: {handler!r}"
+                raise TypeError(msg) from exc
+
+        cpu_count = os.cpu_count() or 1
+        if max_workers is None:
+            # same defaults as the standard library pools
+            max_workers = min(32, cpu_count + 4) if executor == "thread" else cpu_count
+
+        self.handler = handler
+        self.executor = executor
+        self.max_workers = max_workers
+
+        self._pool: Executor | None = None
+        self._slots = asyncio.Semaphore(max_workers)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(handler={self.handler!r} executor={self.executor})>"
+
+    def _create_pool(self) -> Executor:
+        if self.executor == "thread":
+            return ThreadPoolExecutor(self.max_workers, thread_name_prefix="pyinsole-handler")
+
+        # imports multiprocessing, only needed by process pools
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        return ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+    async def __call__(self, message, metadata, **kwargs) -> bool:
+        if self._pool is None:
+            self._pool = self._create_pool()
+
+        if self.executor == "thread":
+            # like asyncio.to_thread, so context variables are visible to the handler
+            call = partial(contextvars.copy_context().run, self.handler, message, metadata, **kwargs)
+        else:
+            call = partial(self.handler, message, metadata, **kwargs)
+
+        async with self._slots:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    def stop(self):
+        """Shut the pool down without waiting for the running calls, dropping the queued ones."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
 Handler = Callable[[dict, dict, Any], bool] | AbstractHandler
@@ -0,0 +1,231 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import suppress
+
+
+class AdaptiveConcurrencyLimit:
+    """Concurrency limit of a route adjusted by additive increase, multiplicative decrease (AIMD).
+
+    Every successful handler call faster than `latency_threshold` (when set) grows the limit so
+    it increases by `increase` per round of `limit` calls, up to `max_limit`. Every failure, or
+    call slower than the threshold, multiplies the limit by `decrease_ratio`, down to `min_limit`.
+    """
+
+    def __init__(
+        self,
+        initial: int = 10,
+        *,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        latency_threshold: float | None = None,
+        decrease_ratio: float = 0.5,
+        increase: float = 1,
+    ):
+        if not 1 <= min_limit <= initial <= max_limit:
+            msg = f"expected 1 <= min_limit <= initial <= max_limit: {min_limit!r}, {initial!r}, {max_limit!r}"
+            raise ValueError(msg)
+
+        if not 0 < decrease_ratio < 1:
+            msg = f"decrease_ratio must be between 0 and 1: {decrease_ratio!r}"
+            raise ValueError(msg)
+
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_threshold = latency_threshold
+        self.decrease_ratio = decrease_ratio
+        self.increase = increase
+
+        self._limit = float(initial)
+        self._in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def locked(self) -> bool:
+        return self._in_flight >= self.limit
+
+    async def acquire(self):
+        while self.locked():
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with suppress(ValueError):
+                    self._waiters.remove(waiter)
+                if waiter.done() and not waiter.cancelled():
+                    # the slot given to this waiter goes to the next one
+                    self._wake_up()
+                raise
+
+        self._in_flight += 1
+
+    def release(self):
+        self._in_flight -= 1
+        self._wake_up()
+
+    def _wake_up(self):
+        free = self.limit - self._in_flight
+        while free > 0 and self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                free -= 1
+
+    def record(self, latency: float, *, success: bool):
+        """Adjust the limit with the result and latency of a handler call."""
+        if not success or (self.latency_threshold is not None and latency > self.latency_threshold):
+            self._limit = max(self.min_limit, self._limit * self.decrease_ratio)
+        else:
+            self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            self._wake_up()
+
+
+class CircuitBreaker:
+    """Stop fetching messages for a route while most of its messages fail.
+
+    The circuit opens when at least `failure_rate` of the last `window_size` handler calls
+    failed (once `minimum_calls` were made). The route pollers then pause for `recovery_timeout`
+    seconds, after which the circuit is half-open: fetching resumes and the circuit closes after
+    `half_open_calls` successful calls, or opens again on the first failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        *,
+        failure_rate: float = 0.5,
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        recovery_timeout: float = 30,
+        half_open_calls: int = 5,
+    ):
+        if not 0 < failure_rate <= 1:
+            msg = f"failure_rate must be between 0 and 1: {failure_rate!r}"
+            raise ValueError(msg)
+
+        if not 1 <= minimum_calls <= window_size:
+            msg = f"minimum_calls must be between 1 and window_size: {minimum_calls!r}, {window_size!r}"
+            raise ValueError(msg)
+
+        if half_open_calls < 1:
+            msg = f"half_open_calls must be a positive integer: {half_open_calls!r}"
+            raise ValueError(msg)
+
+        self.failure_rate = failure_rate
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.recovery_timeout = recovery_timeout
+        self.half_open_calls = half_open_calls
+
+        self._state = self.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=window_size)
+        self._failures = 0
+        self._opened_at = 0.0
+        self._successes = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() >= self._opened_at + self.recovery_timeout:
+            self._state = self.HALF_OPEN
+            self._successes = 0
+
+        return self._state
+
+    def retry_after(self) -> float:
+        """Return the seconds left before fetching can resume, `0` when the circuit is not open."""
+        if self.state != self.OPEN:
+            return 0
+
+        return self._opened_at + self.recovery_timeout - time.monotonic()
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+
+    def record(self, *, success: bool):
+        """Update the circuit with the result of a handler call."""
+        state = self.state
+        if state == self.HALF_OPEN:
+            if not success:
+                self._open()
+            else:
+                self._successes += 1
+                if self._successes >= self.half_open_calls:
+                    self._close()
+            return
+
+        if state == self.OPEN:
+            # calls started before the circuit opened
+            return
+
+        if len(self._outcomes) == self.window_size and not self._outcomes[0]:
+            self._failures -= 1
+        self._outcomes.append(success)
+        if not success:
+            self._failures += 1
+
+        calls = len(self._outcomes)
+        if calls >= self.minimum_calls and self._failures >= self.failure_rate * calls:
+            self._open()
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` messages per second on average, in bursts of at most `burst` messages.
+
+    `burst` defaults to one second worth of messages. Tokens can be taken before knowing how
+    many messages will be received: `acquire` reserves them and `settle` gives back the unused
+    ones, or takes the missing ones as a debt paid by the next callers.
+    """
+
+    def __init__(self, rate: float, burst: int | None = None):
+        if rate <= 0:
+            msg = f"rate must be positive: {rate!r}"
+            raise ValueError(msg)
+
+        if burst is not None and burst < 1:
+            msg = f"burst must be a positive integer: {burst!r}"
+            raise ValueError(msg)
+
+        self.rate = rate
+        self.burst = burst or max(math.ceil(rate), 1)
+
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def tokens(self) -> float:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+        return self._tokens
+
+    async def acquire(self, tokens: int = 1):
+        """Wait until the tokens (at most `burst`) are available and take them, in FIFO order."""
+        async with self._lock:
+            missing = min(tokens, self.burst) - self.tokens
+            if missing > 0:
+                await asyncio.sleep(missing / self.rate)
+
+            self._tokens = self.tokens - tokens
+
+    def settle(self, reserved: int, used: int):
+        """Give back the reserved tokens that were not used, or take the ones used beyond the reservation."""
+        self._tokens = min(self.burst, self.tokens + reserved - used)
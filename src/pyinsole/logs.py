@@ -0,0 +1,124 @@
+import logging
+from collections.abc import Mapping
+from itertools import islice
+from typing import Any
+
+# default maximum length of a rendered message in the logs
+MAX_MESSAGE_LENGTH = 512
+
+
+def _shrink(obj: Any, max_string: int, max_items: int, level: int) -> Any:
+    """Return a copy of `obj` with long strings and large or deep containers abbreviated."""
+    if isinstance(obj, str):
+        return obj if len(obj) <= max_string else obj[:max_string] + "..."
+
+    if isinstance(obj, bytes):
+        return obj if len(obj) <= max_string else obj[:max_string] + b"..."
+
+    if not level:
+        return f"{type(obj).__name__}(...)" if isinstance(obj, Mapping | list | tuple) else obj
+
+    if isinstance(obj, Mapping):
+        items = islice(obj.items(), max_items)
+        shrunk = {key: _shrink(value, max_string, max_items, level - 1) for key, value in items}
+        if len(obj) > max_items:
+            shrunk["..."] = f"{len(obj) - max_items} more items"
+        return shrunk
+
+    if isinstance(obj, list | tuple):
+        values = [_shrink(value, max_string, max_items, level - 1) for value in islice(obj, max_items)]
+        if len(obj) > max_items:
+            values.append(f"... {len(obj) - max_items} more items")
+        return values
+
+    return obj
+
+
+class LazyRepr:
+    """Render the `repr` of an object only when a log record is formatted, truncating large payloads.
+
+    Long strings and large containers are abbreviated before rendering, so large bodies are
+    never fully rendered just to be truncated.
+    """
+
+    __slots__ = ("max_length", "obj")
+
+    max_string = 256
+    max_items = 16
+    max_level = 4
+
+    def __init__(self, obj: Any, max_length: int = MAX_MESSAGE_LENGTH):
+        self.obj = obj
+        self.max_length = max_length
+
+    def __repr__(self) -> str:
+        rendered = repr(_shrink(self.obj, self.max_string, self.max_items, self.max_level))
+        if len(rendered) > self.max_length:
+            return rendered[: self.max_length] + "..."
+
+        return rendered
+
+    __str__ = __repr__
+
+
+class SampledMessageLogger:
+    """Log handled messages selectively, with their route, result and latency as structured fields.
+
+    A message is logged when its handling failed (`failures`), took at least `slow_threshold`
+    seconds or, otherwise, once every `sample_rate` messages (`0` disables sampling). The message
+    payload is rendered lazily and truncated to `max_length` characters.
+    """
+
+    def __init__(
+        self,
+        *,
+        sample_rate: int = 0,
+        slow_threshold: float | None = None,
+        failures: bool = True,
+        max_length: int = MAX_MESSAGE_LENGTH,
+        level: int = logging.INFO,
+        logger: logging.Logger | None = None,
+    ):
+        if sample_rate < 0:
+            msg = f"sample_rate must not be negative: {sample_rate!r}"
+            raise ValueError(msg)
+
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.failures = failures
+        self.max_length = max_length
+        self.level = level
+        self.logger = logger or logging.getLogger("pyinsole.messages")
+
+        self._count = 0
+
+    def _reason(self, latency: float, *, success: bool) -> str | None:
+        if self.failures and not success:
+            return "failed"
+
+        if self.slow_threshold is not None and latency >= self.slow_threshold:
+            return "slow"
+
+        if self.sample_rate:
+            self._count += 1
+            if self._count >= self.sample_rate:
+                self._count = 0
+                return "sampled"
+
+        return None
+
+    def handled(self, route: str, message: Any, latency: float, *, success: bool):
+        reason = self._reason(latency, success=success)
+        if reason is None or not self.logger.isEnabledFor(self.level):
+            return
+
+        self.logger.log(
+            self.level,
+            "message handled route=%s reason=%s success=%s latency=%.6f message=%r",
+            route,
+            reason,
+            success,
+            latency,
+            LazyRepr(message, self.max_length),
+            extra={"route": route, "reason": reason, "success": success, "latency": latency},
+        )
@@ -3,16 +3,36 @@ import logging
 import os
 import signal
 import threading
+import time
 from collections.abc import Sequence
 from functools import partial
+from typing import TYPE_CHECKING
 
 from .dispatchers import AbstractDispatcher, Dispatcher
+from .limits import RateLimiter
+from .metrics import Metrics
 from .routes import Route
 
+if TYPE_CHECKING:
+    from multiprocessing import Process
+
 logger = logging.getLogger(__name__)
 
+# seconds to wait before restarting a crashed worker process
+RESTART_DELAY = 1.0
+# seconds given to the worker processes, on top of the graceful timeout, before they are killed
+KILL_TIMEOUT = 5.0
+
 
 class Manager:
+    """Run the dispatcher of the given routes until a SIGTERM is received.
+
+    With `processes` greater than one, `run` forks that many worker processes, each one running
+    its own copy of the dispatcher over the same routes, and supervises them: crashed workers
+    are restarted, SIGTERM and SIGINT are forwarded as SIGTERM to trigger their graceful
+    shutdown, and `run` returns an exit status aggregated from all the workers.
+    """
+
     def __init__(
         self,
         routes: Sequence[Route],
@@ -20,27 +40,147 @@ class Manager:
         dispatcher: AbstractDispatcher | None = None,
         queue_size: int | None = None,
         workers: int | None = None,
+        max_in_flight: int | None = None,
+        metrics: Metrics | None = None,
+        rate_limit: RateLimiter | None = None,
+        processes: int = 1,
     ):
-        self.dispatcher = dispatcher or Dispatcher(routes, queue_size, workers)
+        if processes < 1:
+            msg = f"processes must be at least 1: {processes!r}"
+            raise ValueError(msg)
 
-    def run(self, *, graceful_timeout: int = 30, forever: bool = True, debug: bool = False):
+        self.dispatcher = dispatcher or Dispatcher(
+            routes, queue_size, workers, max_in_flight=max_in_flight, metrics=metrics, rate_limit=rate_limit
+        )
+        self.processes = processes
+
+    def run(self, *, graceful_timeout: int = 30, forever: bool = True, debug: bool = False) -> int:
+        """Run the manager, returning 0 when every worker process exited successfully."""
+        if self.processes > 1:
+            return self._supervise(graceful_timeout=graceful_timeout, forever=forever, debug=debug)
+
+        self._run_process(graceful_timeout=graceful_timeout, forever=forever, debug=debug)
+        return 0
+
+    def _run_process(self, *, graceful_timeout: int, forever: bool, debug: bool):
         cancellation_token = asyncio.Event()
+        handler = partial(self.handle_signal, event=cancellation_token)
+
+        previous_handlers = {}
         if threading.current_thread() is threading.main_thread():
-            signal.signal(signal.SIGTERM, partial(self.handle_signal, event=cancellation_token))
+            signums = [signal.SIGTERM]
+            if signal.getsignal(signal.SIGINT) is not signal.SIG_IGN:
+                # workers ignore SIGINT, the supervisor forwards it as SIGTERM
+                signums.append(signal.SIGINT)
+            previous_handlers = {signum: signal.signal(signum, handler) for signum in signums}
 
         logger.info("running pyinsole's manager, pid=%s, forever=%s", os.getpid(), forever)
-        asyncio.run(
-            self._run(
-                cancellation_token=cancellation_token,
-                graceful_timeout=graceful_timeout,
-                forever=forever,
-            ),
-            debug=debug,
-        )
+        try:
+            asyncio.run(
+                self._run(
+                    cancellation_token=cancellation_token,
+                    graceful_timeout=graceful_timeout,
+                    forever=forever,
+                ),
+                debug=debug,
+            )
+        finally:
+            for signum, previous_handler in previous_handlers.items():
+                signal.signal(signum, previous_handler)
 
     def handle_signal(self, signum, frame, event: asyncio.Event):  # noqa: ARG002
         event.set()
 
+    def _run_worker(self, *, graceful_timeout: int, forever: bool, debug: bool):
+        # the supervisor forwards interruptions from the terminal as SIGTERM
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        self._run_process(graceful_timeout=graceful_timeout, forever=forever, debug=debug)
+
+    def _start_worker(self, context, index: int, **kwargs) -> "Process":
+        process = context.Process(target=self._run_worker, kwargs=kwargs, name=f"pyinsole-worker-{index}")
+        process.start()
+        logger.info("started pyinsole's worker process, index=%s, pid=%s", index, process.pid)
+        return process
+
+    def _supervise(self, *, graceful_timeout: int, forever: bool, debug: bool) -> int:
+        # imported here, single process managers do not need multiprocessing
+        import multiprocessing
+
+        # fork, so routes and handlers do not need to be pickled
+        context = multiprocessing.get_context("fork")
+        options = {"graceful_timeout": graceful_timeout, "forever": forever, "debug": debug}
+
+        stop_requested = threading.Event()
+        processes: dict[int, Process] = {}
+
+        def stop(signum, frame):  # noqa: ARG001
+            stop_requested.set()
+            for process in processes.values():
+                if process.is_alive():
+                    process.terminate()
+
+        previous_handlers = {}
+        if threading.current_thread() is threading.main_thread():
+            previous_handlers = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+
+        logger.info("running pyinsole's supervisor, pid=%s, processes=%s", os.getpid(), self.processes)
+        try:
+            for index in range(self.processes):
+                processes[index] = self._start_worker(context, index, **options)
+
+            return self._watch(context, processes, stop_requested, options)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def _watch(self, context, processes: dict, stop_requested: threading.Event, options: dict) -> int:
+        from multiprocessing.connection import wait
+
+        exit_codes = []
+        restarts: dict[int, float] = {}
+        kill_deadline = None
+
+        while processes or (restarts and not stop_requested.is_set()):
+            now = time.monotonic()
+            if stop_requested.is_set():
+                restarts.clear()
+                if kill_deadline is None:
+                    # also reaches the workers started while the signal was handled
+                    kill_deadline = now + options["graceful_timeout"] + KILL_TIMEOUT
+                    for process in processes.values():
+                        process.terminate()
+                elif now >= kill_deadline:
+                    for process in processes.values():
+                        logger.warning("killing pyinsole's worker process, pid=%s", process.pid)
+                        process.kill()
+
+            for index, restart_at in list(restarts.items()):
+                if now >= restart_at:
+                    del restarts[index]
+                    processes[index] = self._start_worker(context, index, **options)
+
+            timeouts = [restart_at - now for restart_at in restarts.values()]
+            if kill_deadline is not None:
+                timeouts.append(kill_deadline - now)
+
+            wait([process.sentinel for process in processes.values()], timeout=max(min(timeouts, default=1), 0))
+
+            for index, process in list(processes.items()):
+                exit_code = process.exitcode
+                if exit_code is None:
+                    continue
+
+                del processes[index]
+                process.close()
+                if exit_code != 0 and options["forever"] and not stop_requested.is_set():
+                    logger.error("pyinsole's worker process crashed, index=%s, exitcode=%s", index, exit_code)
+                    restarts[index] = time.monotonic() + RESTART_DELAY
+                else:
+                    exit_codes.append(exit_code)
+
+        return _exit_status(exit_codes)
+
     async def _run(self, *, cancellation_token: asyncio.Event, graceful_timeout: int, forever):
         async with asyncio.TaskGroup() as tasks:
             dispatcher_task = tasks.create_task(
@@ -61,3 +201,14 @@ class Manager:
                     cancellation_task.cancel()
 
             tasks.create_task(handle_cancellation())
+
+
+def _exit_status(exit_codes: Sequence[int]) -> int:
+    """Return the first failure among the exit codes, with signals as `128 + signum` like shells do."""
+    for exit_code in exit_codes:
+        if exit_code < 0:
+            return 128 - exit_code
+        if exit_code > 0:
+            return exit_code
+
+    return 0
@@ -0,0 +1,216 @@
+import os
+import tempfile
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Sequence
+
+from .limits import CircuitBreaker
+
+# bucket upper bounds, in seconds, for the latency histograms
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# bucket upper bounds, in messages, for the batch size histograms
+SIZE_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+
+class Metrics:
+    """Hooks called along the dispatch pipeline.
+
+    Every hook is a no-op, subclasses override the ones they want to record. Routes are
+    identified by their name and providers by their string representation.
+    """
+
+    def messages_fetched(self, route: str, size: int, latency: float):
+        """Called after each `fetch_messages` call of a route provider."""
+
+    def message_queued(self, route: str, depth: int):
+        """Called when fetched messages are buffered, with the new depth of the route buffer."""
+
+    def message_dequeued(self, route: str, depth: int, wait: float):
+        """Called when a worker takes messages from the route buffer, with the time they waited there."""
+
+    def message_handled(self, route: str, latency: float, *, success: bool):
+        """Called after each handler call."""
+
+    def message_acknowledged(self, route: str, count: int = 1):
+        """Called when messages are confirmed in the provider."""
+
+    def message_rejected(self, route: str, count: int = 1):
+        """Called when messages are reported as not processed to the provider."""
+
+    def message_dead_lettered(self, route: str, count: int = 1):
+        """Called when messages that exhausted their attempts are dead-lettered (or discarded)."""
+
+    def error_handled(self, route: str):
+        """Called on each error handler invocation."""
+
+    def errors_reported(self, route: str, count: int, *, sent: bool):
+        """Called when a group of identical errors is sent to (or, when sampled out, kept from) an error tracker."""
+
+    def deduplication_checked(self, route: str, *, duplicate: bool):
+        """Called after each lookup of a message in the route deduplication cache."""
+
+    def concurrency_limit_changed(self, route: str, limit: int):
+        """Called when the adaptive concurrency limit of a route changes."""
+
+    def circuit_state_changed(self, route: str, state: str):
+        """Called when handling results change the state of the circuit breaker of a route."""
+
+    def in_flight_changed(self, route: str, count: int):
+        """Called when the amount of messages being processed by a route changes."""
+
+    def provider_request(self, provider: str, operation: str, latency: float):
+        """Called after each request made by a provider to its backend."""
+
+
+class Histogram:
+    """Histogram with fixed buckets, as in Prometheus."""
+
+    __slots__ = ("bounds", "count", "counts", "sum")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return the cumulative count of each bucket upper bound, ending with `+Inf`."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.bounds, float("inf")), self.counts, strict=True):
+            total += count
+            result.append((bound, total))
+        return result
+
+
+class InMemoryMetrics(Metrics):
+    """Aggregate the pipeline metrics in process with counters, gauges and fixed-bucket histograms."""
+
+    def __init__(
+        self, latency_buckets: Sequence[float] = LATENCY_BUCKETS, size_buckets: Sequence[float] = SIZE_BUCKETS
+    ):
+        self.latency_buckets = tuple(latency_buckets)
+        self.size_buckets = tuple(size_buckets)
+
+        self.counters: dict[str, dict[tuple, float]] = defaultdict(lambda: defaultdict(float))
+        self.gauges: dict[str, dict[tuple, float]] = defaultdict(dict)
+        self.histograms: dict[str, dict[tuple, Histogram]] = defaultdict(dict)
+
+    def _observe(self, name: str, labels: tuple, value: float, bounds: tuple):
+        histograms = self.histograms[name]
+        try:
+            histogram = histograms[labels]
+        except KeyError:
+            histogram = histograms[labels] = Histogram(bounds)
+
+        histogram.observe(value)
+
+    def messages_fetched(self, route: str, size: int, latency: float):
+        labels = (("route", route),)
+        self.counters["pyinsole_messages_fetched_total"][labels] += size
+        self._observe("pyinsole_fetch_latency_seconds", labels, latency, self.latency_buckets)
+        self._observe("pyinsole_fetch_batch_size", labels, size, self.size_buckets)
+
+    def message_queued(self, route: str, depth: int):
+        self.gauges["pyinsole_queue_depth"][(("route", route),)] = depth
+
+    def message_dequeued(self, route: str, depth: int, wait: float):
+        labels = (("route", route),)
+        self.gauges["pyinsole_queue_depth"][labels] = depth
+        self._observe("pyinsole_queue_wait_seconds", labels, wait, self.latency_buckets)
+
+    def message_handled(self, route: str, latency: float, *, success: bool):
+        labels = (("route", route),)
+        self.counters["pyinsole_handler_calls_total"][(*labels, ("success", str(success).lower()))] += 1
+        self._observe("pyinsole_handler_latency_seconds", labels, latency, self.latency_buckets)
+
+    def message_acknowledged(self, route: str, count: int = 1):
+        self.counters["pyinsole_messages_acknowledged_total"][(("route", route),)] += count
+
+    def message_rejected(self, route: str, count: int = 1):
+        self.counters["pyinsole_messages_rejected_total"][(("route", route),)] += count
+
+    def message_dead_lettered(self, route: str, count: int = 1):
+        self.counters["pyinsole_messages_dead_lettered_total"][(("route", route),)] += count
+
+    def error_handled(self, route: str):
+        self.counters["pyinsole_error_handler_calls_total"][(("route", route),)] += 1
+
+    def errors_reported(self, route: str, count: int, *, sent: bool):
+        self.counters["pyinsole_errors_reported_total"][(("route", route), ("sent", str(sent).lower()))] += count
+
+    def deduplication_checked(self, route: str, *, duplicate: bool):
+        labels = (("route", route), ("duplicate", str(duplicate).lower()))
+        self.counters["pyinsole_deduplication_checks_total"][labels] += 1
+
+    def concurrency_limit_changed(self, route: str, limit: int):
+        self.gauges["pyinsole_concurrency_limit"][(("route", route),)] = limit
+
+    def circuit_state_changed(self, route: str, state: str):
+        gauge = self.gauges["pyinsole_circuit_state"]
+        for known_state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+            gauge[(("route", route), ("state", known_state))] = int(known_state == state)
+
+    def in_flight_changed(self, route: str, count: int):
+        self.gauges["pyinsole_in_flight"][(("route", route),)] = count
+
+    def provider_request(self, provider: str, operation: str, latency: float):
+        labels = (("provider", provider), ("operation", operation))
+        self.counters["pyinsole_provider_requests_total"][labels] += 1
+        self._observe("pyinsole_provider_request_latency_seconds", labels, latency, self.latency_buckets)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+def to_prometheus(metrics: InMemoryMetrics) -> str:
+    """Render the aggregated metrics in the Prometheus text exposition format."""
+    lines = []
+
+    for name, samples in sorted(metrics.counters.items()):
+        lines.append(f"# TYPE {name} counter")
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples.items())
+
+    for name, samples in sorted(metrics.gauges.items()):
+        lines.append(f"# TYPE {name} gauge")
+        lines.extend(f"{name}{_format_labels(labels)} {_format_value(value)}" for labels, value in samples.items())
+
+    for name, histograms in sorted(metrics.histograms.items()):
+        lines.append(f"# TYPE {name} histogram")
+        for labels, histogram in histograms.items():
+            for bound, count in histogram.cumulative():
+                bucket_labels = _format_labels((*labels, ("le", _format_value(bound))))
+                lines.append(f"{name}_bucket{bucket_labels} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(histogram.sum)}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(metrics: InMemoryMetrics, path: str | os.PathLike):
+    """Atomically write the metrics to a file, e.g. for the node exporter textfile collector."""
+    directory = os.path.dirname(os.fspath(path)) or "."
+    with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as file:
+        file.write(to_prometheus(metrics))
+
+    os.replace(file.name, path)
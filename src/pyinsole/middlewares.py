@@ -0,0 +1,41 @@
+from collections.abc import Awaitable, Callable, Sequence
+from typing import Any
+
+from .translators import MessageEnvelope
+
+
+class Middleware:
+    """Interceptor of the message processing of a route.
+
+    `prepare` wraps the translation of each raw message and `deliver` wraps each handler call,
+    receiving the content and metadata given to the handler (lists of them, for batch routes).
+    Both get the next step of the chain, which they may call with the same or another value,
+    or skip. The default implementations only call the next step; the ones that are not
+    overridden are left out of the route chains.
+    """
+
+    def prepare(self, raw_message: Any, call_next: Callable[[Any], MessageEnvelope]) -> MessageEnvelope:
+        return call_next(raw_message)
+
+    async def deliver(self, message: MessageEnvelope, call_next: Callable[[MessageEnvelope], Awaitable[Any]]) -> Any:
+        return await call_next(message)
+
+
+def _link(method: Callable, call_next: Callable) -> Callable:
+    def call(value):
+        return method(value, call_next)
+
+    return call
+
+
+def compose(middlewares: Sequence[Middleware], hook: str, call: Callable) -> Callable:
+    """Wrap `call` with the `hook` method of each middleware overriding it, the first middleware being the outermost.
+
+    Without such middlewares, `call` itself is returned.
+    """
+    default = getattr(Middleware, hook)
+    for middleware in reversed(middlewares):
+        if getattr(type(middleware), hook, default) is not default:
+            call = _link(getattr(middleware, hook), call)
+
+    return call
@@ -1,6 +1,8 @@
 import abc
 from contextlib import AbstractAsyncContextManager
 
+from .metrics import Metrics
+
 
 class AbstractProvider(AbstractAsyncContextManager):
     """
@@ -9,6 +11,9 @@ class AbstractProvider(AbstractAsyncContextManager):
     This class is used internally as a Context Manager.
     """
 
+    # set by the route when metrics are enabled, see `pyinsole.metrics.Metrics.provider_request`
+    metrics: Metrics | None = None
+
     @abc.abstractmethod
     async def fetch_messages(self) -> list:
         """Return a sequence of messages to be processed.
@@ -27,5 +32,21 @@ class AbstractProvider(AbstractAsyncContextManager):
     async def message_not_processed(self, message):
         """Perform actions when a message was not processed."""
 
+    async def retry_message(self, message, delay: float):  # noqa: ARG002
+        """Make a message that was not processed available again after `delay` seconds.
+
+        Providers that cannot delay a message just call `message_not_processed`.
+        """
+        return await self.message_not_processed(message)
+
+    async def release_message(self, message):
+        """Make a message that was fetched but not processed available again right away, e.g. on shutdown."""
+        return await self.retry_message(message, 0)
+
+    async def send_message(self, message):
+        """Send a message fetched from another provider, e.g. to use this provider as a dead-letter queue."""
+        msg = f"{type(self).__name__} does not support sending messages"
+        raise NotImplementedError(msg)
+
     async def __aexit__(self, exc_type, exc_value, traceback):
         pass
@@ -0,0 +1,130 @@
+import asyncio
+import logging
+import random
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from .logs import LazyRepr
+from .providers import AbstractProvider
+
+logger = logging.getLogger(__name__)
+
+
+class RetryPolicy:
+    """Retry and dead-letter rules for the messages a route could not process.
+
+    A rejected message is retried after an exponential backoff (`backoff * 2 ** (attempt - 1)`
+    seconds, bounded by `max_backoff`, with full jitter when `jitter` is set), applied by the
+    provider (e.g. through the message visibility in SQS). Once it failed `max_attempts` times,
+    counted from the `ApproximateReceiveCount` attribute, it is sent to the `dead_letter`
+    provider, or discarded when there is none, and confirmed in its own provider. When it cannot
+    be sent to the `dead_letter` provider, it is left unconfirmed to be received again.
+
+    Handler calls raising one of the `retry_on` exceptions are also retried in process, up to
+    `in_process_retries` times after `in_process_delay` seconds (doubled on each retry),
+    before the message is rejected.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_attempts: int | None = None,
+        backoff: float = 1,
+        max_backoff: float = 900,
+        jitter: bool = True,
+        dead_letter: AbstractProvider | None = None,
+        retry_on: tuple[type[Exception], ...] = (),
+        in_process_retries: int = 2,
+        in_process_delay: float = 0.1,
+    ):
+        if max_attempts is not None and max_attempts < 1:
+            msg = f"max_attempts must be a positive integer: {max_attempts!r}"
+            raise ValueError(msg)
+
+        if backoff < 0 or max_backoff < 0:
+            msg = f"backoff and max_backoff must not be negative: {backoff!r}, {max_backoff!r}"
+            raise ValueError(msg)
+
+        if in_process_retries < 0 or in_process_delay < 0:
+            msg = f"in_process_retries and in_process_delay must not be negative: {in_process_retries!r}"
+            raise ValueError(msg)
+
+        if dead_letter is not None and not isinstance(dead_letter, AbstractProvider):
+            msg = f"invalid dead letter provider instance: {dead_letter!r}"
+            raise TypeError(msg)
+
+        if (
+            dead_letter is not None
+            and getattr(type(dead_letter), "send_message", None) is AbstractProvider.send_message
+        ):
+            msg = f"dead letter provider does not support sending messages: {dead_letter!r}"
+            raise TypeError(msg)
+
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.dead_letter = dead_letter
+        self.retry_on = tuple(retry_on)
+        self.in_process_retries = in_process_retries if self.retry_on else 0
+        self.in_process_delay = in_process_delay
+
+    def attempts(self, message: Any) -> int | None:
+        """Return how many times the message was received, when the provider reports it."""
+        try:
+            return int(message["Attributes"]["ApproximateReceiveCount"])
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def delay(self, attempt: int) -> float:
+        """Return the seconds to wait before retrying a message that failed `attempt` times."""
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        if self.jitter:
+            return random.uniform(0, delay)  # noqa: S311
+        return delay
+
+    def exhausted(self, message: Any) -> bool:
+        if self.max_attempts is None:
+            return False
+
+        attempts = self.attempts(message)
+        return attempts is not None and attempts >= self.max_attempts
+
+    async def call(self, handler: Callable[..., Awaitable], *args) -> Any:
+        """Call the handler, retrying it in process when it raises one of the `retry_on` exceptions."""
+        for retry in range(self.in_process_retries):
+            try:
+                return await handler(*args)
+            except self.retry_on as exc:
+                delay = self.in_process_delay * 2**retry
+                logger.warning("retrying handler in %.3fs after transient error=%r", delay, exc)
+                await asyncio.sleep(delay)
+
+        return await handler(*args)
+
+    async def reject(self, message: Any, provider: AbstractProvider) -> bool:
+        """Schedule the retry of a message or, once its attempts are exhausted, dead-letter it.
+
+        Return whether the message was removed from its provider.
+        """
+        if not self.exhausted(message):
+            attempt = self.attempts(message) or 1
+            await provider.retry_message(message, self.delay(attempt))
+            return False
+
+        if self.dead_letter is not None:
+            logger.warning(
+                "sending message to dead letter provider=%s, message=%r", self.dead_letter, LazyRepr(message)
+            )
+            try:
+                await self.dead_letter.send_message(message)
+            except Exception:
+                logger.exception(
+                    "could not send message to dead letter provider=%s, message=%r", self.dead_letter, LazyRepr(message)
+                )
+                return False
+        else:
+            logger.error("discarding message after %d attempts, message=%r", self.max_attempts, LazyRepr(message))
+
+        await provider.confirm_message(message)
+        return True
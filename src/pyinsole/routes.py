@@ -1,16 +1,60 @@
 import logging
-from collections.abc import Callable
+import sys
+import time
+from collections.abc import Callable, Hashable, Mapping, Sequence
 from contextlib import AbstractAsyncContextManager, AsyncExitStack
+from typing import Any, cast
 
+from .deduplication import AbstractDeduplicationCache
 from .handlers import Handler
+from .limits import AdaptiveConcurrencyLimit, CircuitBreaker, RateLimiter
+from .logs import LazyRepr, SampledMessageLogger
+from .metrics import Metrics
+from .middlewares import Middleware, compose
 from .providers import AbstractProvider
-from .translators import AbstractTranslator, TranslatedMessage
+from .retries import RetryPolicy
+from .translators import AbstractTranslator, MessageEnvelope, TranslatedMessage
+from .types import BatchHandler
 from .utils import is_async_callable
 
 logger = logging.getLogger(__name__)
 
 
+def message_id(content: Any, metadata: Mapping) -> str | None:  # noqa: ARG001
+    """Default deduplication key, the `MessageId` set by SQS."""
+    return metadata.get("MessageId")
+
+
+def message_group_id(raw_message: Any) -> str | None:
+    """Default ordering key of the messages of an ordered route, the SQS FIFO `MessageGroupId`."""
+    try:
+        return raw_message["Attributes"]["MessageGroupId"]
+    except (KeyError, TypeError):
+        return None
+
+
+def _as_envelope(message: MessageEnvelope | TranslatedMessage) -> MessageEnvelope:
+    """Accept the `{"content", "metadata"}` dicts returned by custom translators and `prepare_message` overrides."""
+    if isinstance(message, MessageEnvelope):
+        return message
+
+    return MessageEnvelope(message["content"], message["metadata"])
+
+
 class Route(AbstractAsyncContextManager):
+    """Connection of a provider to a handler, with the options of its message processing.
+
+    With `ordered`, the messages with the same `group_key` (computed from the raw message,
+    the `MessageGroupId` of SQS FIFO queues by default) are processed one at a time and in
+    order, while different groups are processed in parallel. When a message of a group
+    fails, the following messages of the group that were fetched with it are not processed
+    and returned to the provider, so they are redelivered after it.
+
+    The `middlewares` wrap the translation of the messages and the handler calls, the first
+    one being the outermost. Their chains are composed once, here: a route without middlewares
+    processes its messages as if the option did not exist.
+    """
+
     def __init__(
         self,
         provider: AbstractProvider,
@@ -19,13 +63,30 @@ class Route(AbstractAsyncContextManager):
         name: str = "default",
         translator: AbstractTranslator | None = None,
         error_handler: Callable | None = None,
+        max_in_flight: int | None = None,
+        pollers: int = 1,
+        max_poll_backoff: float = 0,
+        priority: int = 0,
+        weight: int = 1,
+        queue_size: int | None = None,
+        metrics: Metrics | None = None,
+        message_logger: SampledMessageLogger | None = None,
+        deduplication: AbstractDeduplicationCache | None = None,
+        deduplication_key: Callable[[Any, Mapping], str | None] = message_id,
+        retry_policy: RetryPolicy | None = None,
+        concurrency_limit: AdaptiveConcurrencyLimit | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+        rate_limit: RateLimiter | None = None,
+        ordered: bool = False,
+        group_key: Callable[[Any], Hashable | None] = message_group_id,
+        middlewares: Sequence[Middleware] = (),
     ):
         if not isinstance(provider, AbstractProvider):
             msg = f"invalid provider instance: {provider!r}"
             raise TypeError(msg)
 
         if not is_async_callable(handler):
-            msg = f"handler must be a coroutine function: {handler!r}"
+            msg = f"handler must be a coroutine function, run synchronous ones with ExecutorHandler: {handler!r}"
             raise TypeError(msg)
 
         if translator and not isinstance(translator, AbstractTranslator):
@@ -36,39 +97,166 @@ class Route(AbstractAsyncContextManager):
             msg = f"error_handler must be a callable object: {error_handler!r}"
             raise TypeError(msg)
 
+        if max_in_flight is not None and max_in_flight < 1:
+            msg = f"max_in_flight must be a positive integer: {max_in_flight!r}"
+            raise ValueError(msg)
+
+        if pollers < 1:
+            msg = f"pollers must be a positive integer: {pollers!r}"
+            raise ValueError(msg)
+
+        if max_poll_backoff < 0:
+            msg = f"max_poll_backoff must not be negative: {max_poll_backoff!r}"
+            raise ValueError(msg)
+
+        if weight < 1:
+            msg = f"weight must be a positive integer: {weight!r}"
+            raise ValueError(msg)
+
+        if queue_size is not None and queue_size < 1:
+            msg = f"queue_size must be a positive integer: {queue_size!r}"
+            raise ValueError(msg)
+
+        if deduplication is not None and not isinstance(deduplication, AbstractDeduplicationCache):
+            msg = f"invalid deduplication cache instance: {deduplication!r}"
+            raise TypeError(msg)
+
+        if retry_policy is not None and not isinstance(retry_policy, RetryPolicy):
+            msg = f"invalid retry policy instance: {retry_policy!r}"
+            raise TypeError(msg)
+
+        if concurrency_limit is not None and not isinstance(concurrency_limit, AdaptiveConcurrencyLimit):
+            msg = f"invalid concurrency limit instance: {concurrency_limit!r}"
+            raise TypeError(msg)
+
+        if circuit_breaker is not None and not isinstance(circuit_breaker, CircuitBreaker):
+            msg = f"invalid circuit breaker instance: {circuit_breaker!r}"
+            raise TypeError(msg)
+
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            msg = f"invalid rate limiter instance: {rate_limit!r}"
+            raise TypeError(msg)
+
+        for middleware in middlewares:
+            if not isinstance(middleware, Middleware):
+                msg = f"invalid middleware instance: {middleware!r}"
+                raise TypeError(msg)
+
         self.name = name
         self.handler = handler
         self.provider = provider
         self.translator = translator
+        self.max_in_flight = max_in_flight
+        self.pollers = pollers
+        self.max_poll_backoff = max_poll_backoff
+        self.priority = priority
+        self.weight = weight
+        self.queue_size = queue_size
+        self.message_logger = message_logger
+        self.deduplication = deduplication
+        self.deduplication_key = deduplication_key
+        self.retry_policy = retry_policy
+        self.concurrency_limit = concurrency_limit
+        self.circuit_breaker = circuit_breaker
+        self.rate_limit = rate_limit
+        self.ordered = ordered
+        self.group_key = group_key
+        self.metrics: Metrics | None = None
+        if metrics is not None:
+            self.bind_metrics(metrics)
 
         self._error_handler = error_handler
         self._handler_instance = None
 
+        self.middlewares = tuple(middlewares)
+        if self.middlewares:
+            # the chains shadow the methods, so routes without middlewares call them directly
+            self.prepare_message = compose(self.middlewares, "prepare", self.prepare_message)  # type: ignore[method-assign]
+            self._handle = compose(self.middlewares, "deliver", self._handle)  # type: ignore[method-assign]
+
     def __str__(self):
         return f"<{type(self).__name__}(name={self.name} provider={self.provider!r} handler={self.handler!r})>"
 
-    def prepare_message(self, raw_message) -> TranslatedMessage:
-        default_message: TranslatedMessage = {"content": raw_message, "metadata": {}}
+    def bind_metrics(self, metrics: Metrics):
+        """Report the route (and its provider) metrics to the given collector."""
+        self.metrics = metrics
+        if self.provider.metrics is None:
+            self.provider.metrics = metrics
 
+    def prepare_message(self, raw_message) -> MessageEnvelope:
         if not self.translator:
-            return default_message
+            return MessageEnvelope(raw_message, {})
 
-        message = self.translator.translate(raw_message)
+        message = _as_envelope(self.translator.translate(raw_message))
 
-        if not message["content"]:
+        if not message.content:
             msg = f"{self.translator} failed to translate message={message}"
             raise ValueError(msg)
 
         return message
 
     async def deliver(self, raw_message):
-        message = self.prepare_message(raw_message)
-        logger.info("delivering message route=%s, message=%r", self, message)
+        message = _as_envelope(self.prepare_message(raw_message))
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("delivering message route=%s, message=%r", self.name, LazyRepr(message))
+
+        deduplication = self.deduplication
+        if deduplication is None:
+            return await self._handle(message)
+
+        key = self.deduplication_key(message.content, message.metadata)
+        if key is not None and await self._is_duplicate(deduplication, key):
+            return True
+
+        confirmation = await self._handle(message)
+        if key is not None and confirmation:
+            await deduplication.add(key)
+
+        return confirmation
+
+    def _call_handler(self, content, metadata):
+        if self.retry_policy is None or not self.retry_policy.in_process_retries:
+            return self.handler(content, metadata)
+
+        return self.retry_policy.call(self.handler, content, metadata)
+
+    async def _handle(self, message: MessageEnvelope):
+        if self.metrics is None and self.message_logger is None:
+            return await self._call_handler(message.content, message.metadata)
 
-        return await self.handler(message["content"], message["metadata"])
+        return await self._observe(self._call_handler(message.content, message.metadata), message)
+
+    async def _is_duplicate(self, deduplication: AbstractDeduplicationCache, key: str) -> bool:
+        duplicate = await deduplication.is_duplicate(key)
+        if self.metrics is not None:
+            self.metrics.deduplication_checked(self.name, duplicate=duplicate)
+
+        if duplicate:
+            logger.debug("skipping duplicate message route=%s, key=%s", self.name, key)
+
+        return duplicate
+
+    async def _observe(self, handling, payload):
+        """Await the handler call, reporting its result and latency to the metrics and message logger."""
+        start = time.perf_counter()
+        success = False
+        try:
+            confirmation = await handling
+            success = all(confirmation) if isinstance(confirmation, Sequence) else bool(confirmation)
+        finally:
+            latency = time.perf_counter() - start
+            if self.metrics is not None:
+                self.metrics.message_handled(self.name, latency, success=success)
+            if self.message_logger is not None:
+                self.message_logger.handled(self.name, payload, latency, success=success)
+
+        return confirmation
 
     async def error_handler(self, exc_info, message):
-        logger.info("error handler process originated by message=%s", message)
+        logger.info("error handler process originated by message=%s", LazyRepr(message))
+
+        if self.metrics is not None:
+            self.metrics.error_handled(self.name)
 
         if self._error_handler is not None:
             return await self._error_handler(exc_info, message)
@@ -78,6 +266,10 @@ class Route(AbstractAsyncContextManager):
     async def __aenter__(self):
         async with AsyncExitStack() as exit_stack:
             await exit_stack.enter_async_context(self.provider)
+            if self.retry_policy is not None and self.retry_policy.dead_letter is not None:
+                await exit_stack.enter_async_context(self.retry_policy.dead_letter)
+            if isinstance(self.handler, AbstractAsyncContextManager):
+                await exit_stack.enter_async_context(self.handler)
             self._exit_stack = exit_stack.pop_all()
         return await super().__aenter__()
 
@@ -86,3 +278,108 @@ class Route(AbstractAsyncContextManager):
 
         if hasattr(self, "_exit_stack"):
             await self._exit_stack.aclose()
+
+
+class BatchRoute(Route):
+    """Route that delivers a batch of messages to a single handler call.
+
+    The dispatcher groups the fetched messages in batches of at most `batch_size` messages,
+    waiting up to `batch_window` seconds for more messages before delivering an incomplete one.
+    The handler receives the list of messages and the list of their metadata, and returns
+    one status per message (or a single status for the whole batch).
+    """
+
+    def __init__(
+        self,
+        provider: AbstractProvider,
+        handler: BatchHandler,
+        *,
+        batch_size: int = 10,
+        batch_window: float = 0,
+        **kwargs,
+    ):
+        if batch_size < 1:
+            msg = f"batch_size must be a positive integer: {batch_size!r}"
+            raise ValueError(msg)
+
+        if batch_window < 0:
+            msg = f"batch_window must not be negative: {batch_window!r}"
+            raise ValueError(msg)
+
+        if kwargs.get("ordered"):
+            msg = "ordered processing is not supported by batch routes"
+            raise ValueError(msg)
+
+        # the handler is called with lists of contents and metadata, see `_handle_batch`
+        super().__init__(provider, cast(Handler, handler), **kwargs)
+
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+
+    async def deliver(self, raw_message):
+        [confirmation] = await self.deliver_batch([raw_message])
+        return confirmation
+
+    async def deliver_batch(self, raw_messages: Sequence) -> list[bool]:
+        results: list[bool | None] = [None] * len(raw_messages)
+        positions, contents, metadata, keys = [], [], [], []
+        deduplication = self.deduplication
+
+        for position, raw_message in enumerate(raw_messages):
+            try:
+                message = _as_envelope(self.prepare_message(raw_message))
+            except Exception as exc:
+                logger.exception("%r", exc)  # noqa: TRY401
+                results[position] = await self.error_handler(sys.exc_info(), raw_message)
+                continue
+
+            if deduplication is not None:
+                key = self.deduplication_key(message.content, message.metadata)
+                if key is not None and await self._is_duplicate(deduplication, key):
+                    results[position] = True
+                    continue
+                keys.append(key)
+
+            positions.append(position)
+            contents.append(message.content)
+            metadata.append(message.metadata)
+
+        if not contents:
+            return [bool(result) for result in results]
+
+        logger.debug("delivering batch route=%s, size=%d", self.name, len(contents))
+        try:
+            confirmations = await self._handle_batch(contents, metadata)
+        except Exception as exc:
+            logger.exception("%r", exc)  # noqa: TRY401
+            exc_info = sys.exc_info()
+            confirmations = [await self.error_handler(exc_info, raw_messages[position]) for position in positions]
+
+        for position, confirmation in zip(positions, confirmations, strict=True):
+            results[position] = confirmation
+
+        if deduplication is not None:
+            for key, confirmation in zip(keys, confirmations, strict=False):
+                if key is not None and confirmation:
+                    await deduplication.add(key)
+
+        return [bool(result) for result in results]
+
+    def _handle(self, message: MessageEnvelope):
+        if self.metrics is None and self.message_logger is None:
+            return self._call_handler(message.content, message.metadata)
+
+        return self._observe(self._call_handler(message.content, message.metadata), message.content)
+
+    async def _handle_batch(self, contents: list, metadata: list[Mapping]) -> Sequence[bool]:
+        # the deliver chain of the middlewares wraps `_handle`, so its result is checked here too
+        confirmations = await self._handle(MessageEnvelope(contents, metadata))
+
+        if isinstance(confirmations, bool):
+            return [confirmations] * len(contents)
+
+        if len(confirmations) != len(contents):
+            msg = f"{self.handler!r} returned {len(confirmations)} results for a batch of {len(contents)} messages"
+            raise ValueError(msg)
+
+        return confirmations
@@ -0,0 +1,161 @@
+import abc
+import asyncio
+import time
+from collections import deque
+from collections.abc import Sequence
+from typing import Any
+
+from .metrics import Metrics
+from .routes import Route
+
+
+class AbstractScheduler(abc.ABC):
+    """Buffer between the route pollers and the dispatcher consumers.
+
+    The scheduler decides which route the next message handed to a consumer comes from.
+    Like `asyncio.Queue`, every item taken with `get` must be marked with `task_done`
+    once processed, so `join` can wait for all buffered messages.
+    """
+
+    def __init__(self):
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+
+    @abc.abstractmethod
+    async def put(self, item: Any, route: Route, *, cost: int = 1):
+        """Put an item for the given route, waiting while the route buffer is full.
+
+        `cost` is the amount of messages in the item, used to share the consumers fairly.
+        """
+
+    @abc.abstractmethod
+    async def get(self) -> tuple[Any, Route]:
+        """Remove and return the next item to be processed and its route."""
+
+    @abc.abstractmethod
+    async def drain(self) -> list[tuple[Any, Route]]:
+        """Remove and return all the buffered items and their routes, marking them as done."""
+
+    @abc.abstractmethod
+    def free_slots(self, route: Route) -> int:
+        """Return how many items can still be put for the given route without waiting."""
+
+    @abc.abstractmethod
+    def qsize(self, route: Route | None = None) -> int:
+        """Return the amount of buffered items for the given route, or for all of them."""
+
+    def _item_added(self):
+        self._unfinished += 1
+        self._finished.clear()
+
+    def task_done(self):
+        if self._unfinished <= 0:
+            msg = "task_done() called too many times"
+            raise ValueError(msg)
+
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._finished.set()
+
+    async def join(self):
+        await self._finished.wait()
+
+
+class _Entry:
+    __slots__ = ("cost", "enqueued_at", "item")
+
+    def __init__(self, item: Any, cost: int, enqueued_at: float = 0.0):
+        self.item = item
+        self.cost = cost
+        self.enqueued_at = enqueued_at
+
+
+class FairScheduler(AbstractScheduler):
+    """Scheduler with a bounded buffer per route, served by priority and deficit round-robin.
+
+    Routes with a higher `priority` are always served first. Routes with the same priority
+    share the consumers proportionally to their `weight`, measured in messages, so a flooded
+    route cannot starve the others. Each route waits only for its own buffer when it is full.
+
+    The buffer size of a route is its `queue_size`, or `default_queue_size` when unset.
+    """
+
+    def __init__(self, routes: Sequence[Route], default_queue_size: int, *, metrics: Metrics | None = None):
+        super().__init__()
+
+        self.metrics = metrics
+
+        self._queues: dict[Route, deque[_Entry]] = {route: deque() for route in routes}
+        self._capacity = {route: route.queue_size or default_queue_size for route in routes}
+        self._slots = {route: asyncio.Semaphore(capacity) for route, capacity in self._capacity.items()}
+        self._deficits = dict.fromkeys(routes, 0)
+        self._items = asyncio.Semaphore(0)
+
+        # routes with buffered items, grouped by priority (highest first)
+        priorities = sorted({route.priority for route in routes}, reverse=True)
+        self._active: dict[int, deque[Route]] = {priority: deque() for priority in priorities}
+
+    def free_slots(self, route: Route) -> int:
+        return self._capacity[route] - len(self._queues[route])
+
+    def qsize(self, route: Route | None = None) -> int:
+        if route is not None:
+            return len(self._queues[route])
+
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def put(self, item: Any, route: Route, *, cost: int = 1):
+        await self._slots[route].acquire()
+
+        queue = self._queues[route]
+        if not queue:
+            self._active[route.priority].append(route)
+
+        if self.metrics is None:
+            queue.append(_Entry(item, cost))
+        else:
+            queue.append(_Entry(item, cost, time.perf_counter()))
+            self.metrics.message_queued(route.name, len(queue))
+
+        self._item_added()
+        self._items.release()
+
+    async def get(self) -> tuple[Any, Route]:
+        await self._items.acquire()
+
+        active = next(active for active in self._active.values() if active)
+        while True:
+            route = active[0]
+            queue = self._queues[route]
+
+            if self._deficits[route] < queue[0].cost:
+                # the route reached the head of the round, it earns its quantum
+                self._deficits[route] += route.weight
+                if self._deficits[route] < queue[0].cost:
+                    active.rotate(-1)
+                    continue
+
+            entry = queue.popleft()
+            self._deficits[route] -= entry.cost
+
+            if not queue:
+                self._deficits[route] = 0
+                active.popleft()
+            elif self._deficits[route] < queue[0].cost:
+                active.rotate(-1)
+
+            self._slots[route].release()
+            if self.metrics is not None:
+                self.metrics.message_dequeued(route.name, len(queue), time.perf_counter() - entry.enqueued_at)
+
+            return entry.item, route
+
+    async def drain(self) -> list[tuple[Any, Route]]:
+        items = []
+        # `get` does not wait while items are available, so no consumer can take them meanwhile
+        while not self._items.locked():
+            items.append(await self.get())
+            self.task_done()
+
+        return items
@@ -1,4 +1,5 @@
 import abc
+from collections.abc import Callable, Iterator, Mapping
 from typing import Any, TypedDict
 
 
@@ -7,13 +8,107 @@ class TranslatedMessage(TypedDict):
     metadata: dict
 
 
+class MessageEnvelope(Mapping):
+    """Translated message, with its `content` and `metadata` as attributes.
+
+    It can also be read as a mapping with the `content` and `metadata` keys, like the
+    `TranslatedMessage` dicts, and compares equal to such dicts. The envelopes of the batches
+    given to the middlewares hold the lists of contents and metadata.
+    """
+
+    __slots__ = ("content", "metadata")
+
+    def __init__(self, content: Any, metadata: Any):
+        self.content = content
+        self.metadata = metadata
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "content":
+            return self.content
+        if key == "metadata":
+            return self.metadata
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(("content", "metadata"))
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return f"{type(self).__name__}(content={self.content!r}, metadata={self.metadata!r})"
+
+
+class MetadataView(Mapping):
+    """Read-only metadata of a message, reading its raw message without copying it.
+
+    The `hidden_key` of `raw` (the message body) is left out, and the keys of `envelope`
+    (e.g. the decoded SNS notification) take precedence over the ones of `raw`. The values
+    of the `decoders` keys are decoded on first access only. The view is pickled as a plain
+    `dict`.
+    """
+
+    __slots__ = ("_decoded", "_decoders", "_envelope", "_raw")
+
+    hidden_key = "Body"
+
+    def __init__(
+        self,
+        raw: Mapping,
+        envelope: Mapping | None = None,
+        decoders: Mapping[str, Callable[[Any], Any]] | None = None,
+    ):
+        self._raw = raw
+        self._envelope = envelope
+        self._decoders = decoders
+        if decoders:
+            self._decoded: dict = {}
+
+    def _get(self, key: str) -> Any:
+        envelope = self._envelope
+        if envelope is not None and key in envelope:
+            return envelope[key]
+        if key == self.hidden_key:
+            raise KeyError(key)
+        return self._raw[key]
+
+    def __getitem__(self, key: str) -> Any:
+        decoders = self._decoders
+        if not decoders or key not in decoders:
+            return self._get(key)
+
+        if key in self._decoded:
+            return self._decoded[key]
+
+        value = self._decoded[key] = decoders[key](self._get(key))
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        envelope = self._envelope
+        if envelope is not None:
+            yield from envelope
+
+        for key in self._raw:
+            if key != self.hidden_key and (envelope is None or key not in envelope):
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return repr(dict(self))
+
+    def __reduce__(self):
+        return dict, (dict(self),)
+
+
 class AbstractTranslator(abc.ABC):
     @abc.abstractmethod
-    def translate(self, raw_message: dict) -> TranslatedMessage:
+    def translate(self, raw_message: dict) -> MessageEnvelope | TranslatedMessage:
         """Translate a given message to an appropriate format to message processing.
 
-        This method should return a `dict` instance with two keys: `content`
-        and `metadata`.
+        This method should return a `MessageEnvelope` (or a `dict` with two keys: `content`
+        and `metadata`).
         The `content` should contain the translated message and, `metadata` a
-        dictionary with translation metadata or an empty `dict`.
+        mapping with translation metadata or an empty `dict`.
         """
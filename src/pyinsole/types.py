@@ -1,4 +1,4 @@
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Sequence
 from typing import ParamSpec, Protocol, TypeVar
 
 ReturnT = TypeVar("ReturnT")
@@ -30,3 +30,23 @@ class Handler(Protocol):
         bool
             Returns `True` if the message processing was successful, and `False` if it failed.
         """
+
+
+class BatchHandler(Protocol):
+    async def __call__(self, messages: list, metadata: list[dict]) -> Sequence[bool] | bool:
+        """Process a batch of messages and their associated metadata, and return a status per message.
+
+        Parameters:
+        -----------
+        messages : list
+            The translated messages to be processed, in the order they were fetched.
+
+        metadata : list[dict]
+            The metadata of each message, in the same order as `messages`.
+
+        Returns:
+        --------
+        Sequence[bool] | bool
+            One status per message, `True` for the ones that were successfully processed.
+            A single `bool` applies to the whole batch.
+        """
@@ -41,13 +41,20 @@ class ClientContextCreator:
         pass
 
 
+def sqs_batch_success(QueueUrl, Entries):  # noqa: ARG001, N803
+    return {"Successful": [{"Id": entry["Id"]} for entry in Entries], "Failed": []}
+
+
 @pytest.fixture
 def boto_client_sqs(sqs_message):
     mock_client = mock.Mock()
     mock_client.delete_message = mock.AsyncMock()
+    mock_client.delete_message_batch = mock.AsyncMock(side_effect=sqs_batch_success)
     mock_client.receive_message = mock.AsyncMock(return_value=sqs_message)
     mock_client.send_message = mock.AsyncMock(return_value=sqs_send_message)
     mock_client.change_message_visibility = mock.AsyncMock()
+    mock_client.change_message_visibility_batch = mock.AsyncMock(side_effect=sqs_batch_success)
+    mock_client.get_queue_attributes = mock.AsyncMock(return_value={"Attributes": {"VisibilityTimeout": "30"}})
     mock_client.close = mock.AsyncMock()
     return mock_client
 
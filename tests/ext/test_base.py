@@ -1,6 +1,9 @@
+import logging
+from unittest import mock
+
 import pytest
 
-from pyinsole.ext.aws.base import BaseSQSProvider
+from pyinsole.ext.aws.base import BaseSQSProvider, ClientRegistry, clients
 
 
 @pytest.fixture
@@ -15,3 +18,92 @@ async def test_sqs_get_client(mock_boto_session_sqs, base_sqs_provider, boto_cli
         assert mock_session.called
         async with client_generator as client:
             assert boto_client_sqs is client
+
+
+def test_sqs_get_client_pool_options(mock_boto_session_sqs):
+    provider = BaseSQSProvider(region_name="us-east-1", max_pool_connections=50, keepalive_timeout=30)
+
+    with mock_boto_session_sqs as mock_session:
+        provider.get_client()
+
+    config = mock_session.call_args.kwargs["config"]
+    assert config.max_pool_connections == 50
+    assert config.connector_args == {"keepalive_timeout": 30}
+    assert mock_session.call_args.kwargs["region_name"] == "us-east-1"
+
+
+@pytest.mark.asyncio
+async def test_client_registry_shares_clients():
+    registry = ClientRegistry()
+    context = mock.MagicMock()
+    factory = mock.Mock(return_value=context)
+
+    async with registry.client("key", factory) as first, registry.client("key", factory) as second:
+        assert first is second
+        assert len(registry) == 1
+        assert not context.__aexit__.called
+
+    factory.assert_called_once_with()
+    context.__aexit__.assert_awaited_once_with(None, None, None)
+    assert len(registry) == 0
+
+
+@pytest.mark.asyncio
+async def test_client_registry_different_keys():
+    registry = ClientRegistry()
+    factory = mock.Mock(side_effect=mock.MagicMock)
+
+    async with registry.client("first", factory) as first, registry.client("second", factory) as second:
+        assert first is not second
+        assert len(registry) == 2
+
+
+@pytest.mark.asyncio
+async def test_use_client_shared(mock_boto_session_sqs, boto_client_sqs):
+    first = BaseSQSProvider(region_name="us-east-1")
+    second = BaseSQSProvider(region_name="us-east-1")
+    other = BaseSQSProvider(region_name="sa-east-1")
+
+    with mock_boto_session_sqs as mock_session:
+        async with first.use_client() as client, second.use_client() as second_client, other.use_client():
+            assert client is boto_client_sqs
+            assert second_client is client
+            assert len(clients) == 2
+
+    assert mock_session.call_count == 2
+    assert len(clients) == 0
+
+
+@pytest.mark.asyncio
+async def test_use_client_does_not_log_credentials(mock_boto_session_sqs, caplog):
+    options = {"aws_access_key_id": "key-id", "aws_secret_access_key": "secret", "aws_session_token": "token"}
+    provider = BaseSQSProvider(region_name="us-east-1", **options)
+    other = BaseSQSProvider(region_name="us-east-1", **{**options, "aws_secret_access_key": "other-secret"})
+
+    with caplog.at_level(logging.DEBUG, logger="pyinsole.ext.aws.base"), mock_boto_session_sqs:
+        async with provider.use_client(), other.use_client():
+            assert len(clients) == 2
+
+    assert "service=sqs region=us-east-1" in caplog.text
+    assert "secret" not in caplog.text
+    assert "token" not in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_use_client_not_shared(mock_boto_session_sqs):
+    first = BaseSQSProvider(shared_client=False)
+    second = BaseSQSProvider(shared_client=False)
+
+    with mock_boto_session_sqs as mock_session:
+        async with first.use_client(), second.use_client():
+            assert len(clients) == 0
+
+    assert mock_session.call_count == 2
+
+
+def test_session_created_lazily():
+    from pyinsole.ext.aws import base
+
+    assert base.session is base.get_session()
+    with pytest.raises(AttributeError, match="invalid"):
+        base.invalid  # noqa: B018
@@ -0,0 +1,187 @@
+import asyncio
+import os
+import time
+from unittest import mock
+
+import pytest
+
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.ext.local import InMemoryProvider, SpoolProvider
+from pyinsole.routes import Route
+
+
+class TestInMemoryProvider:
+    def test_invalid_batch_size(self):
+        with pytest.raises(ValueError, match="batch_size"):
+            InMemoryProvider(batch_size=0)
+
+    @pytest.mark.asyncio
+    async def test_fetch_messages(self):
+        provider = InMemoryProvider(["a", "b", "c"], batch_size=2)
+
+        first = await provider.fetch_messages()
+        second = await provider.fetch_messages()
+
+        assert [message["Body"] for message in first] == ["a", "b"]
+        assert [message["Body"] for message in second] == ["c"]
+        assert first[0]["Attributes"] == {"ApproximateReceiveCount": "1"}
+        assert len({message["ReceiptHandle"] for message in first + second}) == 3
+        assert provider.in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_confirm_message(self):
+        provider = InMemoryProvider(["a"])
+
+        [message] = await provider.fetch_messages()
+        await provider.confirm_message(message)
+
+        assert len(provider) == 0
+
+    @pytest.mark.asyncio
+    async def test_redelivery_after_visibility_timeout(self):
+        provider = InMemoryProvider(["a"], visibility_timeout=0.01, wait_time=0)
+
+        [first] = await provider.fetch_messages()
+        assert await provider.fetch_messages() == []
+        await asyncio.sleep(0.02)
+        [second] = await provider.fetch_messages()
+
+        assert second["MessageId"] == first["MessageId"]
+        assert second["ReceiptHandle"] != first["ReceiptHandle"]
+        assert second["Attributes"] == {"ApproximateReceiveCount": "2"}
+
+        # the previous receipt is no longer valid
+        await provider.confirm_message(first)
+        assert provider.in_flight == 1
+
+    @pytest.mark.asyncio
+    async def test_retry_message(self):
+        provider = InMemoryProvider(["a"], wait_time=0)
+
+        [message] = await provider.fetch_messages()
+        await provider.retry_message(message, 0)
+
+        [retried] = await provider.fetch_messages()
+        assert retried["Body"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_release_message(self):
+        provider = InMemoryProvider(["a"], wait_time=0)
+
+        [message] = await provider.fetch_messages()
+        await provider.release_message(message)
+
+        assert provider.in_flight == 0
+        [released] = await provider.fetch_messages()
+        assert released["Body"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_empty_fetch_waits_for_messages(self):
+        provider = InMemoryProvider(wait_time=5)
+
+        fetch = asyncio.create_task(provider.fetch_messages())
+        await asyncio.sleep(0.01)
+        await provider.send_message({"Body": "a"})
+
+        messages = await asyncio.wait_for(fetch, 1)
+        assert [message["Body"] for message in messages] == ["a"]
+
+    @pytest.mark.asyncio
+    async def test_dispatch(self):
+        provider = InMemoryProvider(range(20), wait_time=0)
+        handler = mock.AsyncMock(return_value=True)
+
+        await Dispatcher([Route(provider, handler)]).dispatch(forever=False)
+
+        assert handler.await_count == 10
+        assert len(provider) == 10
+
+
+class TestSpoolProvider:
+    @pytest.fixture
+    def directory(self, tmp_path):
+        return tmp_path / "spool"
+
+    def test_invalid_batch_size(self, directory):
+        with pytest.raises(ValueError, match="batch_size"):
+            SpoolProvider(directory, batch_size=0)
+
+    @pytest.mark.asyncio
+    async def test_send_and_fetch_messages(self, directory):
+        async with SpoolProvider(directory, batch_size=2, poll_interval=0) as provider:
+            for body in ("a", "b", "c"):
+                await provider.send_message({"Body": body})
+
+            first = await provider.fetch_messages()
+            second = await provider.fetch_messages()
+            assert await provider.fetch_messages() == []
+
+        assert [message["Body"] for message in first + second] == ["a", "b", "c"]
+        assert len(list((directory / ".processing").iterdir())) == 3
+
+    @pytest.mark.asyncio
+    async def test_shared_between_providers(self, directory):
+        async with (
+            SpoolProvider(directory, batch_size=1, poll_interval=0) as first,
+            SpoolProvider(directory, batch_size=1, poll_interval=0) as second,
+        ):
+            await first.send_message("a")
+            await first.send_message("b")
+
+            messages = [*await first.fetch_messages(), *await second.fetch_messages()]
+            assert await first.fetch_messages() == []
+
+        assert sorted(message["Body"] for message in messages) == ["a", "b"]
+
+    @pytest.mark.asyncio
+    async def test_confirm_message(self, directory):
+        async with SpoolProvider(directory, poll_interval=0) as provider:
+            await provider.send_message("a")
+            [message] = await provider.fetch_messages()
+            await provider.confirm_message(message)
+
+        assert list(directory.iterdir()) == [directory / ".processing"]
+        assert list((directory / ".processing").iterdir()) == []
+
+    @pytest.mark.asyncio
+    async def test_redelivery_after_visibility_timeout(self, directory):
+        async with SpoolProvider(directory, visibility_timeout=10, poll_interval=0) as provider:
+            await provider.send_message("a")
+            [message] = await provider.fetch_messages()
+
+            expired = time.time() - 11
+            os.utime(directory / ".processing" / message["ReceiptHandle"], (expired, expired))
+
+            [redelivered] = await provider.fetch_messages()
+
+        assert redelivered["MessageId"] == message["MessageId"]
+
+    @pytest.mark.asyncio
+    async def test_stale_receipt_after_redelivery(self, directory):
+        async with SpoolProvider(directory, visibility_timeout=10, poll_interval=0) as provider:
+            await provider.send_message("a")
+            [message] = await provider.fetch_messages()
+
+            expired = time.time() - 11
+            os.utime(directory / ".processing" / message["ReceiptHandle"], (expired, expired))
+            [redelivered] = await provider.fetch_messages()
+            assert redelivered["ReceiptHandle"] != message["ReceiptHandle"]
+
+            # the late confirmation of the first claim does not remove the second one
+            await provider.confirm_message(message)
+            await provider.retry_message(redelivered, 0)
+
+            [retried] = await provider.fetch_messages()
+
+        assert retried["Body"] == "a"
+
+    @pytest.mark.asyncio
+    async def test_retry_message(self, directory):
+        async with SpoolProvider(directory, visibility_timeout=60, poll_interval=0) as provider:
+            await provider.send_message("a")
+            [message] = await provider.fetch_messages()
+            await provider.retry_message(message, 0)
+
+            [retried] = await provider.fetch_messages()
+
+        assert retried["Body"] == "a"
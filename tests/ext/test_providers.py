@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from unittest import mock
 
 import pytest
@@ -5,6 +7,7 @@ from botocore.exceptions import BotoCoreError, ClientError
 
 from pyinsole.exceptions import ProviderError
 from pyinsole.ext.aws.providers import SQSProvider
+from pyinsole.metrics import InMemoryMetrics
 
 
 @pytest.mark.asyncio
@@ -117,3 +120,304 @@ async def test_custom_visibility_timeout(mock_boto_session_sqs, boto_client_sqs)
         MaxNumberOfMessages=options.get("MaxNumberOfMessages"),
         VisibilityTimeout=options.get("VisibilityTimeout"),
     )
+
+
+@pytest.mark.asyncio
+async def test_confirm_message_batch_full(mock_boto_session_sqs, boto_client_sqs):
+    messages = [{"ReceiptHandle": f"receipt-{i}"} for i in range(10)]
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", batch_acks=True, ack_batch_window=60) as provider:
+            async with asyncio.timeout(1):
+                results = await asyncio.gather(*(provider.confirm_message(message) for message in messages))
+
+    assert results == [True] * 10
+    boto_client_sqs.delete_message.assert_not_awaited()
+    boto_client_sqs.delete_message_batch.assert_awaited_once_with(
+        QueueUrl="queue-url",
+        Entries=[{"Id": str(i), "ReceiptHandle": f"receipt-{i}"} for i in range(10)],
+    )
+
+
+@pytest.mark.asyncio
+async def test_confirm_message_batch_window(mock_boto_session_sqs, boto_client_sqs):
+    messages = [{"ReceiptHandle": f"receipt-{i}"} for i in range(13)]
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", batch_acks=True, ack_batch_window=0.01) as provider:
+            results = await asyncio.gather(*(provider.confirm_message(message) for message in messages))
+
+    assert results == [True] * 13
+    assert boto_client_sqs.delete_message_batch.await_count == 2
+    assert len(boto_client_sqs.delete_message_batch.await_args_list[0].kwargs["Entries"]) == 10
+    assert len(boto_client_sqs.delete_message_batch.await_args_list[1].kwargs["Entries"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_confirm_message_batch_does_not_wait(mock_boto_session_sqs, boto_client_sqs):
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", batch_acks=True, ack_batch_window=60) as provider:
+            async with asyncio.timeout(1):
+                assert await provider.confirm_message({"ReceiptHandle": "receipt"}) is True
+            boto_client_sqs.delete_message_batch.assert_not_awaited()
+
+    boto_client_sqs.delete_message_batch.assert_awaited_once_with(
+        QueueUrl="queue-url", Entries=[{"Id": "0", "ReceiptHandle": "receipt"}]
+    )
+
+
+@pytest.mark.asyncio
+async def test_confirm_message_batch_entry_errors(mock_boto_session_sqs, boto_client_sqs, caplog):
+    boto_client_sqs.delete_message_batch.side_effect = None
+    boto_client_sqs.delete_message_batch.return_value = {
+        "Successful": [{"Id": "0"}],
+        "Failed": [
+            {"Id": "1", "Code": "ReceiptHandleIsInvalid", "SenderFault": True},
+            {"Id": "2", "Code": "InternalError", "SenderFault": False},
+        ],
+    }
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", batch_acks=True, ack_batch_window=0.01) as provider:
+            results = [await provider.confirm_message({"ReceiptHandle": f"receipt-{i}"}) for i in range(3)]
+
+    assert results == [True] * 3
+    [record] = [record for record in caplog.records if record.levelno == logging.ERROR]
+    assert "InternalError" in record.getMessage()
+
+
+@pytest.mark.asyncio
+async def test_confirm_message_batch_not_found(mock_boto_session_sqs, boto_client_sqs):
+    error = ClientError(error_response={"ResponseMetadata": {"HTTPStatusCode": 404}}, operation_name="whatever")
+    boto_client_sqs.delete_message_batch.side_effect = error
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", batch_acks=True, ack_batch_window=0.01) as provider:
+            assert await provider.confirm_message({"ReceiptHandle": "receipt"}) is True
+
+
+@pytest.mark.asyncio
+async def test_confirm_message_batch_unknown_error(mock_boto_session_sqs, boto_client_sqs, caplog):
+    error = ClientError(error_response={"ResponseMetadata": {"HTTPStatusCode": 400}}, operation_name="whatever")
+    boto_client_sqs.delete_message_batch.side_effect = error
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", batch_acks=True, ack_batch_window=0.01) as provider:
+            assert await provider.confirm_message({"ReceiptHandle": "receipt"}) is True
+
+    assert "delete_message_batch failed for 1 entries" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_message_not_processed_default(mock_boto_session_sqs, boto_client_sqs):
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url") as provider:
+            await provider.message_not_processed({"ReceiptHandle": "receipt"})
+
+    boto_client_sqs.change_message_visibility.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("nack_visibility_timeout", [0, lambda message: len(message["ReceiptHandle"]) - 7])
+async def test_message_not_processed_visibility(mock_boto_session_sqs, boto_client_sqs, nack_visibility_timeout):
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", nack_visibility_timeout=nack_visibility_timeout) as provider:
+            await provider.message_not_processed({"ReceiptHandle": "receipt"})
+
+    boto_client_sqs.change_message_visibility.assert_awaited_once_with(
+        QueueUrl="queue-url", ReceiptHandle="receipt", VisibilityTimeout=0
+    )
+
+
+@pytest.mark.asyncio
+async def test_message_not_processed_visibility_not_found(mock_boto_session_sqs, boto_client_sqs):
+    error = ClientError(error_response={"ResponseMetadata": {"HTTPStatusCode": 404}}, operation_name="whatever")
+    boto_client_sqs.change_message_visibility.side_effect = error
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", nack_visibility_timeout=0) as provider:
+            assert await provider.message_not_processed({"ReceiptHandle": "receipt"}) is True
+
+
+@pytest.mark.asyncio
+async def test_visibility_heartbeat(mock_boto_session_sqs, boto_client_sqs):
+    boto_client_sqs.receive_message.return_value = {"Messages": [{"ReceiptHandle": "receipt", "Body": "test"}]}
+    options = {"VisibilityTimeout": 0.05}
+
+    with mock_boto_session_sqs:
+        async with SQSProvider(
+            "queue-url", options=options, visibility_heartbeat=True, heartbeat_interval=0.01
+        ) as provider:
+            [message] = await provider.fetch_messages()
+            await asyncio.sleep(0.1)
+
+            assert boto_client_sqs.change_message_visibility_batch.await_count > 0
+            boto_client_sqs.change_message_visibility_batch.assert_awaited_with(
+                QueueUrl="queue-url", Entries=[{"Id": "0", "ReceiptHandle": "receipt", "VisibilityTimeout": 0.05}]
+            )
+
+            await provider.confirm_message(message)
+            await asyncio.sleep(0.01)
+            boto_client_sqs.change_message_visibility_batch.reset_mock()
+            await asyncio.sleep(0.1)
+
+    boto_client_sqs.get_queue_attributes.assert_not_awaited()
+    boto_client_sqs.change_message_visibility_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_visibility_heartbeat_stops_on_reject(mock_boto_session_sqs, boto_client_sqs):
+    boto_client_sqs.receive_message.return_value = {"Messages": [{"ReceiptHandle": "receipt", "Body": "test"}]}
+    options = {"VisibilityTimeout": 0.05}
+
+    with mock_boto_session_sqs:
+        async with SQSProvider(
+            "queue-url", options=options, visibility_heartbeat=True, heartbeat_interval=0.01
+        ) as provider:
+            [message] = await provider.fetch_messages()
+            await provider.message_not_processed(message)
+            await asyncio.sleep(0.1)
+
+    boto_client_sqs.change_message_visibility_batch.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_visibility_heartbeat_queue_timeout(mock_boto_session_sqs, boto_client_sqs):
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", visibility_heartbeat=True) as provider:
+            assert provider._visibility_timeout == 30  # noqa: SLF001
+
+    boto_client_sqs.get_queue_attributes.assert_awaited_once_with(
+        QueueUrl="queue-url", AttributeNames=["VisibilityTimeout"]
+    )
+
+
+@pytest.mark.asyncio
+async def test_fetch_messages_idle_wait_time(mock_boto_session_sqs, boto_client_sqs, sqs_message):
+    boto_client_sqs.receive_message.side_effect = [sqs_message, {"Messages": []}, {"Messages": []}, sqs_message]
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", idle_wait_time=20) as provider:
+            for _ in range(4):
+                await provider.fetch_messages()
+
+    assert boto_client_sqs.receive_message.call_args_list == [
+        mock.call(QueueUrl="queue-url", WaitTimeSeconds=0),
+        mock.call(QueueUrl="queue-url", WaitTimeSeconds=0),
+        mock.call(QueueUrl="queue-url", WaitTimeSeconds=20),
+        mock.call(QueueUrl="queue-url", WaitTimeSeconds=20),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_fetch_messages_idle_wait_time_with_fixed_wait_time(mock_boto_session_sqs, boto_client_sqs):
+    boto_client_sqs.receive_message.return_value = {"Messages": []}
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url", options={"WaitTimeSeconds": 5}, idle_wait_time=20) as provider:
+            await provider.fetch_messages()
+            await provider.fetch_messages()
+
+    assert boto_client_sqs.receive_message.call_args == mock.call(QueueUrl="queue-url", WaitTimeSeconds=5)
+
+
+@pytest.mark.asyncio
+async def test_fetch_messages_selected_attributes(mock_boto_session_sqs, boto_client_sqs):
+    options = {"MessageAttributeNames": ["tenant"], "WaitTimeSeconds": 5}
+    provider = SQSProvider(
+        "queue-url",
+        options=options,
+        message_attributes=["tenant", "trace.*"],
+        system_attributes=["SentTimestamp", "SentTimestamp"],
+    )
+
+    with mock_boto_session_sqs:
+        async with provider:
+            await provider.fetch_messages()
+
+    assert boto_client_sqs.receive_message.call_args == mock.call(
+        QueueUrl="queue-url",
+        WaitTimeSeconds=5,
+        MessageAttributeNames=["tenant", "trace.*"],
+        MessageSystemAttributeNames=["SentTimestamp"],
+    )
+    assert options == {"MessageAttributeNames": ["tenant"], "WaitTimeSeconds": 5}
+
+
+def test_invalid_system_attributes():
+    with pytest.raises(ValueError, match="SentTime"):
+        SQSProvider("queue-url", system_attributes=["SentTime"])
+
+
+def test_attributes_must_be_sequences():
+    with pytest.raises(TypeError, match="sequences"):
+        SQSProvider("queue-url", message_attributes="tenant")
+
+
+@pytest.mark.asyncio
+async def test_provider_request_metrics(mock_boto_session_sqs):
+    metrics = InMemoryMetrics()
+    provider = SQSProvider("queue-url", batch_acks=True, ack_batch_window=0.01)
+    provider.metrics = metrics
+
+    with mock_boto_session_sqs:
+        async with provider:
+            [message] = await provider.fetch_messages()
+            await provider.confirm_message({"ReceiptHandle": "receipt", **message})
+
+    requests = metrics.counters["pyinsole_provider_requests_total"]
+    assert requests[(("provider", "<SQSProvider: queue-url>"), ("operation", "receive_message"))] == 1
+    assert requests[(("provider", "<SQSProvider: queue-url>"), ("operation", "delete_message_batch"))] == 1
+
+
+@pytest.mark.asyncio
+async def test_providers_share_client(mock_boto_session_sqs, boto_client_sqs):
+    with mock_boto_session_sqs as mock_session:
+        async with SQSProvider("first-queue") as first, SQSProvider("second-queue") as second:
+            await first.confirm_message({"ReceiptHandle": "first"})
+            await second.confirm_message({"ReceiptHandle": "second"})
+
+    assert mock_session.call_count == 1
+    assert boto_client_sqs.delete_message.call_count == 2
+    assert first._client is None  # noqa: SLF001
+    assert second._client is None  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_retry_message(mock_boto_session_sqs, boto_client_sqs):
+    with mock_boto_session_sqs:
+        async with SQSProvider("queue-url") as provider:
+            await provider.retry_message({"ReceiptHandle": "receipt"}, 12.7)
+            await provider.retry_message({"ReceiptHandle": "receipt"}, 10**6)
+
+    assert boto_client_sqs.change_message_visibility.call_args_list == [
+        mock.call(QueueUrl="queue-url", ReceiptHandle="receipt", VisibilityTimeout=12),
+        mock.call(QueueUrl="queue-url", ReceiptHandle="receipt", VisibilityTimeout=43200),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_send_message(mock_boto_session_sqs, boto_client_sqs):
+    attributes = {"key": {"DataType": "String", "StringValue": "value"}}
+    message = {"MessageId": "id", "Body": "body", "MessageAttributes": attributes, "Attributes": {}}
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("dead-letter-url") as provider:
+            await provider.send_message(message)
+
+    boto_client_sqs.send_message.assert_awaited_once_with(
+        QueueUrl="dead-letter-url", MessageBody="body", MessageAttributes=attributes
+    )
+
+
+@pytest.mark.asyncio
+async def test_send_message_fifo(mock_boto_session_sqs, boto_client_sqs):
+    message = {"MessageId": "id", "Body": "body", "Attributes": {"MessageGroupId": "group"}}
+
+    with mock_boto_session_sqs:
+        async with SQSProvider("dead-letter-url.fifo") as provider:
+            await provider.send_message(message)
+
+    boto_client_sqs.send_message.assert_awaited_once_with(
+        QueueUrl="dead-letter-url.fifo", MessageBody="body", MessageGroupId="group", MessageDeduplicationId="id"
+    )
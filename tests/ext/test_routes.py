@@ -1,6 +1,10 @@
+import json
+
 from pyinsole.ext.aws.providers import SQSProvider
-from pyinsole.ext.aws.routes import SNSQueueRoute, SQSRoute
+from pyinsole.ext.aws.routes import SNSQueueRoute, SQSBatchRoute, SQSRoute
 from pyinsole.ext.aws.translators import SNSMessageTranslator, SQSMessageTranslator
+from pyinsole.retries import RetryPolicy
+from pyinsole.routes import BatchRoute
 
 
 class TestSQSRoute:
@@ -23,6 +27,58 @@ class TestSQSRoute:
         assert "use_ssl" in route.provider._client_options  # noqa: SLF001
         assert route.provider._client_options["use_ssl"] is False  # noqa: SLF001
 
+    def test_retry_policy_requests_receive_count(self, dummy_handler):
+        provider_options = {"options": {"MessageSystemAttributeNames": ["SentTimestamp"], "WaitTimeSeconds": 5}}
+        route = SQSRoute("what", handler=dummy_handler, provider_options=provider_options, retry_policy=RetryPolicy())
+
+        options = route.provider._options  # noqa: SLF001
+        assert options["MessageSystemAttributeNames"] == ["SentTimestamp", "ApproximateReceiveCount"]
+        assert options["WaitTimeSeconds"] == 5
+        assert provider_options["options"]["MessageSystemAttributeNames"] == ["SentTimestamp"]
+
+    def test_retry_policy_keeps_requested_attributes(self, dummy_handler):
+        provider_options = {"options": {"MessageSystemAttributeNames": ["All"]}}
+        route = SQSRoute("what", handler=dummy_handler, provider_options=provider_options, retry_policy=RetryPolicy())
+
+        assert route.provider._options["MessageSystemAttributeNames"] == ["All"]  # noqa: SLF001
+
+    def test_declared_attributes(self, dummy_handler):
+        route = SQSRoute(
+            "what",
+            handler=dummy_handler,
+            message_attributes=["tenant"],
+            system_attributes=["SentTimestamp"],
+            retry_policy=RetryPolicy(),
+        )
+
+        options = route.provider._options  # noqa: SLF001
+        assert options["MessageAttributeNames"] == ["tenant"]
+        assert options["MessageSystemAttributeNames"] == ["ApproximateReceiveCount", "SentTimestamp"]
+        assert route.translator.decode_attributes is True
+
+    def test_declared_attributes_decoded(self, dummy_handler):
+        route = SQSRoute("what", handler=dummy_handler, message_attributes=["tenant"])
+        raw_message = {
+            "Body": json.dumps("content"),
+            "Attributes": {"SentTimestamp": "1700000000000", "MessageGroupId": "group"},
+            "MessageAttributes": {"tenant": {"DataType": "String", "StringValue": "acme"}},
+        }
+
+        metadata = route.prepare_message(raw_message).metadata
+
+        assert metadata["MessageAttributes"] == {"tenant": "acme"}
+        assert metadata["Attributes"] == {"SentTimestamp": 1700000000000, "MessageGroupId": "group"}
+
+    def test_attributes_not_decoded_by_default(self, dummy_handler):
+        route = SQSRoute("what", handler=dummy_handler)
+        assert route.translator.decode_attributes is False
+
+    def test_ordered_requests_group_id(self, dummy_handler):
+        route = SQSRoute("what.fifo", handler=dummy_handler, ordered=True)
+
+        assert route.ordered is True
+        assert route.provider._options["MessageSystemAttributeNames"] == ["MessageGroupId"]  # noqa: SLF001
+
 
 class TestSNSQueueRoute:
     def test_route(self, dummy_handler):
@@ -43,3 +99,19 @@ class TestSNSQueueRoute:
         route = SNSQueueRoute("what", handler=dummy_handler, provider_options={"use_ssl": False}, name="foobar")
         assert "use_ssl" in route.provider._client_options  # noqa: SLF001
         assert route.provider._client_options["use_ssl"] is False  # noqa: SLF001
+
+    def test_declared_attributes(self, dummy_handler):
+        route = SNSQueueRoute("what", handler=dummy_handler, message_attributes=["tenant"])
+        assert isinstance(route.translator, SNSMessageTranslator)
+        assert route.translator.decode_attributes is True
+
+
+class TestSQSBatchRoute:
+    def test_route(self, dummy_handler):
+        route = SQSBatchRoute("what", handler=dummy_handler, batch_size=5, batch_window=1.5)
+        assert isinstance(route, BatchRoute)
+        assert isinstance(route.translator, SQSMessageTranslator)
+        assert isinstance(route.provider, SQSProvider)
+        assert route.name == "what"
+        assert route.batch_size == 5
+        assert route.batch_window == 1.5
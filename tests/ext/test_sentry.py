@@ -1,3 +1,5 @@
+import asyncio
+import threading
 from typing import TYPE_CHECKING
 from unittest import mock
 
@@ -10,7 +12,11 @@ if TYPE_CHECKING:
 else:
     sentry_sdk = pytest.importorskip("sentry_sdk")
 
-from pyinsole.ext.sentry import sentry_handler
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.ext.local import InMemoryProvider
+from pyinsole.ext.sentry import SentryReporter, sentry_handler
+from pyinsole.metrics import InMemoryMetrics
+from pyinsole.routes import Route
 
 pytestmark = pytest.mark.asyncio
 
@@ -47,3 +53,120 @@ async def test_sentry_handler_delete_message(faker: Faker):
     assert got is True
     assert current_scope._extras.get("message") == given_message  # noqa: SLF001
     mock_capture_exception.assert_called_once_with(given_exception)
+
+
+def raise_error(value):
+    raise ValueError(value)
+
+
+def raise_error_elsewhere(value):
+    raise ValueError(value)
+
+
+def fail(value, raise_function=raise_error):
+    try:
+        raise_function(value)
+    except ValueError as exc:
+        return exc
+
+
+async def test_sentry_reporter_groups_errors():
+    metrics = InMemoryMetrics()
+    reporter = SentryReporter(window=60, metrics=metrics)
+    error_handler = reporter.error_handler("route", delete_message=True)
+
+    with mock.patch("pyinsole.ext.sentry.sentry_sdk.capture_exception") as mock_capture_exception:
+        results = [await error_handler(fail(index), {"index": index}) for index in range(5)]
+        await error_handler(fail(5, raise_error_elsewhere), {"index": 5})
+        mock_capture_exception.assert_not_called()
+
+        await reporter.close()
+
+    assert results == [True] * 5
+    assert [call.args[0].args for call in mock_capture_exception.call_args_list] == [(0,), (5,)]
+    assert reporter.errors == {"route": 6}
+    assert metrics.counters["pyinsole_errors_reported_total"] == {(("route", "route"), ("sent", "true")): 6}
+
+
+async def test_sentry_reporter_dispatch():
+    reporter = SentryReporter()
+    provider = InMemoryProvider(["first", "second"], wait_time=0)
+    exception = ValueError("error")
+
+    async def handler(message, metadata):  # noqa: ARG001
+        raise exception
+
+    route = Route(provider, handler, name="route", error_handler=reporter.error_handler("route", delete_message=True))
+    with mock.patch("pyinsole.ext.sentry.sentry_sdk.capture_exception") as mock_capture_exception:
+        await Dispatcher([route]).dispatch(forever=False)
+        await reporter.close()
+
+    mock_capture_exception.assert_called_once_with(exception)
+    assert reporter.errors == {"route": 2}
+    assert len(provider) == 0
+
+
+async def test_sentry_reporter_capture_scope():
+    reporter = SentryReporter(max_message_length=20)
+    captured = {}
+
+    def capture_exception(exception):
+        scope = sentry_sdk.get_current_scope()
+        captured.update(scope._extras, tags=scope._tags, exception=exception, thread=threading.current_thread())  # noqa: SLF001
+
+    exception = fail("error")
+    with mock.patch("pyinsole.ext.sentry.sentry_sdk.capture_exception", capture_exception):
+        await reporter.error_handler("route")(exception, "x" * 100)
+        await reporter.error_handler("route")(fail("other"), "message")
+        await reporter.close()
+
+    assert captured["exception"] is exception
+    assert captured["message"] == repr("x" * 100)[:20] + "..."
+    assert captured["occurrences"] == 2
+    assert captured["tags"] == {"route": "route"}
+    assert captured["thread"] is not threading.current_thread()
+
+
+async def test_sentry_reporter_limits_events():
+    metrics = InMemoryMetrics()
+    reporter = SentryReporter(max_events=1, metrics=metrics)
+
+    with mock.patch("pyinsole.ext.sentry.sentry_sdk.capture_exception") as mock_capture_exception:
+        reporter.report("first", fail("error"), "message")
+        reporter.report("second", fail("error"), "message")
+        await reporter.close()
+
+    mock_capture_exception.assert_called_once()
+    assert metrics.counters["pyinsole_errors_reported_total"] == {
+        (("route", "first"), ("sent", "true")): 1,
+        (("route", "second"), ("sent", "false")): 1,
+    }
+
+
+async def test_sentry_reporter_sample_rate():
+    reporter = SentryReporter(sample_rate=0)
+
+    with mock.patch("pyinsole.ext.sentry.sentry_sdk.capture_exception") as mock_capture_exception:
+        reporter.report("route", fail("error"), "message")
+        await reporter.close()
+
+    mock_capture_exception.assert_not_called()
+    assert reporter.errors == {"route": 1}
+
+
+async def test_sentry_reporter_window():
+    reporter = SentryReporter(window=0.01)
+
+    with mock.patch("pyinsole.ext.sentry.sentry_sdk.capture_exception") as mock_capture_exception:
+        reporter.report("route", fail("first"), "message")
+        await asyncio.sleep(0.05)
+        reporter.report("route", fail("second"), "message")
+        await reporter.close()
+
+    assert [call.args[0].args for call in mock_capture_exception.call_args_list] == [("first",), ("second",)]
+
+
+@pytest.mark.parametrize("kwargs", [{"window": 0}, {"sample_rate": 1.5}, {"max_events": 0}, {"max_pending": 0}])
+async def test_sentry_reporter_invalid_options(kwargs):
+    with pytest.raises(ValueError, match="must be"):
+        SentryReporter(**kwargs)
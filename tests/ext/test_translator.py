@@ -1,8 +1,11 @@
+import base64
 import json
 
 import pytest
 
+from pyinsole.decoders import available_backends
 from pyinsole.ext.aws.translators import SNSMessageTranslator, SQSMessageTranslator
+from pyinsole.translators import MetadataView
 
 
 class TestSQSMessageTranslator:
@@ -96,3 +99,114 @@ class TestSNSMessageTranslator:
         content = sns_translator.translate(message)
 
         assert content["content"] is None
+
+
+class TestTranslatorDecoders:
+    @pytest.mark.parametrize("backend", available_backends())
+    @pytest.mark.parametrize("translator_class", [SQSMessageTranslator, SNSMessageTranslator])
+    def test_translate_with_backend(self, backend, translator_class):
+        content = {"key": "value", "list": [1, 2]}
+        body = json.dumps(content)
+        if translator_class is SNSMessageTranslator:
+            body = json.dumps({"Message": body, "foo": "nested"})
+
+        translated = translator_class(backend).translate({"Body": body, "bar": "not nested"})
+
+        assert translated["content"] == content
+        assert translated["metadata"]["bar"] == "not nested"
+
+    @pytest.mark.parametrize("backend", available_backends())
+    @pytest.mark.parametrize("translator_class", [SQSMessageTranslator, SNSMessageTranslator])
+    def test_translate_with_backend_handles_json_error(self, backend, translator_class):
+        body = "invalid: json"
+        if translator_class is SNSMessageTranslator:
+            body = json.dumps({"Message": body})
+
+        translated = translator_class(backend).translate({"Body": body})
+
+        assert translated["content"] is None
+
+    def test_translate_with_decoder_function(self):
+        translator = SQSMessageTranslator(lambda body: body.upper())
+
+        translated = translator.translate({"Body": "content"})
+
+        assert translated["content"] == "CONTENT"
+
+    def test_decoder_function_with_model(self):
+        with pytest.raises(ValueError, match="model"):
+            SQSMessageTranslator(json.loads, model=dict)
+
+    def test_translate_sns_with_model(self):
+        msgspec = pytest.importorskip("msgspec")
+
+        class Order(msgspec.Struct):
+            id: int
+
+        translator = SNSMessageTranslator("msgspec", model=Order)
+        body = json.dumps({"Message": json.dumps({"id": 42}), "foo": "nested"})
+
+        translated = translator.translate({"Body": body})
+
+        assert translated["content"] == Order(id=42)
+        assert translated["metadata"]["foo"] == "nested"
+
+        body = json.dumps({"Message": json.dumps({"id": "invalid"})})
+        assert translator.translate({"Body": body})["content"] is None
+
+
+class TestTranslatorMetadata:
+    def test_sqs_metadata_is_a_view(self):
+        original = {"Body": json.dumps("content"), "MessageId": "id"}
+
+        metadata = SQSMessageTranslator().translate(original)["metadata"]
+
+        assert isinstance(metadata, MetadataView)
+        assert metadata == {"MessageId": "id"}
+        assert original["Body"] == json.dumps("content")
+
+    def test_sqs_attributes_raw_by_default(self):
+        attributes = {"name": {"DataType": "String", "StringValue": "value"}}
+        original = {"Body": json.dumps("content"), "MessageAttributes": attributes}
+
+        translated = SQSMessageTranslator().translate(original)
+
+        assert translated["metadata"]["MessageAttributes"] == attributes
+
+    def test_sqs_decode_attributes(self):
+        attributes = {
+            "string": {"DataType": "String", "StringValue": "value"},
+            "integer": {"DataType": "Number", "StringValue": "42"},
+            "float": {"DataType": "Number.float", "StringValue": "1.5"},
+            "binary": {"DataType": "Binary", "BinaryValue": b"\x00\x01"},
+        }
+        original = {"Body": json.dumps("content"), "MessageAttributes": attributes}
+
+        translated = SQSMessageTranslator(decode_attributes=True).translate(original)
+
+        assert translated["metadata"]["MessageAttributes"] == {
+            "string": "value",
+            "integer": 42,
+            "float": 1.5,
+            "binary": b"\x00\x01",
+        }
+
+    def test_sns_decode_attributes(self):
+        attributes = {
+            "string": {"Type": "String", "Value": "value"},
+            "number": {"Type": "Number", "Value": "42"},
+            "binary": {"Type": "Binary", "Value": base64.b64encode(b"\x00\x01").decode()},
+            "array": {"Type": "String.Array", "Value": '["a", "b"]'},
+        }
+        envelope = {"Message": json.dumps("content"), "MessageAttributes": attributes}
+        original = {"Body": json.dumps(envelope), "MessageId": "id"}
+
+        translated = SNSMessageTranslator(decode_attributes=True).translate(original)
+
+        assert translated["metadata"]["MessageId"] == "id"
+        assert translated["metadata"]["MessageAttributes"] == {
+            "string": "value",
+            "number": 42,
+            "binary": b"\x00\x01",
+            "array": ["a", "b"],
+        }
@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from pyinsole import decoders
+from pyinsole.decoders import available_backends, json_decoder
+
+
+def test_available_backends():
+    backends = available_backends()
+
+    assert backends[-1] == "json"
+    assert set(backends) <= set(decoders.AUTO_BACKENDS)
+
+
+@pytest.mark.parametrize("backend", available_backends())
+def test_json_decoder(backend):
+    decode = json_decoder(backend)
+
+    assert decode('{"key": ["value", 1, null]}') == {"key": ["value", 1, None]}
+    assert decode(b'"content"') == "content"
+
+
+@pytest.mark.parametrize("backend", available_backends())
+@pytest.mark.parametrize("document", ["invalid: json", "", "{"])
+def test_json_decoder_invalid_document(backend, document):
+    decode = json_decoder(backend)
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        decode(document)
+
+
+def test_json_decoder_default_is_stdlib():
+    assert json_decoder() is json.loads
+
+
+def test_json_decoder_auto():
+    decode = json_decoder("auto")
+
+    assert decode('{"key": "value"}') == {"key": "value"}
+
+
+def test_json_decoder_unknown_backend():
+    with pytest.raises(ValueError, match="unknown JSON decoder backend"):
+        json_decoder("yaml")
+
+
+def test_json_decoder_model_requires_msgspec():
+    with pytest.raises(ValueError, match="requires the msgspec backend"):
+        json_decoder("json", model=dict)
+
+
+@pytest.mark.parametrize("backend", ["orjson", "msgspec"])
+def test_json_decoder_missing_package(backend, monkeypatch):
+    monkeypatch.setattr(decoders, backend, None)
+
+    with pytest.raises(ImportError, match=f"pyinsole\\[{backend}\\]"):
+        json_decoder(backend)
+
+    assert backend not in available_backends()
+
+
+def test_json_decoder_model():
+    msgspec = pytest.importorskip("msgspec")
+
+    class Order(msgspec.Struct):
+        id: int
+        items: list[str]
+
+    decode = json_decoder("auto", model=Order)
+
+    assert decode('{"id": 1, "items": ["a", "b"]}') == Order(id=1, items=["a", "b"])
+    with pytest.raises(ValueError):  # noqa: PT011
+        decode('{"id": "1", "items": []}')
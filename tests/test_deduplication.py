@@ -0,0 +1,122 @@
+import asyncio
+import multiprocessing
+from unittest import mock
+
+import pytest
+
+from pyinsole.deduplication import InMemoryDeduplicationCache, SQLiteDeduplicationCache
+
+
+@pytest.mark.parametrize("ttl", [0, -1])
+def test_invalid_ttl(ttl):
+    with pytest.raises(ValueError, match="ttl"):
+        InMemoryDeduplicationCache(ttl=ttl)
+
+
+def test_invalid_max_size():
+    with pytest.raises(ValueError, match="max_size"):
+        InMemoryDeduplicationCache(max_size=0)
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache():
+    cache = InMemoryDeduplicationCache()
+
+    assert await cache.is_duplicate("key") is False
+    await cache.add("key")
+    assert await cache.is_duplicate("key") is True
+    assert await cache.is_duplicate("other") is False
+
+    assert cache.hits == 1
+    assert cache.misses == 2
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_evicts_least_recently_added():
+    cache = InMemoryDeduplicationCache(max_size=2)
+
+    await cache.add("first")
+    await cache.add("second")
+    await cache.add("first")
+    await cache.add("third")
+
+    assert len(cache) == 2
+    assert await cache.contains("first")
+    assert not await cache.contains("second")
+    assert await cache.contains("third")
+
+
+@pytest.mark.asyncio
+async def test_in_memory_cache_expiration():
+    cache = InMemoryDeduplicationCache(ttl=10)
+
+    with mock.patch("pyinsole.deduplication.time.monotonic", return_value=100):
+        await cache.add("first")
+    with mock.patch("pyinsole.deduplication.time.monotonic", return_value=105):
+        await cache.add("second")
+
+    with mock.patch("pyinsole.deduplication.time.monotonic", return_value=110):
+        assert not await cache.contains("first")
+        assert await cache.contains("second")
+
+    assert len(cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache(tmp_path):
+    path = str(tmp_path / "deduplication.db")
+    cache = SQLiteDeduplicationCache(path)
+    other_process_cache = SQLiteDeduplicationCache(path)
+
+    assert await cache.is_duplicate("key") is False
+    await cache.add("key")
+
+    assert await cache.is_duplicate("key") is True
+    assert await other_process_cache.is_duplicate("key") is True
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    cache.close()
+    other_process_cache.close()
+
+
+def add_key(cache, key):
+    asyncio.run(cache.add(key))
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_connection_per_process(tmp_path):
+    cache = SQLiteDeduplicationCache(str(tmp_path / "deduplication.db"))
+    assert cache._connection is None  # noqa: SLF001
+
+    await cache.add("parent")
+    connection = cache._connection  # noqa: SLF001
+
+    process = multiprocessing.get_context("fork").Process(target=add_key, args=(cache, "child"))
+    process.start()
+    await asyncio.to_thread(process.join)
+
+    assert process.exitcode == 0
+    assert await cache.contains("child")
+    assert cache._connection is connection  # noqa: SLF001
+
+    with mock.patch("pyinsole.deduplication.os.getpid", return_value=-1):
+        assert await cache.contains("parent")
+        assert cache._connection is not connection  # noqa: SLF001
+        cache.close()
+
+    connection.close()
+
+
+@pytest.mark.asyncio
+async def test_sqlite_cache_expiration(tmp_path):
+    cache = SQLiteDeduplicationCache(str(tmp_path / "deduplication.db"), ttl=10, purge_interval=2)
+
+    with mock.patch("pyinsole.deduplication.time.time", return_value=100):
+        await cache.add("first")
+    with mock.patch("pyinsole.deduplication.time.time", return_value=111):
+        assert not await cache.contains("first")
+        await cache.add("second")
+
+    rows = cache._connection.execute("SELECT key FROM pyinsole_deduplication").fetchall()  # noqa: SLF001
+    assert rows == [("second",)]
+    cache.close()
@@ -3,11 +3,16 @@ from unittest import mock
 
 import pytest
 
-from pyinsole.dispatchers import Dispatcher
-from pyinsole.routes import Route
+from pyinsole.dispatchers import Dispatcher, _PollingState
+from pyinsole.ext.local import InMemoryProvider
+from pyinsole.limits import AdaptiveConcurrencyLimit, CircuitBreaker, RateLimiter
+from pyinsole.metrics import InMemoryMetrics
+from pyinsole.providers import AbstractProvider
+from pyinsole.routes import BatchRoute, Route
+from pyinsole.schedulers import FairScheduler
 
 
-def create_mock_route(messages):
+def create_mock_route(messages, *, max_in_flight=None, pollers=1, max_poll_backoff=0):
     provider = mock.AsyncMock(
         fetch_messages=mock.AsyncMock(return_value=messages),
         confirm_message=mock.AsyncMock(),
@@ -19,6 +24,17 @@ def create_mock_route(messages):
         provider=provider,
         handler=mock.AsyncMock(),
         translator=translator,
+        max_in_flight=max_in_flight,
+        pollers=pollers,
+        max_poll_backoff=max_poll_backoff,
+        priority=0,
+        weight=1,
+        queue_size=None,
+        retry_policy=None,
+        concurrency_limit=None,
+        circuit_breaker=None,
+        rate_limit=None,
+        ordered=False,
         spec=Route,
     )
 
@@ -155,3 +171,602 @@ async def test_dispatch_providers_with_error(route):
     assert exc_info.value.subgroup(ValueError) is not None
     route.__aenter__.assert_awaited_once()
     route.__aexit__.assert_awaited_once()
+
+
+def create_tracking_dispatch(tracker, delay=0.01):
+    async def dispatch_message(message, route):  # noqa: ARG001
+        tracker["current"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["current"])
+        await asyncio.sleep(delay)
+        tracker["current"] -= 1
+        return True
+
+    return dispatch_message
+
+
+def test_dispatcher_invalid_max_in_flight(route):
+    with pytest.raises(ValueError, match="max_in_flight"):
+        Dispatcher([route], max_in_flight=0)
+
+
+def test_dispatcher_concurrent_mode(route):
+    assert Dispatcher([route]).concurrent is False
+    assert Dispatcher([route], max_in_flight=10).concurrent is True
+    assert Dispatcher([create_mock_route(["message"], max_in_flight=2)]).concurrent is True
+
+
+@pytest.mark.asyncio
+async def test_dispatch_sequential_workers_limit_in_flight():
+    route = create_mock_route([f"message{i}" for i in range(20)])
+    tracker = {"current": 0, "peak": 0}
+    dispatcher = Dispatcher([route], workers=2)
+    dispatcher._dispatch_message = create_tracking_dispatch(tracker)  # noqa: SLF001
+
+    await dispatcher.dispatch(forever=False)
+
+    assert tracker["peak"] == 2
+    assert route.provider.confirm_message.await_count == 20
+
+
+@pytest.mark.asyncio
+async def test_dispatch_concurrent_global_limit():
+    route = create_mock_route([f"message{i}" for i in range(20)])
+    tracker = {"current": 0, "peak": 0}
+    dispatcher = Dispatcher([route], queue_size=20, workers=1, max_in_flight=8)
+    dispatcher._dispatch_message = create_tracking_dispatch(tracker)  # noqa: SLF001
+
+    await dispatcher.dispatch(forever=False)
+
+    assert tracker["peak"] == 8
+    assert route.provider.confirm_message.await_count == 20
+
+
+@pytest.mark.asyncio
+async def test_dispatch_concurrent_route_limit():
+    route1 = create_mock_route([f"message{i}" for i in range(10)], max_in_flight=3)
+    route2 = create_mock_route([f"message{i}" for i in range(10)], max_in_flight=5)
+    trackers = {route1: {"current": 0, "peak": 0}, route2: {"current": 0, "peak": 0}}
+
+    async def dispatch_message(message, route):
+        return await create_tracking_dispatch(trackers[route])(message, route)
+
+    dispatcher = Dispatcher([route1, route2], queue_size=20, workers=4)
+    dispatcher._dispatch_message = dispatch_message  # noqa: SLF001
+
+    await dispatcher.dispatch(forever=False)
+
+    assert trackers[route1]["peak"] == 3
+    assert trackers[route2]["peak"] == 5
+    assert route1.provider.confirm_message.await_count == 10
+    assert route2.provider.confirm_message.await_count == 10
+
+
+@pytest.mark.asyncio
+async def test_dispatch_unlimited_route_bounded_by_workers():
+    limited = create_mock_route([f"message{i}" for i in range(10)], max_in_flight=2)
+    unlimited = create_mock_route([f"message{i}" for i in range(20)])
+    trackers = {limited: {"current": 0, "peak": 0}, unlimited: {"current": 0, "peak": 0}}
+
+    async def dispatch_message(message, route):
+        return await create_tracking_dispatch(trackers[route])(message, route)
+
+    dispatcher = Dispatcher([limited, unlimited], queue_size=40, workers=2)
+    dispatcher._dispatch_message = dispatch_message  # noqa: SLF001
+
+    await dispatcher.dispatch(forever=False)
+
+    assert trackers[limited]["peak"] == 2
+    assert trackers[unlimited]["peak"] <= 2
+    assert unlimited.provider.confirm_message.await_count == 20
+
+
+def create_timed_dispatch(delays, confirmations=None):
+    """Return a dispatch of the messages of each route taking its delay, recording when they finished."""
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    finished = {route: [] for route in delays}
+
+    async def dispatch_message(message, route):  # noqa: ARG001
+        await asyncio.sleep(delays[route])
+        finished[route].append(loop.time() - start)
+        return True if confirmations is None else confirmations[route]
+
+    return dispatch_message, finished
+
+
+@pytest.mark.asyncio
+async def test_dispatch_limited_route_does_not_block_other_routes():
+    slow = create_mock_route([f"message{i}" for i in range(10)], max_in_flight=1)
+    fast = create_mock_route([f"message{i}" for i in range(40)])
+    dispatcher = Dispatcher([slow, fast], queue_size=100, workers=4)
+    dispatcher._dispatch_message, finished = create_timed_dispatch({slow: 0.1, fast: 0.01})  # noqa: SLF001
+
+    await dispatcher.dispatch(forever=False)
+
+    # the slow route takes a second, the fast one is not held behind it
+    assert len(finished[fast]) == 40
+    assert max(finished[fast]) < 0.5
+    assert len(finished[slow]) == 10
+
+
+@pytest.mark.asyncio
+async def test_dispatch_shrinking_concurrency_limit_does_not_slow_other_routes():
+    failing = create_mock_route([f"message{i}" for i in range(20)])
+    failing.concurrency_limit = AdaptiveConcurrencyLimit(4, min_limit=1)
+    healthy = create_mock_route([f"message{i}" for i in range(40)])
+    dispatcher = Dispatcher([failing, healthy], queue_size=100, workers=4)
+    dispatcher._dispatch_message, finished = create_timed_dispatch(  # noqa: SLF001
+        {failing: 0.1, healthy: 0.01}, confirmations={failing: False, healthy: True}
+    )
+
+    await dispatcher.dispatch(forever=False)
+
+    assert failing.concurrency_limit.limit == 1
+    assert len(finished[healthy]) == 40
+    assert max(finished[healthy]) < 0.5
+    assert failing.provider.message_not_processed.await_count == 20
+
+
+def create_mock_batch_route(batches, *, batch_size=10, batch_window=0):
+    batches = list(batches)
+
+    async def fetch_messages():
+        if batches:
+            return batches.pop(0)
+
+        await asyncio.sleep(0.01)
+        return []
+
+    provider = mock.AsyncMock(
+        fetch_messages=mock.AsyncMock(side_effect=fetch_messages),
+        confirm_message=mock.AsyncMock(),
+        message_not_processed=mock.AsyncMock(),
+    )
+
+    return mock.AsyncMock(
+        provider=provider,
+        handler=mock.AsyncMock(),
+        max_in_flight=None,
+        pollers=1,
+        max_poll_backoff=0,
+        priority=0,
+        weight=1,
+        queue_size=None,
+        batch_size=batch_size,
+        batch_window=batch_window,
+        retry_policy=None,
+        concurrency_limit=None,
+        circuit_breaker=None,
+        rate_limit=None,
+        ordered=False,
+        spec=BatchRoute,
+    )
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch():
+    route = create_mock_batch_route([["message1", "message2", "message3"]])
+    route.deliver_batch = mock.AsyncMock(return_value=[True, False, True])
+    dispatcher = Dispatcher([route])
+
+    await dispatcher.dispatch(forever=False)
+
+    route.deliver_batch.assert_awaited_once_with(["message1", "message2", "message3"])
+    route.provider.confirm_message.assert_has_awaits([mock.call("message1"), mock.call("message3")], any_order=True)
+    route.provider.message_not_processed.assert_awaited_once_with("message2")
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_ignores_empty_messages():
+    route = create_mock_batch_route([["message1", None]])
+    route.deliver_batch = mock.AsyncMock(return_value=[True])
+    dispatcher = Dispatcher([route])
+
+    await dispatcher.dispatch(forever=False)
+
+    route.deliver_batch.assert_awaited_once_with(["message1"])
+    route.provider.confirm_message.assert_awaited_once_with("message1")
+    route.provider.message_not_processed.assert_awaited_once_with(None)
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_split_by_size():
+    route = create_mock_batch_route([["message1", "message2", "message3"]], batch_size=2)
+    route.deliver_batch = mock.AsyncMock(side_effect=lambda messages: [True] * len(messages))
+    dispatcher = Dispatcher([route])
+
+    await dispatcher.dispatch(forever=False)
+
+    route.deliver_batch.assert_has_awaits([mock.call(["message1", "message2"]), mock.call(["message3"])])
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_accumulates_within_window():
+    route = create_mock_batch_route([["message1"], [], ["message2", "message3"]], batch_size=3, batch_window=60)
+    route.deliver_batch = mock.AsyncMock(side_effect=lambda messages: [True] * len(messages))
+    cancellation_token = asyncio.Event()
+    dispatcher = Dispatcher([route])
+
+    async def wait_and_cancel():
+        while not route.deliver_batch.await_count:  # noqa: ASYNC110
+            await asyncio.sleep(0.01)
+        cancellation_token.set()
+
+    async with asyncio.timeout(5):
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(dispatcher.dispatch(cancellation_token=cancellation_token))
+            tg.create_task(wait_and_cancel())
+
+    route.deliver_batch.assert_awaited_once_with(["message1", "message2", "message3"])
+
+
+@pytest.mark.asyncio
+async def test_dispatch_batch_window_during_long_polling():
+    provider = InMemoryProvider(range(3), wait_time=3)
+    cancellation_token = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    delivered = []
+
+    async def handler(messages, metadata):  # noqa: ARG001
+        delivered.append((loop.time() - start, len(messages)))
+        cancellation_token.set()
+        return True
+
+    route = BatchRoute(provider, handler, batch_size=10, batch_window=0.1)
+
+    async with asyncio.timeout(5):
+        await Dispatcher([route]).dispatch(cancellation_token=cancellation_token)
+
+    # the partial batch is not held until the long poll ends
+    [(elapsed, size)] = delivered
+    assert size == 3
+    assert elapsed < 1
+    assert len(provider) == 0
+    # the pending receive is cancelled on shutdown as well
+    assert loop.time() - start < 1
+
+
+def create_polling_route(batch, *, pollers, max_poll_backoff=0, delay=0.01):
+    tracker = {"current": 0, "peak": 0, "calls": 0}
+
+    async def fetch_messages():
+        tracker["calls"] += 1
+        tracker["current"] += 1
+        tracker["peak"] = max(tracker["peak"], tracker["current"])
+        await asyncio.sleep(delay)
+        tracker["current"] -= 1
+        return list(batch)
+
+    route = create_mock_route([], pollers=pollers, max_poll_backoff=max_poll_backoff)
+    route.provider.fetch_messages = mock.AsyncMock(side_effect=fetch_messages)
+    return route, tracker
+
+
+async def run_for(dispatcher, seconds):
+    cancellation_token = asyncio.Event()
+
+    async def wait_and_cancel():
+        await asyncio.sleep(seconds)
+        cancellation_token.set()
+
+    async with asyncio.timeout(5):
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(dispatcher.dispatch(cancellation_token=cancellation_token))
+            tg.create_task(wait_and_cancel())
+
+
+def test_polling_state():
+    state = _PollingState()
+    assert state.hot is False
+
+    state.update(10)
+    assert state.hot is True
+    assert state.max_batch == 10
+
+    state.update(3)
+    assert state.hot is False
+    assert state.max_batch == 10
+
+    state.update(0)
+    state.update(0)
+    assert state.empty_receives == 2
+
+    state.update(10)
+    assert state.hot is True
+    assert state.empty_receives == 0
+
+
+@pytest.mark.asyncio
+async def test_has_demand(route):
+    dispatcher = Dispatcher([route])
+    scheduler = FairScheduler([route], default_queue_size=30)
+    state = _PollingState()
+
+    assert dispatcher._has_demand(scheduler, route, state, 1) is False  # noqa: SLF001
+
+    state.update(10)
+    assert dispatcher._has_demand(scheduler, route, state, 1) is True  # noqa: SLF001
+    assert dispatcher._has_demand(scheduler, route, state, 3) is True  # noqa: SLF001
+
+    for _ in range(15):
+        await scheduler.put(None, route)
+
+    assert dispatcher._has_demand(scheduler, route, state, 1) is True  # noqa: SLF001
+    assert dispatcher._has_demand(scheduler, route, state, 2) is False  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_dispatch_multiple_pollers_hot_route():
+    route, tracker = create_polling_route([f"message{i}" for i in range(10)], pollers=3)
+    dispatcher = Dispatcher([route], queue_size=100, max_in_flight=100)
+    dispatcher._dispatch_message = mock.AsyncMock(return_value=True)  # noqa: SLF001
+
+    await run_for(dispatcher, 0.5)
+
+    assert tracker["peak"] == 3
+
+
+@pytest.mark.asyncio
+async def test_dispatch_multiple_pollers_idle_route():
+    route, tracker = create_polling_route([], pollers=3)
+    dispatcher = Dispatcher([route], queue_size=100)
+
+    await run_for(dispatcher, 0.3)
+
+    assert tracker["peak"] == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatch_backoff_on_empty_receives():
+    route, tracker = create_polling_route([], pollers=1, max_poll_backoff=1, delay=0)
+    dispatcher = Dispatcher([route])
+
+    with mock.patch("pyinsole.dispatchers.random.uniform", side_effect=lambda _, high: high):
+        await run_for(dispatcher, 0.5)
+
+    # 0.05 + 0.1 + 0.2 + 0.4 seconds of backoff
+    assert tracker["calls"] == 4
+
+
+def test_concurrent_with_concurrency_limit():
+    route = create_mock_route([])
+    route.concurrency_limit = AdaptiveConcurrencyLimit()
+
+    assert Dispatcher([route]).concurrent
+
+
+@pytest.mark.asyncio
+async def test_dispatch_records_outcomes():
+    provider = mock.AsyncMock(spec=AbstractProvider, fetch_messages=mock.AsyncMock(return_value=["m1", "m2"]))
+    route = Route(
+        provider,
+        mock.AsyncMock(side_effect=[True, False]),
+        concurrency_limit=AdaptiveConcurrencyLimit(4),
+        circuit_breaker=CircuitBreaker(failure_rate=0.5, window_size=2, minimum_calls=2),
+    )
+    metrics = InMemoryMetrics()
+
+    await Dispatcher([route], workers=1, metrics=metrics).dispatch(forever=False)
+
+    assert route.concurrency_limit.limit == 2
+    assert route.circuit_breaker.state == CircuitBreaker.OPEN
+    assert metrics.gauges["pyinsole_concurrency_limit"][(("route", route.name),)] == 2
+    assert metrics.gauges["pyinsole_circuit_state"][(("route", route.name), ("state", "open"))] == 1
+
+
+@pytest.mark.asyncio
+async def test_open_circuit_pauses_fetching():
+    route = create_mock_route(["message"])
+    route.circuit_breaker = CircuitBreaker(window_size=1, minimum_calls=1)
+    route.circuit_breaker.record(success=False)
+    dispatcher = Dispatcher([route])
+    scheduler = FairScheduler([route], default_queue_size=10)
+
+    with mock.patch("pyinsole.dispatchers.CIRCUIT_CHECK_INTERVAL", 0.01):
+        messages = await dispatcher._receive(scheduler, route, _PollingState(), 0)  # noqa: SLF001
+
+    assert messages == []
+    assert not route.provider.fetch_messages.called
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_before_fetching():
+    route = create_mock_route(["message1", "message2", "message3"])
+    route.rate_limit = RateLimiter(1, burst=3)
+    dispatcher = Dispatcher([route], rate_limit=RateLimiter(100, burst=10))
+    scheduler = FairScheduler([route], default_queue_size=10)
+    state = _PollingState()
+
+    messages = await dispatcher._receive(scheduler, route, state, 0)  # noqa: SLF001
+
+    assert len(messages) == 3
+    # one token was reserved, the other two messages are a debt of the next fetch
+    assert route.rate_limit.tokens < 0.1
+    assert dispatcher.rate_limit.tokens < 7.1
+
+    route.provider.fetch_messages.reset_mock()
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.5):
+            await dispatcher._receive(scheduler, route, state, 0)  # noqa: SLF001
+    assert not route.provider.fetch_messages.called
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_gives_back_unused_tokens():
+    route = create_mock_route([])
+    route.rate_limit = RateLimiter(1, burst=5)
+    dispatcher = Dispatcher([route])
+    state = _PollingState()
+    state.max_batch = 5
+
+    await dispatcher._receive(FairScheduler([route], default_queue_size=10), route, state, 0)  # noqa: SLF001
+
+    assert route.rate_limit.tokens == 5
+
+
+def group_of(raw_message):
+    return raw_message["Body"]["group"]
+
+
+@pytest.mark.asyncio
+async def test_dispatch_ordered_groups():
+    messages = [{"group": group, "index": index} for index in range(3) for group in ("a", "b", "c")]
+    provider = InMemoryProvider(messages, wait_time=0)
+    handled, running = [], set()
+    overlap = 0
+
+    async def handler(message, metadata):  # noqa: ARG001
+        nonlocal overlap
+        body = message["Body"]
+        assert body["group"] not in running
+        running.add(body["group"])
+        overlap = max(overlap, len(running))
+        await asyncio.sleep(0.01)
+        running.discard(body["group"])
+        handled.append((body["group"], body["index"]))
+        return True
+
+    route = Route(provider, handler, ordered=True, group_key=group_of)
+    dispatcher = Dispatcher([route], workers=3)
+
+    await dispatcher.dispatch(forever=False)
+
+    for group in ("a", "b", "c"):
+        assert [index for handled_group, index in handled if handled_group == group] == [0, 1, 2]
+    assert overlap == 3
+    assert len(provider) == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_ordered_failure_blocks_group():
+    messages = [{"group": "a", "index": 0}, {"group": "b", "index": 0}, {"group": "a", "index": 1}]
+    messages.append({"group": "a", "index": 2})
+    provider = InMemoryProvider(messages, wait_time=0)
+    handled = []
+
+    async def handler(message, metadata):  # noqa: ARG001
+        body = message["Body"]
+        handled.append((body["group"], body["index"]))
+        return body != {"group": "a", "index": 1}
+
+    route = Route(provider, handler, ordered=True, group_key=group_of)
+    dispatcher = Dispatcher([route], workers=2)
+
+    await dispatcher.dispatch(forever=False)
+
+    assert sorted(handled) == [("a", 0), ("a", 1), ("b", 0)]
+    assert len(provider) == 2
+    assert provider.in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_process_group_waits_for_group():
+    provider = InMemoryProvider(wait_time=0)
+    events = []
+
+    async def handler(message, metadata):  # noqa: ARG001
+        events.append(("start", message["Body"]["index"]))
+        await asyncio.sleep(0.01)
+        events.append(("end", message["Body"]["index"]))
+        return True
+
+    route = Route(provider, handler, ordered=True, group_key=group_of)
+    dispatcher = Dispatcher([route])
+    first = [{"ReceiptHandle": "1", "Body": {"group": "a", "index": 1}}]
+    second = [{"ReceiptHandle": "2", "Body": {"group": "a", "index": 2}}]
+
+    await asyncio.gather(dispatcher._process_group(first, route), dispatcher._process_group(second, route))  # noqa: SLF001
+
+    assert events == [("start", 1), ("end", 1), ("start", 2), ("end", 2)]
+    assert not dispatcher._group_locks  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_dispatch_cancellation_releases_buffered_messages():
+    provider = InMemoryProvider(range(10), wait_time=0)
+    cancellation_token = asyncio.Event()
+    handled = []
+
+    async def handler(message, metadata):  # noqa: ARG001
+        cancellation_token.set()
+        await asyncio.sleep(0.01)
+        handled.append(message["Body"])
+        return True
+
+    dispatcher = Dispatcher([Route(provider, handler)], queue_size=3, workers=1)
+
+    async with asyncio.timeout(5):
+        await dispatcher.dispatch(cancellation_token=cancellation_token)
+
+    assert handled == [0]
+    assert len(provider) == 9
+    assert provider.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_cancellation_stops_long_polling():
+    provider = InMemoryProvider(wait_time=60)
+    cancellation_token = asyncio.Event()
+    dispatcher = Dispatcher([Route(provider, mock.AsyncMock(return_value=True))])
+
+    async def wait_and_cancel():
+        await asyncio.sleep(0.05)
+        cancellation_token.set()
+
+    async with asyncio.timeout(1):
+        async with asyncio.TaskGroup() as tg:
+            tg.create_task(dispatcher.dispatch(cancellation_token=cancellation_token))
+            tg.create_task(wait_and_cancel())
+
+
+@pytest.mark.asyncio
+async def test_dispatch_message_task_cancel_releases_message(route):
+    route.deliver = mock.AsyncMock(side_effect=asyncio.CancelledError)
+    dispatcher = Dispatcher([route])
+
+    with pytest.raises(asyncio.CancelledError):
+        await dispatcher._dispatch_message("message", route)  # noqa: SLF001
+
+    route.provider.release_message.assert_awaited_once_with("message")
+
+
+@pytest.mark.asyncio
+async def test_dispatch_graceful_timeout_releases_waiting_messages():
+    provider = InMemoryProvider(range(5), wait_time=0)
+    cancellation_token = asyncio.Event()
+
+    async def handler(message, metadata):  # noqa: ARG001
+        cancellation_token.set()
+        await asyncio.sleep(60)
+
+    dispatcher = Dispatcher([Route(provider, handler, max_in_flight=1)], workers=2)
+
+    with pytest.raises(TimeoutError):
+        async with asyncio.timeout(0.1):
+            await dispatcher.dispatch(cancellation_token=cancellation_token)
+
+    assert len(provider) == 5
+    assert provider.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_dispatch_cancellation_releases_messages_waiting_for_slot():
+    provider = InMemoryProvider(range(5), wait_time=0)
+    cancellation_token = asyncio.Event()
+    handled = []
+
+    async def handler(message, metadata):  # noqa: ARG001
+        cancellation_token.set()
+        await asyncio.sleep(0.05)
+        handled.append(message["Body"])
+        return True
+
+    dispatcher = Dispatcher([Route(provider, handler, max_in_flight=1)], workers=2)
+
+    async with asyncio.timeout(5):
+        await dispatcher.dispatch(cancellation_token=cancellation_token)
+
+    assert handled == [0]
+    assert len(provider) == 4
+    assert provider.in_flight == 0
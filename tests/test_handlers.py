@@ -0,0 +1,144 @@
+import asyncio
+import contextvars
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from pyinsole.handlers import ExecutorHandler
+from pyinsole.routes import BatchRoute, Route
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def process_message(message, metadata):
+    return message == metadata["expected"]
+
+
+def test_invalid_handler():
+    with pytest.raises(TypeError, match="callable"):
+        ExecutorHandler("invalid")
+
+
+def test_invalid_executor():
+    with pytest.raises(ValueError, match="executor"):
+        ExecutorHandler(process_message, executor="fiber")
+
+
+def test_invalid_max_workers():
+    with pytest.raises(ValueError, match="max_workers"):
+        ExecutorHandler(process_message, max_workers=0)
+
+
+def test_process_executor_requires_picklable_handler():
+    with pytest.raises(TypeError, match="picklable"):
+        ExecutorHandler(lambda message, metadata: True, executor="process")  # noqa: ARG005
+
+
+def test_route_accepts_executor_handler(dummy_provider):
+    route = Route(dummy_provider, handler=ExecutorHandler(process_message))
+
+    assert isinstance(route.handler, ExecutorHandler)
+
+
+@pytest.mark.asyncio
+async def test_thread_executor():
+    threads = set()
+
+    def handler(message, metadata):
+        threads.add(threading.current_thread())
+        return message, metadata, request_id.get()
+
+    executor_handler = ExecutorHandler(handler, max_workers=2)
+    request_id.set("some-request")
+
+    result = await executor_handler("message", {"key": "value"})
+
+    assert result == ("message", {"key": "value"}, "some-request")
+    assert threading.current_thread() not in threads
+    executor_handler.stop()
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_bounds_concurrency():
+    running, max_running = 0, 0
+    lock = threading.Lock()
+
+    def handler(message, metadata):  # noqa: ARG001
+        nonlocal running, max_running
+        with lock:
+            running += 1
+            max_running = max(max_running, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return True
+
+    executor_handler = ExecutorHandler(handler, max_workers=2)
+
+    results = await asyncio.gather(*(executor_handler(i, {}) for i in range(6)))
+
+    assert results == [True] * 6
+    assert max_running == 2
+    executor_handler.stop()
+
+
+@pytest.mark.asyncio
+async def test_thread_executor_cancellation_does_not_queue_calls():
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def handler(message, metadata):  # noqa: ARG001
+        calls.append(message)
+        started.set()
+        release.wait(1)
+        return True
+
+    executor_handler = ExecutorHandler(handler, max_workers=1)
+    running = asyncio.create_task(executor_handler("running", {}))
+    waiting = asyncio.create_task(executor_handler("waiting", {}))
+    await asyncio.to_thread(started.wait, 1)
+
+    waiting.cancel()
+    release.set()
+
+    assert await running is True
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    assert calls == ["running"]
+    executor_handler.stop()
+
+
+@pytest.mark.asyncio
+async def test_process_executor():
+    executor_handler = ExecutorHandler(process_message, executor="process", max_workers=1)
+
+    async with executor_handler:
+        assert await executor_handler("message", {"expected": "message"}) is True
+        assert await executor_handler("message", {"expected": "other"}) is False
+
+    assert executor_handler._pool is None  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_route_shuts_executor_down(dummy_provider):
+    handler = ExecutorHandler(mock.Mock(return_value=True))
+    route = Route(dummy_provider, handler=handler)
+
+    async with route:
+        assert await route.deliver("message") is True
+        assert handler._pool is not None  # noqa: SLF001
+
+    assert handler._pool is None  # noqa: SLF001
+
+
+@pytest.mark.asyncio
+async def test_batch_route_with_executor_handler(dummy_provider):
+    handler = ExecutorHandler(mock.Mock(return_value=[True, False]))
+    route = BatchRoute(dummy_provider, handler=handler)
+
+    assert await route.deliver_batch(["first", "second"]) == [True, False]
+    handler.handler.assert_called_once_with(["first", "second"], [{}, {}])
+    handler.stop()
@@ -0,0 +1,46 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import pyinsole
+from pyinsole.routes import Route
+
+
+def run_python(code: str):
+    """Run the code in a fresh interpreter, where no module is imported yet."""
+    source = str(Path(pyinsole.__file__).parent.parent)
+    pythonpath = os.pathsep.join(filter(None, [source, os.environ.get("PYTHONPATH")]))
+    subprocess.run([sys.executable, "-c", code], check=True, env={**os.environ, "PYTHONPATH": pythonpath})
+
+
+def test_lazy_attributes():
+    assert pyinsole.Route is Route
+    assert "Route" in vars(pyinsole)
+
+
+def test_lazy_attribute_error():
+    with pytest.raises(AttributeError, match="invalid"):
+        pyinsole.invalid  # noqa: B018
+
+
+def test_import_does_not_load_dependencies():
+    run_python(
+        "import sys, pyinsole, pyinsole.ext.aws\n"
+        "assert 'pyinsole.dispatchers' not in sys.modules\n"
+        "assert 'botocore' not in sys.modules"
+    )
+
+
+def test_route_construction_does_not_load_aiobotocore():
+    run_python(
+        "import sys\n"
+        "from pyinsole.ext.aws import SQSRoute\n"
+        "async def handler(message, metadata): return True\n"
+        "SQSRoute('queue', handler)\n"
+        "assert 'aiobotocore' not in sys.modules\n"
+        "assert 'multiprocessing' not in sys.modules\n"
+        "assert 'sqlite3' not in sys.modules"
+    )
@@ -0,0 +1,186 @@
+import asyncio
+import time
+from unittest import mock
+
+import pytest
+
+from pyinsole.limits import AdaptiveConcurrencyLimit, CircuitBreaker, RateLimiter
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {"initial": 0, "min_limit": 0},
+        {"initial": 5, "min_limit": 10},
+        {"initial": 50, "max_limit": 10},
+        {"decrease_ratio": 1},
+        {"decrease_ratio": 0},
+    ],
+)
+def test_adaptive_limit_invalid_options(options):
+    with pytest.raises(ValueError):  # noqa: PT011
+        AdaptiveConcurrencyLimit(**options)
+
+
+def test_adaptive_limit_additive_increase():
+    limit = AdaptiveConcurrencyLimit(4, max_limit=6)
+
+    for _ in range(4):
+        limit.record(0.1, success=True)
+    assert limit.limit == 4
+    limit.record(0.1, success=True)
+    assert limit.limit == 5
+
+    for _ in range(100):
+        limit.record(0.1, success=True)
+    assert limit.limit == 6
+
+
+def test_adaptive_limit_multiplicative_decrease():
+    limit = AdaptiveConcurrencyLimit(10, min_limit=2, latency_threshold=1)
+
+    limit.record(0.1, success=False)
+    assert limit.limit == 5
+    limit.record(2, success=True)
+    assert limit.limit == 2
+    limit.record(0.1, success=False)
+    assert limit.limit == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_acquire():
+    limit = AdaptiveConcurrencyLimit(2, max_limit=10)
+
+    await limit.acquire()
+    await limit.acquire()
+    assert limit.locked()
+
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    limit.release()
+    await asyncio.wait_for(waiter, 1)
+    assert limit.in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_increase_wakes_up_waiters():
+    limit = AdaptiveConcurrencyLimit(1, max_limit=10, increase=1)
+    await limit.acquire()
+
+    waiter = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+    limit.record(0.1, success=True)
+
+    await asyncio.wait_for(waiter, 1)
+    assert limit.in_flight == 2
+
+
+@pytest.mark.asyncio
+async def test_adaptive_limit_cancelled_waiter_passes_its_slot():
+    limit = AdaptiveConcurrencyLimit(1)
+    await limit.acquire()
+
+    first = asyncio.create_task(limit.acquire())
+    second = asyncio.create_task(limit.acquire())
+    await asyncio.sleep(0)
+
+    limit.release()
+    first.cancel()
+    await asyncio.wait_for(second, 1)
+
+    assert first.cancelled()
+    assert limit.in_flight == 1
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"failure_rate": 0}, {"failure_rate": 1.5}, {"minimum_calls": 0}, {"minimum_calls": 30}, {"half_open_calls": 0}],
+)
+def test_circuit_breaker_invalid_options(options):
+    with pytest.raises(ValueError):  # noqa: PT011
+        CircuitBreaker(**options)
+
+
+def test_circuit_breaker_opens_on_failure_rate():
+    breaker = CircuitBreaker(failure_rate=0.5, window_size=4, minimum_calls=4)
+
+    for success in (True, False, True):
+        breaker.record(success=success)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record(success=False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert 0 < breaker.retry_after() <= breaker.recovery_timeout
+
+
+def test_circuit_breaker_rolling_window():
+    breaker = CircuitBreaker(failure_rate=0.5, window_size=4, minimum_calls=4)
+
+    for success in (False, True, True, True, False, True, True):
+        breaker.record(success=success)
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_circuit_breaker_recovery():
+    breaker = CircuitBreaker(window_size=2, minimum_calls=2, recovery_timeout=10, half_open_calls=2)
+
+    with mock.patch("pyinsole.limits.time.monotonic", return_value=100):
+        breaker.record(success=False)
+        breaker.record(success=False)
+        assert breaker.state == CircuitBreaker.OPEN
+        # results of the calls started before the circuit opened are ignored
+        breaker.record(success=True)
+        assert breaker.retry_after() == 10
+
+    with mock.patch("pyinsole.limits.time.monotonic", return_value=110):
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.retry_after() == 0
+
+        breaker.record(success=False)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    with mock.patch("pyinsole.limits.time.monotonic", return_value=120):
+        breaker.record(success=True)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.record(success=True)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("options", [{"rate": 0}, {"rate": 10, "burst": 0}])
+def test_rate_limiter_invalid_options(options):
+    with pytest.raises(ValueError):  # noqa: PT011
+        RateLimiter(**options)
+
+
+def test_rate_limiter_default_burst():
+    assert RateLimiter(0.5).burst == 1
+    assert RateLimiter(7.5).burst == 8
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_acquire():
+    limiter = RateLimiter(100, burst=10)
+    start = time.monotonic()
+
+    await limiter.acquire(10)
+    await limiter.acquire(5)
+
+    assert 0.04 <= time.monotonic() - start < 0.5
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_settle():
+    limiter = RateLimiter(1, burst=10)
+
+    await limiter.acquire(10)
+    limiter.settle(10, 4)
+    assert 5.9 < limiter.tokens < 6.5
+
+    limiter.settle(2, 10)
+    assert -2.1 < limiter.tokens < -1.5
+
+    limiter.settle(0, -100)
+    assert limiter.tokens == 10
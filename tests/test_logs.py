@@ -0,0 +1,119 @@
+import logging
+from unittest import mock
+
+import pytest
+
+from pyinsole.logs import LazyRepr, SampledMessageLogger
+from pyinsole.routes import Route
+
+
+def test_lazy_repr():
+    assert repr(LazyRepr({"key": "value"})) == "{'key': 'value'}"
+    assert str(LazyRepr([1, 2])) == "[1, 2]"
+
+
+def test_lazy_repr_truncates():
+    rendered = repr(LazyRepr({"body": "x" * 10_000}, max_length=100))
+
+    assert len(rendered) == 103
+    assert rendered.endswith("...")
+
+
+def test_lazy_repr_is_lazy():
+    class Payload:
+        rendered = False
+
+        def __repr__(self):
+            self.rendered = True
+            return "payload"
+
+    payload = Payload()
+    lazy = LazyRepr(payload)
+    assert payload.rendered is False
+
+    assert repr(lazy) == "payload"
+    assert payload.rendered is True
+
+
+def test_sampled_message_logger_invalid_sample_rate():
+    with pytest.raises(ValueError, match="sample_rate"):
+        SampledMessageLogger(sample_rate=-1)
+
+
+def test_sampled_message_logger_failures(caplog):
+    message_logger = SampledMessageLogger()
+
+    with caplog.at_level(logging.INFO, logger="pyinsole.messages"):
+        message_logger.handled("route", "ok", 0.1, success=True)
+        message_logger.handled("route", "failed", 0.1, success=False)
+
+    [record] = caplog.records
+    assert record.reason == "failed"
+    assert record.route == "route"
+    assert record.success is False
+    assert record.latency == 0.1
+    assert "message='failed'" in record.getMessage()
+
+
+def test_sampled_message_logger_slow(caplog):
+    message_logger = SampledMessageLogger(slow_threshold=1, failures=False)
+
+    with caplog.at_level(logging.INFO, logger="pyinsole.messages"):
+        message_logger.handled("route", "fast", 0.5, success=False)
+        message_logger.handled("route", "slow", 1.5, success=True)
+
+    assert [record.reason for record in caplog.records] == ["slow"]
+
+
+def test_sampled_message_logger_sample_rate(caplog):
+    message_logger = SampledMessageLogger(sample_rate=3)
+
+    with caplog.at_level(logging.INFO, logger="pyinsole.messages"):
+        for i in range(9):
+            message_logger.handled("route", i, 0.1, success=True)
+
+    assert [record.args[-1].obj for record in caplog.records] == [2, 5, 8]
+    assert {record.reason for record in caplog.records} == {"sampled"}
+
+
+def test_sampled_message_logger_disabled_level(caplog):
+    message_logger = SampledMessageLogger(level=logging.DEBUG)
+
+    with caplog.at_level(logging.INFO, logger="pyinsole.messages"):
+        message_logger.handled("route", "failed", 0.1, success=False)
+
+    assert caplog.records == []
+
+
+@pytest.mark.asyncio
+async def test_route_deliver_message_logger(dummy_provider):
+    message_logger = mock.Mock(spec=SampledMessageLogger)
+    route = Route(
+        dummy_provider, handler=mock.AsyncMock(return_value=True), name="route", message_logger=message_logger
+    )
+
+    assert await route.deliver("message") is True
+
+    message_logger.handled.assert_called_once_with(
+        "route", {"content": "message", "metadata": {}}, mock.ANY, success=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_route_deliver_does_not_log_messages_at_info(dummy_provider, caplog):
+    route = Route(dummy_provider, handler=mock.AsyncMock(return_value=True))
+
+    with caplog.at_level(logging.INFO):
+        await route.deliver("message")
+
+    assert caplog.records == []
+
+
+def test_lazy_repr_abbreviates_containers():
+    payload = {"items": list(range(100)), "data": b"y" * 1000, "nested": {"a": {"b": {"c": {"d": 1}}}}}
+
+    rendered = repr(LazyRepr(payload, max_length=10_000))
+
+    assert "'... 84 more items'" in rendered
+    assert "b'" + "y" * 256 + "...'" in rendered
+    assert "'c': 'dict(...)'" in rendered
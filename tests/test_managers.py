@@ -1,9 +1,15 @@
+import asyncio
+import os
+import signal
+import threading
+import time
 from unittest import mock
 
 import pytest
 
 from pyinsole.dispatchers import Dispatcher
-from pyinsole.managers import Manager
+from pyinsole.managers import Manager, _exit_status
+from pyinsole.providers import AbstractProvider
 from pyinsole.routes import Route
 
 
@@ -16,3 +22,93 @@ def test_dispatcher(dummy_route):
     manager = Manager(routes=[dummy_route])
     assert manager.dispatcher
     assert isinstance(manager.dispatcher, Dispatcher)
+
+
+class IdleProvider(AbstractProvider):
+    async def fetch_messages(self):
+        await asyncio.sleep(0.01)
+        return []
+
+    async def confirm_message(self, message):
+        pass
+
+
+@pytest.fixture
+def idle_route():
+    return Route(IdleProvider(), handler=mock.AsyncMock())
+
+
+def test_processes_validation(idle_route):
+    with pytest.raises(ValueError, match="processes"):
+        Manager([idle_route], processes=0)
+
+
+def test_run_processes(idle_route, tmp_path):
+    def run_worker(self, **kwargs):  # noqa: ARG001
+        (tmp_path / str(os.getpid())).touch()
+
+    with mock.patch.object(Manager, "_run_worker", run_worker):
+        status = Manager([idle_route], processes=3).run(forever=False)
+
+    assert status == 0
+    assert len(list(tmp_path.iterdir())) == 3
+
+
+def test_run_processes_exit_status(idle_route):
+    def run_worker(self, **kwargs):  # noqa: ARG001
+        os._exit(3)
+
+    with mock.patch.object(Manager, "_run_worker", run_worker):
+        status = Manager([idle_route], processes=2).run(forever=False)
+
+    assert status == 3
+
+
+def test_run_processes_restarts_crashed_workers(idle_route, tmp_path):
+    def run_worker(self, **kwargs):  # noqa: ARG001
+        (tmp_path / str(os.getpid())).touch()
+        try:
+            (tmp_path / "crashed").open("x").close()
+        except FileExistsError:
+            return
+        os._exit(1)
+
+    with (
+        mock.patch("pyinsole.managers.RESTART_DELAY", 0.01),
+        mock.patch.object(Manager, "_run_worker", run_worker),
+    ):
+        status = Manager([idle_route], processes=2).run(forever=True)
+
+    assert status == 0
+    assert len(list(tmp_path.iterdir())) == 4
+
+
+def test_run_processes_forwards_sigterm(idle_route):
+    timer = threading.Timer(0.5, os.kill, args=(os.getpid(), signal.SIGTERM))
+    timer.start()
+
+    start = time.monotonic()
+    status = Manager([idle_route], processes=2).run(graceful_timeout=5)
+
+    assert status == 0
+    assert time.monotonic() - start < 5
+    assert signal.getsignal(signal.SIGTERM) is signal.SIG_DFL
+
+
+@pytest.mark.parametrize("signum", [signal.SIGTERM, signal.SIGINT])
+def test_run_stops_gracefully_on_signal(idle_route, signum):
+    previous_handler = signal.getsignal(signum)
+    timer = threading.Timer(0.5, os.kill, args=(os.getpid(), signum))
+    timer.start()
+
+    start = time.monotonic()
+    status = Manager([idle_route]).run(graceful_timeout=5)
+
+    assert status == 0
+    assert time.monotonic() - start < 5
+    assert signal.getsignal(signum) is previous_handler
+
+
+@pytest.mark.parametrize(("exit_codes", "expected"), [([], 0), ([0, 0], 0), ([0, 2, 1], 2), ([0, -9], 137)])
+def test_exit_status(exit_codes, expected):
+    assert _exit_status(exit_codes) == expected
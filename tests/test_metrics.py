@@ -0,0 +1,143 @@
+from unittest import mock
+
+import pytest
+
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.metrics import Histogram, InMemoryMetrics, Metrics, to_prometheus, write_prometheus
+from pyinsole.providers import AbstractProvider
+from pyinsole.routes import Route
+
+ROUTE = (("route", "route"),)
+
+
+def test_histogram():
+    histogram = Histogram([1, 5, 10])
+
+    for value in (0.5, 1, 3, 7, 100):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1, 1]
+    assert histogram.count == 5
+    assert histogram.sum == 111.5
+    assert histogram.cumulative() == [(1, 2), (5, 3), (10, 4), (float("inf"), 5)]
+
+
+def test_in_memory_metrics():
+    metrics = InMemoryMetrics()
+
+    metrics.messages_fetched("route", 10, 0.02)
+    metrics.message_queued("route", 10)
+    metrics.message_dequeued("route", 9, 0.001)
+    metrics.message_handled("route", 0.1, success=True)
+    metrics.message_handled("route", 0.1, success=False)
+    metrics.message_acknowledged("route")
+    metrics.message_rejected("route", 2)
+    metrics.error_handled("route")
+    metrics.in_flight_changed("route", 3)
+    metrics.provider_request("provider", "receive_message", 0.02)
+
+    assert metrics.counters["pyinsole_messages_fetched_total"][ROUTE] == 10
+    assert metrics.counters["pyinsole_handler_calls_total"][(*ROUTE, ("success", "true"))] == 1
+    assert metrics.counters["pyinsole_handler_calls_total"][(*ROUTE, ("success", "false"))] == 1
+    assert metrics.counters["pyinsole_messages_acknowledged_total"][ROUTE] == 1
+    assert metrics.counters["pyinsole_messages_rejected_total"][ROUTE] == 2
+    assert metrics.counters["pyinsole_error_handler_calls_total"][ROUTE] == 1
+    assert metrics.gauges["pyinsole_queue_depth"][ROUTE] == 9
+    assert metrics.gauges["pyinsole_in_flight"][ROUTE] == 3
+    assert metrics.histograms["pyinsole_fetch_batch_size"][ROUTE].sum == 10
+    assert metrics.histograms["pyinsole_handler_latency_seconds"][ROUTE].count == 2
+    assert metrics.histograms["pyinsole_queue_wait_seconds"][ROUTE].count == 1
+    provider_labels = (("provider", "provider"), ("operation", "receive_message"))
+    assert metrics.counters["pyinsole_provider_requests_total"][provider_labels] == 1
+
+
+def test_to_prometheus():
+    metrics = InMemoryMetrics(latency_buckets=[0.1, 1])
+    metrics.message_acknowledged('my "route"')
+    metrics.in_flight_changed("route", 2)
+    metrics.message_handled("route", 0.5, success=True)
+
+    assert to_prometheus(metrics) == (
+        "# TYPE pyinsole_handler_calls_total counter\n"
+        'pyinsole_handler_calls_total{route="route",success="true"} 1\n'
+        "# TYPE pyinsole_messages_acknowledged_total counter\n"
+        'pyinsole_messages_acknowledged_total{route="my \\"route\\""} 1\n'
+        "# TYPE pyinsole_in_flight gauge\n"
+        'pyinsole_in_flight{route="route"} 2\n'
+        "# TYPE pyinsole_handler_latency_seconds histogram\n"
+        'pyinsole_handler_latency_seconds_bucket{route="route",le="0.1"} 0\n'
+        'pyinsole_handler_latency_seconds_bucket{route="route",le="1"} 1\n'
+        'pyinsole_handler_latency_seconds_bucket{route="route",le="+Inf"} 1\n'
+        'pyinsole_handler_latency_seconds_sum{route="route"} 0.5\n'
+        'pyinsole_handler_latency_seconds_count{route="route"} 1\n'
+    )
+
+
+def test_write_prometheus(tmp_path):
+    metrics = InMemoryMetrics()
+    metrics.error_handled("route")
+    path = tmp_path / "pyinsole.prom"
+
+    write_prometheus(metrics, path)
+
+    assert path.read_text() == to_prometheus(metrics)
+    assert list(tmp_path.iterdir()) == [path]
+
+
+def test_route_bind_metrics(dummy_provider):
+    metrics = Metrics()
+    route = Route(dummy_provider, handler=mock.AsyncMock(), metrics=metrics)
+
+    assert route.metrics is metrics
+    assert dummy_provider.metrics is metrics
+
+
+def test_dispatcher_bind_metrics(dummy_provider):
+    metrics, route_metrics = Metrics(), Metrics()
+    route = Route(dummy_provider, handler=mock.AsyncMock())
+    other_route = Route(dummy_provider, handler=mock.AsyncMock(), metrics=route_metrics)
+
+    Dispatcher([route, other_route], metrics=metrics)
+
+    assert route.metrics is metrics
+    assert other_route.metrics is route_metrics
+
+
+@pytest.mark.asyncio
+async def test_route_deliver_metrics(dummy_provider):
+    metrics = InMemoryMetrics()
+    route = Route(dummy_provider, handler=mock.AsyncMock(side_effect=[True, ValueError]), name="route", metrics=metrics)
+
+    await route.deliver("message")
+    with pytest.raises(ValueError):  # noqa: PT011
+        await route.deliver("message")
+    await route.error_handler(None, "message")
+
+    assert metrics.counters["pyinsole_handler_calls_total"][(*ROUTE, ("success", "true"))] == 1
+    assert metrics.counters["pyinsole_handler_calls_total"][(*ROUTE, ("success", "false"))] == 1
+    assert metrics.counters["pyinsole_error_handler_calls_total"][ROUTE] == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatch_metrics():
+    provider = mock.AsyncMock(
+        fetch_messages=mock.AsyncMock(return_value=["message1", "message2"]),
+        confirm_message=mock.AsyncMock(),
+        message_not_processed=mock.AsyncMock(),
+        metrics=None,
+        spec=AbstractProvider,
+    )
+    handler = mock.AsyncMock(side_effect=[True, False])
+    metrics = InMemoryMetrics()
+    route = Route(provider, handler=handler, name="route")
+
+    dispatcher = Dispatcher([route], metrics=metrics)
+    await dispatcher.dispatch(forever=False)
+
+    assert metrics.counters["pyinsole_messages_fetched_total"][ROUTE] == 2
+    assert metrics.counters["pyinsole_messages_acknowledged_total"][ROUTE] == 1
+    assert metrics.counters["pyinsole_messages_rejected_total"][ROUTE] == 1
+    assert metrics.histograms["pyinsole_queue_wait_seconds"][ROUTE].count == 2
+    assert metrics.histograms["pyinsole_handler_latency_seconds"][ROUTE].count == 2
+    assert metrics.gauges["pyinsole_queue_depth"][ROUTE] == 0
+    assert metrics.gauges["pyinsole_in_flight"][ROUTE] == 0
@@ -0,0 +1,113 @@
+from unittest import mock
+
+import pytest
+
+from pyinsole.middlewares import Middleware, compose
+from pyinsole.routes import BatchRoute, Route
+from pyinsole.translators import MessageEnvelope
+
+
+class Recorder(Middleware):
+    def __init__(self, name, calls):
+        self.name = name
+        self.calls = calls
+
+    def prepare(self, raw_message, call_next):
+        self.calls.append(f"{self.name}:prepare")
+        return call_next(raw_message)
+
+    async def deliver(self, message, call_next):
+        self.calls.append(f"{self.name}:deliver")
+        confirmation = await call_next(message)
+        self.calls.append(f"{self.name}:delivered")
+        return confirmation
+
+
+class Upper(Middleware):
+    def prepare(self, raw_message, call_next):
+        message = call_next(raw_message)
+        return MessageEnvelope(message.content.upper(), {**message.metadata, "upper": True})
+
+
+class Skip(Middleware):
+    async def deliver(self, message, call_next):  # noqa: ARG002
+        return True
+
+
+def test_compose_without_overrides():
+    def call(value):
+        return value
+
+    assert compose([Middleware(), Skip()], "prepare", call) is call
+
+
+def test_route_without_middlewares(dummy_provider):
+    route = Route(dummy_provider, mock.AsyncMock())
+
+    assert route.middlewares == ()
+    assert "prepare_message" not in vars(route)
+    assert "_handle" not in vars(route)
+
+
+def test_route_invalid_middleware(dummy_provider):
+    with pytest.raises(TypeError, match="invalid middleware"):
+        Route(dummy_provider, mock.AsyncMock(), middlewares=[object()])
+
+
+@pytest.mark.asyncio
+async def test_route_middlewares_order(dummy_provider):
+    calls = []
+    handler = mock.AsyncMock(return_value=True)
+    route = Route(dummy_provider, handler, middlewares=[Recorder("outer", calls), Recorder("inner", calls)])
+
+    assert await route.deliver("message") is True
+
+    handler.assert_awaited_once_with("message", {})
+    assert calls == [
+        "outer:prepare",
+        "inner:prepare",
+        "outer:deliver",
+        "inner:deliver",
+        "inner:delivered",
+        "outer:delivered",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_route_middlewares_replace_message(dummy_provider):
+    handler = mock.AsyncMock(return_value=True)
+    route = Route(dummy_provider, handler, middlewares=[Upper()])
+
+    assert await route.deliver("message") is True
+
+    handler.assert_awaited_once_with("MESSAGE", {"upper": True})
+
+
+@pytest.mark.asyncio
+async def test_route_middleware_skips_handler(dummy_provider):
+    handler = mock.AsyncMock(return_value=False)
+    route = Route(dummy_provider, handler, middlewares=[Skip()])
+
+    assert await route.deliver("message") is True
+    handler.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_batch_route_middlewares(dummy_provider):
+    calls = []
+    handler = mock.AsyncMock(return_value=[True, False])
+    route = BatchRoute(dummy_provider, handler, middlewares=[Upper(), Recorder("recorder", calls)])
+
+    assert await route.deliver_batch(["a", "b"]) == [True, False]
+
+    handler.assert_awaited_once_with(["A", "B"], [{"upper": True}, {"upper": True}])
+    assert calls == ["recorder:prepare", "recorder:prepare", "recorder:deliver", "recorder:delivered"]
+
+
+@pytest.mark.asyncio
+async def test_batch_route_middleware_skips_handler(dummy_provider):
+    handler = mock.AsyncMock(return_value=False)
+    route = BatchRoute(dummy_provider, handler, middlewares=[Skip()])
+
+    assert await route.deliver_batch(["a", "b"]) == [True, True]
+    handler.assert_not_awaited()
@@ -0,0 +1,206 @@
+from unittest import mock
+
+import pytest
+
+from pyinsole.dispatchers import Dispatcher
+from pyinsole.metrics import InMemoryMetrics
+from pyinsole.providers import AbstractProvider
+from pyinsole.retries import RetryPolicy
+from pyinsole.routes import Route
+
+
+class TransientError(Exception):
+    pass
+
+
+def create_provider():
+    return mock.AsyncMock(
+        spec=AbstractProvider,
+        confirm_message=mock.AsyncMock(),
+        retry_message=mock.AsyncMock(),
+        send_message=mock.AsyncMock(),
+    )
+
+
+def create_message(receive_count):
+    return {"Body": "body", "Attributes": {"ApproximateReceiveCount": str(receive_count)}}
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{"max_attempts": 0}, {"backoff": -1}, {"max_backoff": -1}, {"in_process_retries": -1}, {"in_process_delay": -1}],
+)
+def test_invalid_options(options):
+    with pytest.raises(ValueError):  # noqa: PT011
+        RetryPolicy(**options)
+
+
+def test_invalid_dead_letter():
+    with pytest.raises(TypeError, match="dead letter"):
+        RetryPolicy(dead_letter="queue")
+
+
+def test_dead_letter_without_send_message(dummy_provider):
+    with pytest.raises(TypeError, match="does not support sending messages"):
+        RetryPolicy(dead_letter=dummy_provider)
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [(create_message(3), 3), ({"Body": "body"}, None), ("raw", None), (create_message("invalid"), None)],
+)
+def test_attempts(message, expected):
+    assert RetryPolicy().attempts(message) == expected
+
+
+def test_delay():
+    policy = RetryPolicy(backoff=2, max_backoff=10, jitter=False)
+
+    assert [policy.delay(attempt) for attempt in range(1, 6)] == [2, 4, 8, 10, 10]
+
+
+def test_delay_jitter():
+    policy = RetryPolicy(backoff=2, max_backoff=10)
+
+    assert all(0 <= policy.delay(3) <= 8 for _ in range(100))
+
+
+@pytest.mark.asyncio
+async def test_reject_retries_with_backoff():
+    provider = create_provider()
+    policy = RetryPolicy(max_attempts=3, backoff=5, jitter=False)
+
+    assert await policy.reject(create_message(2), provider) is False
+
+    provider.retry_message.assert_awaited_once_with(create_message(2), 10)
+    assert not provider.confirm_message.called
+
+
+@pytest.mark.asyncio
+async def test_reject_dead_letters_exhausted_message():
+    provider, dead_letter = create_provider(), create_provider()
+    policy = RetryPolicy(max_attempts=3, dead_letter=dead_letter)
+    message = create_message(3)
+
+    assert await policy.reject(message, provider) is True
+
+    dead_letter.send_message.assert_awaited_once_with(message)
+    provider.confirm_message.assert_awaited_once_with(message)
+    assert not provider.retry_message.called
+
+
+@pytest.mark.asyncio
+async def test_reject_dead_letter_failure_leaves_message(caplog):
+    provider, dead_letter = create_provider(), create_provider()
+    dead_letter.send_message.side_effect = ConnectionError
+    message = create_message(3)
+
+    assert await RetryPolicy(max_attempts=3, dead_letter=dead_letter).reject(message, provider) is False
+
+    assert not provider.confirm_message.called
+    assert "could not send message to dead letter provider" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_reject_discards_exhausted_message_without_dead_letter():
+    provider = create_provider()
+    message = create_message(5)
+
+    assert await RetryPolicy(max_attempts=3).reject(message, provider) is True
+
+    provider.confirm_message.assert_awaited_once_with(message)
+
+
+@pytest.mark.asyncio
+async def test_reject_unknown_attempts():
+    provider = create_provider()
+
+    assert await RetryPolicy(max_attempts=1, jitter=False).reject("raw", provider) is False
+
+    provider.retry_message.assert_awaited_once_with("raw", 1)
+
+
+@pytest.mark.asyncio
+async def test_default_retry_message(dummy_provider):
+    dummy_provider.message_not_processed = mock.AsyncMock()
+
+    await dummy_provider.retry_message("message", 10)
+
+    dummy_provider.message_not_processed.assert_awaited_once_with("message")
+
+
+@pytest.mark.asyncio
+async def test_call_retries_transient_errors():
+    handler = mock.AsyncMock(side_effect=[TransientError, TransientError, True])
+    policy = RetryPolicy(retry_on=(TransientError,), in_process_delay=0)
+
+    assert await policy.call(handler, "message", {}) is True
+    assert handler.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_call_gives_up_after_in_process_retries():
+    handler = mock.AsyncMock(side_effect=TransientError)
+    policy = RetryPolicy(retry_on=(TransientError,), in_process_retries=1, in_process_delay=0)
+
+    with pytest.raises(TransientError):
+        await policy.call(handler, "message", {})
+
+    assert handler.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_call_does_not_retry_other_errors():
+    handler = mock.AsyncMock(side_effect=ValueError)
+    policy = RetryPolicy(retry_on=(TransientError,), in_process_delay=0)
+
+    with pytest.raises(ValueError):  # noqa: PT011
+        await policy.call(handler, "message", {})
+
+    assert handler.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_route_retries_transient_errors(dummy_provider):
+    handler = mock.AsyncMock(side_effect=[TransientError, True])
+    policy = RetryPolicy(retry_on=(TransientError,), in_process_delay=0)
+    route = Route(dummy_provider, handler, retry_policy=policy)
+
+    assert await route.deliver("message") is True
+    assert handler.await_count == 2
+
+
+def test_route_invalid_retry_policy(dummy_provider):
+    with pytest.raises(TypeError, match="retry policy"):
+        Route(dummy_provider, mock.AsyncMock(), retry_policy="invalid")
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_dead_letters_poison_message():
+    message = create_message(3)
+    provider, dead_letter = create_provider(), create_provider()
+    provider.fetch_messages = mock.AsyncMock(return_value=[message])
+    handler = mock.AsyncMock(return_value=False)
+    route = Route(provider, handler, retry_policy=RetryPolicy(max_attempts=3, dead_letter=dead_letter))
+    metrics = InMemoryMetrics()
+
+    await Dispatcher([route], metrics=metrics).dispatch(forever=False)
+
+    dead_letter.send_message.assert_awaited_once_with(message)
+    provider.confirm_message.assert_awaited_once_with(message)
+    assert metrics.counters["pyinsole_messages_dead_lettered_total"][(("route", "default"),)] == 1
+    assert metrics.counters["pyinsole_messages_rejected_total"][(("route", "default"),)] == 1
+
+
+@pytest.mark.asyncio
+async def test_dispatcher_survives_dead_letter_failure():
+    messages = [create_message(3), create_message(1)]
+    provider, dead_letter = create_provider(), create_provider()
+    provider.fetch_messages = mock.AsyncMock(return_value=messages)
+    dead_letter.send_message.side_effect = ConnectionError
+    handler = mock.AsyncMock(side_effect=[False, True])
+    route = Route(provider, handler, retry_policy=RetryPolicy(max_attempts=3, dead_letter=dead_letter))
+
+    await Dispatcher([route], workers=1).dispatch(forever=False)
+
+    provider.confirm_message.assert_awaited_once_with(messages[1])
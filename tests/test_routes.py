@@ -2,7 +2,9 @@ from unittest import mock
 
 import pytest
 
-from pyinsole.routes import Route
+from pyinsole.deduplication import InMemoryDeduplicationCache
+from pyinsole.metrics import InMemoryMetrics
+from pyinsole.routes import BatchRoute, Route, message_group_id
 from pyinsole.translators import AbstractTranslator, TranslatedMessage
 
 
@@ -202,3 +204,205 @@ async def test_deliver_with_message_translator(dummy_provider):
     assert route.prepare_message.called
     assert mock_handler.called
     mock_handler.assert_called_once_with("whatever", {})
+
+
+def test_max_in_flight(dummy_provider):
+    route = Route(dummy_provider, handler=mock.AsyncMock(), max_in_flight=10)
+    assert route.max_in_flight == 10
+
+
+@pytest.mark.parametrize("max_in_flight", [0, -1])
+def test_max_in_flight_invalid(dummy_provider, max_in_flight):
+    with pytest.raises(ValueError, match="max_in_flight"):
+        Route(dummy_provider, handler=mock.AsyncMock(), max_in_flight=max_in_flight)
+
+
+@pytest.mark.parametrize(("batch_size", "batch_window"), [(0, 0), (10, -1)])
+def test_batch_route_invalid_options(dummy_provider, batch_size, batch_window):
+    with pytest.raises(ValueError, match="batch_"):
+        BatchRoute(dummy_provider, handler=mock.AsyncMock(), batch_size=batch_size, batch_window=batch_window)
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deliver_batch(dummy_provider):
+    handler = mock.AsyncMock(return_value=[True, False, True])
+    route = BatchRoute(dummy_provider, handler, translator=StringMessageTranslator())
+
+    result = await route.deliver_batch(["a", "b", "c"])
+
+    assert result == [True, False, True]
+    handler.assert_awaited_once_with(["a", "b", "c"], [{}, {}, {}])
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deliver_batch_single_status(dummy_provider):
+    handler = mock.AsyncMock(return_value=True)
+    route = BatchRoute(dummy_provider, handler)
+
+    assert await route.deliver_batch(["a", "b"]) == [True, True]
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deliver_single_message(dummy_provider):
+    handler = mock.AsyncMock(return_value=[True])
+    route = BatchRoute(dummy_provider, handler)
+
+    assert await route.deliver("a") is True
+    handler.assert_awaited_once_with(["a"], [{}])
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deliver_batch_translation_error(dummy_provider):
+    translator = StringMessageTranslator()
+    translator.translate = mock.Mock(
+        side_effect=[
+            {"content": "a", "metadata": {}},
+            {"content": "", "metadata": {}},
+            {"content": "c", "metadata": {}},
+        ]
+    )
+    handler = mock.AsyncMock(return_value=[True, True])
+    error_handler = mock.AsyncMock(return_value=False)
+    route = BatchRoute(dummy_provider, handler, translator=translator, error_handler=error_handler)
+
+    result = await route.deliver_batch(["a", "b", "c"])
+
+    assert result == [True, False, True]
+    handler.assert_awaited_once_with(["a", "c"], [{}, {}])
+    error_handler.assert_awaited_once_with((ValueError, mock.ANY, mock.ANY), "b")
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deliver_batch_handler_error(dummy_provider):
+    exc = Exception()
+    handler = mock.AsyncMock(side_effect=exc)
+    error_handler = mock.AsyncMock(side_effect=[True, False])
+    route = BatchRoute(dummy_provider, handler, error_handler=error_handler)
+
+    result = await route.deliver_batch(["a", "b"])
+
+    assert result == [True, False]
+    error_handler.assert_has_awaits([mock.call((Exception, exc, mock.ANY), "a"), mock.call(mock.ANY, "b")])
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deliver_batch_invalid_results(dummy_provider):
+    handler = mock.AsyncMock(return_value=[True])
+    error_handler = mock.AsyncMock(return_value=False)
+    route = BatchRoute(dummy_provider, handler, error_handler=error_handler)
+
+    assert await route.deliver_batch(["a", "b"]) == [False, False]
+    assert isinstance(error_handler.await_args.args[0][1], ValueError)
+
+
+@pytest.mark.parametrize(("pollers", "max_poll_backoff"), [(0, 0), (1, -1)])
+def test_polling_options_invalid(dummy_provider, pollers, max_poll_backoff):
+    with pytest.raises(ValueError, match="poll"):
+        Route(dummy_provider, handler=mock.AsyncMock(), pollers=pollers, max_poll_backoff=max_poll_backoff)
+
+
+def test_scheduling_options(dummy_provider):
+    route = Route(dummy_provider, handler=mock.AsyncMock(), priority=5, weight=3, queue_size=50)
+    assert route.priority == 5
+    assert route.weight == 3
+    assert route.queue_size == 50
+
+
+@pytest.mark.parametrize(("weight", "queue_size"), [(0, None), (1, 0)])
+def test_scheduling_options_invalid(dummy_provider, weight, queue_size):
+    with pytest.raises(ValueError, match="weight|queue_size"):
+        Route(dummy_provider, handler=mock.AsyncMock(), weight=weight, queue_size=queue_size)
+
+
+class MessageIdTranslator(AbstractTranslator):
+    def translate(self, raw_message: dict) -> TranslatedMessage:
+        return {"content": raw_message["Body"], "metadata": {"MessageId": raw_message["MessageId"]}}
+
+
+def test_deduplication_invalid(dummy_provider):
+    with pytest.raises(TypeError, match="deduplication"):
+        Route(dummy_provider, handler=mock.AsyncMock(), deduplication="invalid")
+
+
+@pytest.mark.asyncio
+async def test_deliver_deduplication(dummy_provider):
+    handler = mock.AsyncMock(side_effect=[False, True])
+    metrics = InMemoryMetrics()
+    cache = InMemoryDeduplicationCache()
+    route = Route(dummy_provider, handler, translator=MessageIdTranslator(), deduplication=cache, metrics=metrics)
+    message = {"Body": "content", "MessageId": "id"}
+
+    # not remembered until successfully handled
+    assert await route.deliver(message) is False
+    assert await route.deliver(message) is True
+    assert await route.deliver(message) is True
+
+    assert handler.await_count == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+    checks = metrics.counters["pyinsole_deduplication_checks_total"]
+    assert checks[(("route", "default"), ("duplicate", "true"))] == 1
+    assert checks[(("route", "default"), ("duplicate", "false"))] == 2
+
+
+@pytest.mark.asyncio
+async def test_deliver_deduplication_custom_key(dummy_provider):
+    handler = mock.AsyncMock(return_value=True)
+    route = Route(
+        dummy_provider,
+        handler,
+        translator=MessageIdTranslator(),
+        deduplication=InMemoryDeduplicationCache(),
+        deduplication_key=lambda content, metadata: content,  # noqa: ARG005
+    )
+
+    await route.deliver({"Body": "content", "MessageId": "first"})
+    await route.deliver({"Body": "content", "MessageId": "second"})
+    await route.deliver({"Body": "other", "MessageId": "first"})
+
+    assert [call.args[0] for call in handler.await_args_list] == ["content", "other"]
+
+
+@pytest.mark.asyncio
+async def test_deliver_deduplication_without_key(dummy_provider):
+    handler = mock.AsyncMock(return_value=True)
+    route = Route(dummy_provider, handler, deduplication=InMemoryDeduplicationCache())
+
+    await route.deliver("message")
+    await route.deliver("message")
+
+    assert handler.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_batch_route_deduplication(dummy_provider):
+    handler = mock.AsyncMock(side_effect=[[True, False], [True]])
+    route = BatchRoute(
+        dummy_provider, handler, translator=MessageIdTranslator(), deduplication=InMemoryDeduplicationCache()
+    )
+    first, second = {"Body": "a", "MessageId": "1"}, {"Body": "b", "MessageId": "2"}
+
+    assert await route.deliver_batch([first, second]) == [True, False]
+    assert await route.deliver_batch([first, second]) == [True, True]
+
+    assert handler.await_args_list[1].args == (["b"], [{"MessageId": "2"}])
+
+
+def test_message_group_id():
+    assert message_group_id({"Attributes": {"MessageGroupId": "group"}}) == "group"
+    assert message_group_id({"Body": "body"}) is None
+    assert message_group_id("raw message") is None
+
+
+def test_ordered_batch_route_invalid(dummy_provider):
+    with pytest.raises(ValueError, match="ordered"):
+        BatchRoute(dummy_provider, handler=mock.AsyncMock(), ordered=True)
+
+
+@pytest.mark.asyncio
+async def test_batch_route_prepare_message_dict(dummy_provider):
+    handler = mock.AsyncMock(return_value=True)
+    route = BatchRoute(dummy_provider, handler)
+    route.prepare_message = mock.Mock(return_value={"content": "whatever", "metadata": {}})
+
+    assert await route.deliver_batch(["a"]) == [True]
+    handler.assert_awaited_once_with(["whatever"], [{}])
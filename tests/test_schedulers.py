@@ -0,0 +1,127 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from pyinsole.routes import Route
+from pyinsole.schedulers import FairScheduler
+
+pytestmark = pytest.mark.asyncio
+
+
+def create_route(name, *, priority=0, weight=1, queue_size=None):
+    return mock.Mock(priority=priority, weight=weight, queue_size=queue_size, spec=Route, name=name)
+
+
+async def drain(scheduler, count):
+    return [(await scheduler.get())[1] for _ in range(count)]
+
+
+async def test_round_robin_between_routes():
+    flooded, other = create_route("flooded"), create_route("other")
+    scheduler = FairScheduler([flooded, other], default_queue_size=10)
+
+    for i in range(8):
+        await scheduler.put(f"flooded-{i}", flooded)
+    for i in range(2):
+        await scheduler.put(f"other-{i}", other)
+
+    assert await drain(scheduler, 5) == [flooded, other, flooded, other, flooded]
+
+
+async def test_weighted_routes():
+    heavy, light = create_route("heavy", weight=3), create_route("light")
+    scheduler = FairScheduler([heavy, light], default_queue_size=10)
+
+    for i in range(6):
+        await scheduler.put(i, heavy)
+        await scheduler.put(i, light)
+
+    assert await drain(scheduler, 8) == [heavy, heavy, heavy, light, heavy, heavy, heavy, light]
+
+
+async def test_priority_routes():
+    high, low = create_route("high", priority=10), create_route("low")
+    scheduler = FairScheduler([low, high], default_queue_size=10)
+
+    await scheduler.put("low", low)
+    await scheduler.put("high-1", high)
+    await scheduler.put("high-2", high)
+
+    assert await scheduler.get() == ("high-1", high)
+    assert await scheduler.get() == ("high-2", high)
+    assert await scheduler.get() == ("low", low)
+
+
+async def test_batch_cost():
+    batch, single = create_route("batch"), create_route("single")
+    scheduler = FairScheduler([batch, single], default_queue_size=10)
+
+    await scheduler.put(["a", "b", "c"], batch, cost=3)
+    await scheduler.put(["d", "e", "f"], batch, cost=3)
+    for i in range(6):
+        await scheduler.put(i, single)
+
+    # the batch route waits three rounds to collect enough deficit for its first item
+    assert await drain(scheduler, 5) == [single, single, batch, single, single]
+
+
+async def test_backpressure_per_route():
+    full, other = create_route("full", queue_size=2), create_route("other")
+    scheduler = FairScheduler([full, other], default_queue_size=10)
+
+    await scheduler.put(1, full)
+    await scheduler.put(2, full)
+    assert scheduler.free_slots(full) == 0
+
+    blocked = asyncio.create_task(scheduler.put(3, full))
+    await scheduler.put(1, other)
+    await asyncio.sleep(0)
+    assert not blocked.done()
+    assert scheduler.qsize(full) == 2
+    assert scheduler.qsize() == 3
+
+    assert await scheduler.get() == (1, full)
+    await asyncio.wait_for(blocked, 1)
+    assert scheduler.qsize(full) == 2
+
+
+async def test_get_waits_for_items():
+    route = create_route("route")
+    scheduler = FairScheduler([route], default_queue_size=10)
+
+    getter = asyncio.create_task(scheduler.get())
+    await asyncio.sleep(0)
+    assert not getter.done()
+
+    await scheduler.put("message", route)
+    assert await asyncio.wait_for(getter, 1) == ("message", route)
+
+
+async def test_join():
+    route = create_route("route")
+    scheduler = FairScheduler([route], default_queue_size=10)
+    await scheduler.join()
+
+    await scheduler.put("message", route)
+    joiner = asyncio.create_task(scheduler.join())
+    await scheduler.get()
+    await asyncio.sleep(0)
+    assert not joiner.done()
+
+    scheduler.task_done()
+    await asyncio.wait_for(joiner, 1)
+
+    with pytest.raises(ValueError, match="task_done"):
+        scheduler.task_done()
+
+
+async def test_drain():
+    route = create_route("route")
+    scheduler = FairScheduler([route], default_queue_size=10)
+    await scheduler.put("first", route)
+    await scheduler.put("second", route)
+
+    assert await scheduler.drain() == [("first", route), ("second", route)]
+    assert await scheduler.drain() == []
+    await asyncio.wait_for(scheduler.join(), 1)
@@ -0,0 +1,60 @@
+import pickle
+
+import pytest
+
+from pyinsole.translators import MessageEnvelope, MetadataView
+
+
+def test_message_envelope():
+    message = MessageEnvelope("content", {"key": "value"})
+
+    assert message.content == "content"
+    assert message["content"] == "content"
+    assert message["metadata"] == {"key": "value"}
+    assert "content" in message
+    assert message == {"content": "content", "metadata": {"key": "value"}}
+    with pytest.raises(KeyError):
+        message["invalid"]
+
+
+def test_metadata_view_hides_body():
+    raw = {"Body": "body", "MessageId": "id", "ReceiptHandle": "receipt"}
+    metadata = MetadataView(raw)
+
+    assert metadata == {"MessageId": "id", "ReceiptHandle": "receipt"}
+    assert "Body" not in metadata
+    assert len(metadata) == 2
+    with pytest.raises(KeyError):
+        metadata["Body"]
+
+
+def test_metadata_view_envelope_precedence():
+    metadata = MetadataView({"Body": "body", "MessageId": "sqs-id", "a": 1}, envelope={"MessageId": "sns-id", "b": 2})
+
+    assert metadata == {"MessageId": "sns-id", "a": 1, "b": 2}
+    assert list(metadata) == ["MessageId", "b", "a"]
+
+
+def test_metadata_view_decodes_on_first_access():
+    calls = []
+
+    def decode(value):
+        calls.append(value)
+        return value.upper()
+
+    metadata = MetadataView({"Body": "body", "name": "value", "other": "raw"}, decoders={"name": decode})
+
+    assert metadata["other"] == "raw"
+    assert not calls
+    assert metadata["name"] == "VALUE"
+    assert metadata.get("name") == "VALUE"
+    assert calls == ["value"]
+
+
+def test_metadata_view_pickles_as_dict():
+    metadata = MetadataView({"Body": "body", "name": "value"}, decoders={"name": str.upper})
+
+    unpickled = pickle.loads(pickle.dumps(metadata))
+
+    assert type(unpickled) is dict
+    assert unpickled == {"name": "VALUE"}